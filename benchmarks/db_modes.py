@@ -0,0 +1,129 @@
+import sys
+import json
+import argparse
+import itertools
+import logging
+import time
+from typing import Dict, List, Optional
+import mysql.connector
+from dotenv import load_dotenv
+from benchmarks.run import database_config
+from benchmarks.synthetic import employee_list
+from src.database_handler import DatabaseHandler
+
+# Table the modes write to and drop afterwards, so real data is never touched
+TUNING_TABLE = "AVANTI_EMPLOYEES_TUNING"
+
+def modes(include_c_extension: bool) -> List[Dict]:
+    """
+    Return every combination of the DatabaseHandler write-path options to measure.
+    """
+    drivers = [True, False] if include_c_extension else [True]
+    return [
+        {"use_pure": use_pure, "compress": compress, "prepared_statements": prepared, "load_session": load_session}
+        for use_pure, compress, prepared, load_session in itertools.product(drivers, *[(False, True)] * 3)
+    ]
+
+def bench_mode(db_config: Dict, mode: Dict, records: List[Dict], batch_rows: int, repeat: int) -> Dict:
+    """
+    Time inserting and then updating the records in a fresh table with one write mode.
+
+    The insert pass measures new rows, the update pass the ON DUPLICATE KEY UPDATE path a
+    regular sync mostly takes. The best of ``repeat`` runs is kept.
+    """
+    db_handler = DatabaseHandler(**db_config, **mode)
+    connection = db_handler.connect()
+    if connection is None:
+        raise RuntimeError("database unavailable")
+    updates = [{**record, "photoRevision": (record["photoRevision"] or 0) + 1} for record in records]
+    best: Dict[str, float] = {}
+    try:
+        for _ in range(repeat):
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {TUNING_TABLE}")
+            if not db_handler.create_table(connection, TUNING_TABLE):
+                raise RuntimeError("Failed to create tuning table")
+            for phase, rows in (("insert", records), ("update", updates)):
+                start = time.perf_counter()
+                stats = db_handler.write_batches(connection, rows, batch_rows, table=TUNING_TABLE)
+                seconds = time.perf_counter() - start
+                if any(batch.failed_keys for batch in stats):
+                    raise RuntimeError(f"rows failed to {phase}")
+                best[phase] = min(best.get(phase, seconds), seconds)
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TUNING_TABLE}")
+        connection.close()
+    return {
+        **mode,
+        "insert_rows_per_second": round(len(records) / best["insert"], 1),
+        "update_rows_per_second": round(len(records) / best["update"], 1),
+    }
+
+def settings(mode: Dict) -> str:
+    """
+    Return the environment settings that select a mode in main.py.
+    """
+    return " ".join([
+        f"DB_DRIVER={'pure' if mode['use_pure'] else 'c'}",
+        f"DB_COMPRESS={'on' if mode['compress'] else 'off'}",
+        f"DB_PREPARED={str(mode['prepared_statements']).lower()}",
+        f"DB_LOAD_SESSION={str(mode['load_session']).lower()}",
+    ])
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command-line options for the write-mode benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Find the fastest database write mode against a server.")
+    parser.add_argument("--rows", type=int, default=20000, help="rows written per pass")
+    parser.add_argument("--batch-rows", type=int, default=1000, help="rows per database batch")
+    parser.add_argument("--repeat", type=int, default=2, help="runs per mode; the best is kept")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic dataset")
+    parser.add_argument("--use-app-db", action="store_true", help="measure against the DB_* database instead of BENCH_DB_*")
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Measure every write mode against the configured server and report the fastest.
+
+    Returns:
+        int: The process exit code; 1 if no database is configured or reachable.
+    """
+    logging.basicConfig(level=logging.INFO)
+    load_dotenv()
+    args = parse_args(argv)
+
+    db_config = database_config(args.use_app_db)
+    if db_config is None:
+        logging.error("No benchmark database configured; set BENCH_DB_NAME, or pass --use-app-db to use DB_NAME")
+        return 1
+    records = employee_list(args.rows, args.seed)
+
+    results = []
+    for mode in modes(getattr(mysql.connector, "HAVE_CEXT", False)):
+        try:
+            result = bench_mode(db_config, mode, records, args.batch_rows, args.repeat)
+        except (RuntimeError, mysql.connector.Error) as e:
+            logging.error(f"Mode {settings(mode)} failed: {e}")
+            continue
+        results.append(result)
+        logging.info(
+            f"{settings(mode)}: {result['insert_rows_per_second']} inserts/s, "
+            f"{result['update_rows_per_second']} updates/s"
+        )
+    if not results:
+        return 1
+
+    results.sort(key=lambda result: result["update_rows_per_second"], reverse=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        logging.info(f"Results written to {args.output}")
+    fastest = results[0]
+    logging.info(f"Fastest mode for {db_config['host']} ({fastest['update_rows_per_second']} updates/s): {settings(fastest)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from benchmarks.synthetic import employee
+
+class FakeEmployeesAPI:
+    """
+    A local HTTP server that mimics the Employees endpoint for benchmarks.
+
+    Every POST is answered with the ``skip``/``take`` window of a synthetic dataset of
+    ``total`` employees, plus the ``total`` itself, as the real API does. Each response is
+    delayed by ``latency`` seconds (exponentially distributed around that mean, so there is
+    a realistic tail), and a fraction ``error_rate`` of requests fail with a 503 so the
+    client's retry path is exercised.
+    """
+
+    def __init__(self, total: int, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        """
+        Initialize the FakeEmployeesAPI.
+
+        Args:
+            total (int): Number of employees in the dataset.
+            latency (float, optional): Mean response delay in seconds. Defaults to 0.
+            error_rate (float, optional): Fraction of requests answered with a 503. Defaults to 0.
+            seed (int, optional): Seed of the synthetic dataset. Defaults to 0.
+        """
+        self.total = total
+        self.latency = latency
+        self.error_rate = error_rate
+        self.seed = seed
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        The URL of the running server.
+        """
+        if self._server is None:
+            raise ValueError("Server is not running")
+        host, port = self._server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}/v1/Employees"
+
+    def start(self) -> "FakeEmployeesAPI":
+        """
+        Start serving on an ephemeral localhost port in a background thread.
+        """
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; don't let Nagle hold the body back
+            disable_nagle_algorithm = True
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                status, body = api.respond(json.loads(self.rfile.read(length) or b"{}"))
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if status == 503:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop the server.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def respond(self, payload: Dict) -> Tuple[int, bytes]:
+        """
+        Build the response to one request payload.
+
+        Returns:
+            Tuple[int, bytes]: The HTTP status and the JSON body.
+        """
+        with self._lock:
+            self.requests += 1
+            failed = random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if self.latency:
+            time.sleep(random.expovariate(1 / self.latency))
+        if failed:
+            return 503, b'{"message": "Service Unavailable"}'
+
+        skip = max(int(payload.get("skip", 0)), 0)
+        take = max(int(payload.get("take", 100)), 0)
+        end = min(skip + take, self.total)
+        page = [employee(index, self.seed) for index in range(skip, end)]
+        return 200, json.dumps({"employees": page, "total": self.total}).encode("utf-8")
+
+    def __enter__(self) -> "FakeEmployeesAPI":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
@@ -0,0 +1,317 @@
+import os
+import sys
+import json
+import argparse
+import logging
+import platform
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from typing import Callable, Dict, List, Optional
+from dotenv import load_dotenv
+from benchmarks.fake_api import FakeEmployeesAPI
+from benchmarks.synthetic import SCALES, employee_list, employees
+from src.api_client import APIClient
+from src.csv_handler import save_to_csv, write_csv_stream
+from src.database_handler import DatabaseHandler
+from src.models import EmployeeStore
+
+STAGES = ("api", "csv", "csv_stream", "db")
+
+# Table the database stage writes to and drops afterwards, so real data is never touched
+BENCH_TABLE = "AVANTI_EMPLOYEES_BENCH"
+
+BENCH_PAYLOAD: Dict = {"skip": 0, "take": 100, "total": True, "active": 1}
+
+def peak_rss_mb() -> float:
+    """
+    Return the peak resident set size of the current process in MiB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Return the nearest-rank percentile of ``values``, or 0 if there are none.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+def summarize(rows: int, seconds: float, latencies: List[float], rss_before: float) -> Dict:
+    """
+    Build the result of one stage.
+
+    Args:
+        rows (int): Number of rows processed.
+        seconds (float): Wall time of the stage.
+        latencies (List[float]): Per-operation latencies in seconds (requests, runs or batches).
+        rss_before (float): Peak RSS in MiB before the stage started, after its input was prepared.
+
+    Returns:
+        Dict: Throughput, latency percentiles and memory of the stage.
+    """
+    peak = peak_rss_mb()
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_second": round(rows / seconds, 1) if seconds else 0.0,
+        "operations": len(latencies),
+        "latency_p50": round(percentile(latencies, 0.50), 6),
+        "latency_p99": round(percentile(latencies, 0.99), 6),
+        "peak_rss_mb": round(peak, 1),
+        "rss_growth_mb": round(peak - rss_before, 1),
+    }
+
+class _TimedAPIClient(APIClient):
+    """
+    An APIClient that records the latency of every request it sends.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.latencies: List[float] = []
+
+    def _send(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super()._send(*args, **kwargs)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+def bench_api(url: str, count: int, page_size: int, workers: int) -> Dict:
+    """
+    Fetch the full dataset from the fake API into an EmployeeStore, timing every request.
+    """
+    client = _TimedAPIClient(url, {"Content-Type": "application/json"}, backoff_factor=0.01, pool_maxsize=workers)
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    with client:
+        store = EmployeeStore.from_records(client.iter_employees(dict(BENCH_PAYLOAD), page_size, workers))
+    seconds = time.perf_counter() - start
+    if len(store) != count:
+        raise RuntimeError(f"Fetched {len(store)} employees, expected {count}")
+    return summarize(count, seconds, client.latencies, rss_before)
+
+def bench_csv(count: int, seed: int, repeat: int, stream: bool) -> Dict:
+    """
+    Write the dataset to CSV ``repeat`` times with save_to_csv or write_csv_stream, timing each run.
+    """
+    records = employee_list(count, seed)
+    latencies: List[float] = []
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "employees.csv")
+        rss_before = peak_rss_mb()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            if stream:
+                success = write_csv_stream(records, filename) is not None
+            else:
+                success = save_to_csv({"employees": records}, filename)
+            latencies.append(time.perf_counter() - start)
+            if not success:
+                raise RuntimeError("CSV write failed")
+    return summarize(count * repeat, sum(latencies), latencies, rss_before)
+
+def bench_db(count: int, seed: int, db_config: Dict, batch_rows: int) -> Dict:
+    """
+    Upsert the dataset into a scratch table with write_batches, timing each batch.
+    """
+    db_handler = DatabaseHandler(**db_config)
+    connection = db_handler.connect()
+    if connection is None:
+        return {"skipped": "database unavailable"}
+    try:
+        if not db_handler.create_table(connection, BENCH_TABLE):
+            raise RuntimeError("Failed to create benchmark table")
+        rss_before = peak_rss_mb()
+        start = time.perf_counter()
+        stats = db_handler.write_batches(connection, employees(count, seed), batch_rows, table=BENCH_TABLE)
+        seconds = time.perf_counter() - start
+        failed = sum(len(batch.failed_keys) for batch in stats)
+        if failed:
+            raise RuntimeError(f"{failed} rows failed to insert")
+        return summarize(count, seconds, [batch.seconds for batch in stats], rss_before)
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        connection.close()
+
+def run_stage(function: Callable[..., Dict], *args: object) -> Dict:
+    """
+    Run one stage in a fresh process, so its peak RSS isn't inflated by earlier stages.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        try:
+            return executor.submit(function, *args).result()
+        except Exception as e:
+            logging.error(f"Benchmark stage {function.__name__} failed: {e}")
+            return {"error": str(e)}
+
+def run_benchmarks(args: argparse.Namespace, db_config: Optional[Dict]) -> Dict:
+    """
+    Run the selected stages at every selected scale.
+
+    Returns:
+        Dict: The run configuration and per-scale, per-stage results.
+    """
+    results: Dict[str, Dict[str, Dict]] = {}
+    for scale in args.scales:
+        count = SCALES[scale]
+        scale_results: Dict[str, Dict] = {}
+        logging.info(f"Benchmarking {count} employees...")
+        if "api" in args.stages:
+            with FakeEmployeesAPI(count, args.latency, args.error_rate, args.seed) as api:
+                scale_results["api"] = run_stage(bench_api, api.url, count, args.page_size, args.workers)
+                scale_results["api"]["server_requests"] = api.requests
+                scale_results["api"]["server_errors"] = api.errors
+        if "csv" in args.stages:
+            scale_results["csv"] = run_stage(bench_csv, count, args.seed, args.repeat, False)
+        if "csv_stream" in args.stages:
+            scale_results["csv_stream"] = run_stage(bench_csv, count, args.seed, args.repeat, True)
+        if "db" in args.stages:
+            if db_config is None:
+                scale_results["db"] = {"skipped": "no database configured"}
+            else:
+                scale_results["db"] = run_stage(bench_db, count, args.seed, db_config, args.batch_rows)
+        for stage, result in scale_results.items():
+            logging.info(f"{scale} {stage}: {result}")
+        results[scale] = scale_results
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "page_size": args.page_size,
+            "workers": args.workers,
+            "latency": args.latency,
+            "error_rate": args.error_rate,
+            "repeat": args.repeat,
+            "batch_rows": args.batch_rows,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+def compare(baseline: Dict, current: Dict, tolerance: float) -> List[str]:
+    """
+    Compare a run against a baseline and describe every regression beyond ``tolerance``.
+
+    Throughput regresses when it drops, and p99 latency and peak RSS when they grow, by more
+    than ``tolerance`` as a fraction of the baseline. Stages missing from either run, skipped
+    or failed are not compared.
+
+    Args:
+        baseline (Dict): A previous output of run_benchmarks.
+        current (Dict): The output of this run.
+        tolerance (float): Allowed relative change, e.g. 0.2 for 20%.
+
+    Returns:
+        List[str]: One message per regression; empty if there are none.
+    """
+    regressions = []
+    for scale, stages in current["results"].items():
+        for stage, result in stages.items():
+            before = baseline.get("results", {}).get(scale, {}).get(stage, {})
+            if "rows_per_second" not in before or "rows_per_second" not in result:
+                continue
+            if result["rows_per_second"] < before["rows_per_second"] * (1 - tolerance):
+                regressions.append(
+                    f"{scale} {stage}: throughput {result['rows_per_second']} rows/s, "
+                    f"baseline {before['rows_per_second']}"
+                )
+            for metric in ("latency_p99", "peak_rss_mb"):
+                if before[metric] and result[metric] > before[metric] * (1 + tolerance):
+                    regressions.append(f"{scale} {stage}: {metric} {result[metric]}, baseline {before[metric]}")
+    return regressions
+
+def database_config(use_app_db: bool = False) -> Optional[Dict]:
+    """
+    Return the benchmark database settings, or None if no benchmark database is configured.
+
+    The benchmarks create, load and drop tables, so they only run against the application's
+    database when asked to explicitly. Otherwise BENCH_DB_NAME must be set; the other
+    BENCH_DB_* settings fall back to DB_*.
+
+    Args:
+        use_app_db (bool, optional): Use the DB_* settings of the application. Defaults to False.
+    """
+    def setting(name: str, default: Optional[str] = None) -> Optional[str]:
+        if use_app_db:
+            return os.getenv(name) or default
+        return os.getenv(f"BENCH_{name}") or os.getenv(name) or default
+
+    if not (os.getenv("DB_NAME") if use_app_db else os.getenv("BENCH_DB_NAME")):
+        return None
+    return {
+        "host": setting("DB_HOST", "localhost"),
+        "user": setting("DB_USER"),
+        "password": setting("DB_PASSWORD"),
+        "database": setting("DB_NAME"),
+    }
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command-line options for the benchmark run.
+    """
+    def choices(allowed):
+        def parse(value: str) -> List[str]:
+            values = [item.strip().lower() for item in value.split(",") if item.strip()]
+            unknown = [item for item in values if item not in allowed]
+            if unknown:
+                raise argparse.ArgumentTypeError(f"unknown value(s): {', '.join(unknown)}")
+            return values
+        return parse
+
+    parser = argparse.ArgumentParser(description="Benchmark the sync stages against synthetic data.")
+    parser.add_argument("--scales", type=choices(SCALES), default=["1k", "100k"], help="comma-separated: 1k,100k,1m")
+    parser.add_argument("--stages", type=choices(STAGES), default=list(STAGES), help="comma-separated: api,csv,csv_stream,db")
+    parser.add_argument("--page-size", type=int, default=100, help="records per API page")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent API requests")
+    parser.add_argument("--latency", type=float, default=0.0, help="mean fake API response delay in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake API requests answered with 503")
+    parser.add_argument("--repeat", type=int, default=3, help="CSV writes per scale")
+    parser.add_argument("--batch-rows", type=int, default=1000, help="rows per database batch")
+    parser.add_argument(
+        "--use-app-db", action="store_true", help="run the database stage against the DB_* database instead of BENCH_DB_*"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic dataset")
+    parser.add_argument("--output", default="benchmark_results.json", help="file to write the results to")
+    parser.add_argument("--baseline", help="previous results to compare against; exits non-zero on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression against the baseline")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the benchmarks, write the results and compare them against a baseline if given.
+
+    Returns:
+        int: The process exit code; 1 if a regression was found.
+    """
+    logging.basicConfig(level=logging.INFO)
+    load_dotenv()
+    args = parse_args(argv)
+
+    current = run_benchmarks(args, database_config(args.use_app_db) if "db" in args.stages else None)
+    with open(args.output, "w") as f:
+        json.dump(current, f, indent=2)
+    logging.info(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), current, args.tolerance)
+        for regression in regressions:
+            logging.error(f"Regression: {regression}")
+        if regressions:
+            return 1
+        logging.info("No regressions against baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
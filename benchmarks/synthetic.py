@@ -0,0 +1,60 @@
+import random
+from typing import Dict, Iterator, List
+
+# Scale names accepted by the benchmark runner
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+GIVEN_NAMES = ("Alice", "Bob", "Chloé", "David", "Émilie", "Farid", "Grace", "Hiro", "Isabelle", "Jamal", "Kateri", "Liam")
+SURNAMES = ("Tremblay", "Gagnon", "Roy", "Smith", "Nguyen", "O'Brien", "Singh", "Côté", "Bouchard", "Li", "Martin", "Wilson")
+POSITIONS = (
+    ("Software Developer", "Développeur logiciel"),
+    ("Payroll Clerk", "Commis à la paie"),
+    ("Nurse", "Infirmière"),
+    ("Warehouse Associate", "Associé d'entrepôt"),
+    ("Manager", "Gestionnaire"),
+    ("Analyst", "Analyste"),
+)
+
+def employee(index: int, seed: int = 0) -> Dict:
+    """
+    Generate one synthetic employee record, shaped like those returned by the Employees API.
+
+    Records are a pure function of ``index`` and ``seed``, so a fake server can serve any
+    page without holding the dataset in memory and every run sees the same data.
+
+    Args:
+        index (int): Position of the employee in the dataset.
+        seed (int, optional): Varies the generated dataset. Defaults to 0.
+
+    Returns:
+        Dict: The employee record.
+    """
+    rng = random.Random(seed * 1_000_003 + index)
+    given_name = rng.choice(GIVEN_NAMES)
+    surname = rng.choice(SURNAMES)
+    position, position_fr = rng.choice(POSITIONS)
+    return {
+        "empNo": f"E{index:07d}",
+        "givenName": given_name,
+        "surname": surname,
+        "preferredName": given_name if rng.random() < 0.8 else None,
+        "initial": surname[0],
+        "positionName": position,
+        "positionNameFr": position_fr,
+        "photoRevision": rng.randrange(0, 50),
+        "active": rng.random() < 0.9,
+        "email": f"{given_name}.{index}@example.com".lower(),
+    }
+
+def employees(count: int, seed: int = 0, start: int = 0) -> Iterator[Dict]:
+    """
+    Yield ``count`` synthetic employees starting at index ``start``.
+    """
+    for index in range(start, start + count):
+        yield employee(index, seed)
+
+def employee_list(count: int, seed: int = 0) -> List[Dict]:
+    """
+    Return ``count`` synthetic employees as a list.
+    """
+    return list(employees(count, seed))
@@ -1,10 +1,34 @@
 import os
+import argparse
+import asyncio
+import csv
 import logging
-from typing import Dict
+import signal
+import sys
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 from dotenv import load_dotenv
-from src.api_client import APIClient
-from src.csv_handler import save_to_csv
-from src.database_handler import DatabaseHandler
+from src import metrics
+from src.api_client import APIClient, APIError, shards_by
+from src.change_tracker import ChangeTracker
+from src.checkpoint import CheckpointJournal, run_key
+from src.concurrency import AdaptiveLimiter, Limiter
+from src.daemon import StatusServer, SyncService
+from src.async_api_client import AsyncAPIClient
+from src.csv_handler import write_csv_stream
+from src.delta_export import write_delta
+from src.http_cache import ResponseCache
+from src.ingest import ingest_csv
+from src.models import EmployeeStore
+from src.photo_sync import PhotoStore, sync_photos
+from src.pipeline import run_pipeline
+from src.snapshot import write_snapshot
+from src.tenants import TenantRunner, load_manifest
+
+if TYPE_CHECKING:
+    from src.database_handler import DatabaseHandler
 
 # Load environment variables
 load_dotenv()
@@ -16,7 +40,47 @@ HEADERS = {
     "Content-Type": "application/json"
 }
 CSV_FILENAME = os.getenv("CSV_FILENAME", "employees.csv")
-DB_CONFIG = {
+CSV_COMPRESSION = os.getenv("CSV_COMPRESSION") or None
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "100"))
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "4"))
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "0"))
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "3"))
+SHARD_FILTER = os.getenv("SHARD_FILTER")
+SHARD_VALUES = [
+    int(value) if value.strip().isdigit() else value.strip()
+    for value in os.getenv("SHARD_VALUES", "").split(",") if value.strip()
+]
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR")
+HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", "300"))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+STATE_FILE = os.getenv("STATE_FILE", "employee_state.json")
+CHECKPOINT_FILE = os.getenv("CHECKPOINT_FILE", "sync_checkpoint.jsonl")
+BULK_LOAD_THRESHOLD = int(os.getenv("BULK_LOAD_THRESHOLD", "50000"))
+BATCH_ROWS = int(os.getenv("BATCH_ROWS", "1000"))
+BATCH_BYTES = int(os.getenv("BATCH_BYTES", str(4 * 1024 * 1024)))
+DB_WRITERS = int(os.getenv("DB_WRITERS", "1"))
+# A full refresh smaller than this fraction of the live table is treated as a truncated fetch
+REFRESH_MIN_FRACTION = float(os.getenv("REFRESH_MIN_FRACTION", "0.5"))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "0")) or None
+INGEST_CHUNK_BYTES = int(os.getenv("INGEST_CHUNK_BYTES", str(16 * 1024 * 1024)))
+PHOTO_DIR = os.getenv("PHOTO_DIR")
+PHOTO_URL_TEMPLATE = os.getenv("PHOTO_URL_TEMPLATE") or f"{API_URL}/{{empNo}}/Photo"
+PHOTO_WORKERS = int(os.getenv("PHOTO_WORKERS", "8"))
+METRICS_FILE = os.getenv("METRICS_FILE")
+SNAPSHOT_FILE = os.getenv("SNAPSHOT_FILE")
+DELTA_FILE = os.getenv("DELTA_FILE")
+DELTA_FORMAT = os.getenv("DELTA_FORMAT", "ndjson")
+DELTA_STATE_FILE = os.getenv("DELTA_STATE_FILE", "delta_state.snap")
+SYNC_INTERVAL = float(os.getenv("SYNC_INTERVAL", "900"))
+STATUS_HOST = os.getenv("STATUS_HOST", "127.0.0.1")
+STATUS_PORT = os.getenv("STATUS_PORT")
+TRACE_FILE = os.getenv("TRACE_FILE")
+# Write-path tuning; run `python -m benchmarks.db_modes` to find the fastest combination
+DB_DRIVER = os.getenv("DB_DRIVER", "default").lower()
+DB_COMPRESS = os.getenv("DB_COMPRESS", "off").lower()
+DB_PREPARED = os.getenv("DB_PREPARED", "false").lower() in ("1", "true", "yes")
+DB_LOAD_SESSION = os.getenv("DB_LOAD_SESSION", "false").lower() in ("1", "true", "yes")
+DB_CONFIG: Dict[str, Any] = {
     "host": os.getenv("DB_HOST", "localhost"),
     "user": os.getenv("DB_USER"),
     "password": os.getenv("DB_PASSWORD"),
@@ -40,57 +104,536 @@ PAYLOAD: Dict = {
     "sortDefinitions": []
 }
 
-def main() -> None:
+def create_api_client() -> APIClient:
+    """
+    Create the API client from the environment configuration, with the response cache
+    enabled when HTTP_CACHE_DIR is set, and adaptive concurrency between FETCH_WORKERS
+    and FETCH_MAX_WORKERS when the latter is larger.
+    """
+    cache = ResponseCache(HTTP_CACHE_DIR, HTTP_CACHE_TTL, HTTP_CACHE_MAX_BYTES) if HTTP_CACHE_DIR else None
+    limiter = AdaptiveLimiter(FETCH_WORKERS, max_limit=FETCH_MAX_WORKERS) if FETCH_MAX_WORKERS > FETCH_WORKERS else None
+    return APIClient(
+        API_URL, HEADERS, max_retries=API_MAX_RETRIES, pool_maxsize=fetch_workers(limiter), cache=cache, limiter=limiter
+    )
+
+def fetch_workers(limiter: Optional[Limiter]) -> int:
+    """
+    Number of fetch workers to run; with a limiter, enough to reach its maximum limit.
+    """
+    return limiter.max_limit if limiter is not None else FETCH_WORKERS
+
+def fetch_store(api_client: APIClient, journal: CheckpointJournal, metadata: Optional[Dict] = None) -> EmployeeStore:
+    """
+    Fetch the full employee set into a store, recording each page in the checkpoint journal.
+
+    Pages recovered from an interrupted run are reused instead of being requested again.
+    Sharded fetches are not journaled page by page, since shards paginate independently.
+
+    Args:
+        api_client (APIClient): The client used to fetch pages.
+        journal (CheckpointJournal): The started checkpoint journal.
+        metadata (Optional[Dict], optional): If given, receives the response fields other than
+            the employees, such as the ``total`` the API reports.
+
+    Returns:
+        EmployeeStore: The fetched employees.
+
+    Raises:
+        APIError: If any page cannot be retrieved.
+    """
+    workers = fetch_workers(api_client.limiter)
+    if SHARD_FILTER and SHARD_VALUES:
+        # Fan out over disjoint filter shards so each one paginates shallowly
+        shards = shards_by(SHARD_FILTER, SHARD_VALUES)
+        return EmployeeStore.from_records(api_client.iter_employees_sharded(PAYLOAD, shards, PAGE_SIZE, workers, metadata))
+
+    store = EmployeeStore.from_records(
+        record for employees in journal.recovered_pages.values() for record in employees
+    )
+    for skip, employees in api_client.iter_pages(PAYLOAD, PAGE_SIZE, workers, journal.completed_pages, metadata):
+        journal.record_page(skip, employees)
+        for record in employees:
+            store.add(record)
+    return store
+
+def sync_employee_photos(api_client: APIClient, store: EmployeeStore) -> bool:
+    """
+    Download changed employee photos into PHOTO_DIR, if it is set.
+
+    Returns:
+        bool: True if photo sync is disabled or every changed photo was downloaded, False otherwise.
+    """
+    if not PHOTO_DIR:
+        return True
+    photo_store = PhotoStore(PHOTO_DIR)
+    if not photo_store.load():
+        return False
+    logging.info("Syncing employee photos...")
+    with metrics.span("sync.photos"):
+        result = sync_photos(api_client, store, photo_store, PHOTO_URL_TEMPLATE, PHOTO_WORKERS)
+        # Photos replaced by a new revision are no longer referenced by the index
+        pruned = photo_store.prune()
+    if pruned:
+        logging.info(f"Pruned {pruned} unreferenced photos")
+    return not result.failed_keys
+
+def create_db_handler(allow_local_infile: bool = False, pool_size: Optional[int] = None) -> "DatabaseHandler":
+    """
+    Create the database handler from the environment configuration.
+
+    The MySQL driver is imported here rather than at module load, so runs that never touch
+    the database don't pay for importing it.
+    """
+    from src.database_handler import DatabaseHandler
+
+    return DatabaseHandler(
+        **DB_CONFIG,
+        allow_local_infile=allow_local_infile,
+        pool_size=pool_size,
+        use_pure={"c": False, "pure": True}.get(DB_DRIVER),
+        compress={"on": True, "auto": None}.get(DB_COMPRESS, False),
+        prepared_statements=DB_PREPARED,
+        load_session=DB_LOAD_SESSION,
+    )
+
+def main(
+    incremental: bool = False,
+    full_refresh: bool = False,
+    resume: bool = False,
+    csv_only: bool = False,
+    api_client: Optional[APIClient] = None,
+    db_handler: Optional["DatabaseHandler"] = None,
+) -> bool:
     """
     Main function to orchestrate the data retrieval, CSV writing, and database insertion process.
+
+    Progress is recorded in CHECKPOINT_FILE as pages are fetched and chunks are committed;
+    the journal is removed once the run succeeds.
+
+    A long-running caller such as the sync daemon can pass its own API client and database
+    handler, which are left open so their HTTP session and connection pool stay warm
+    between runs. Otherwise both are created for this run and closed when it ends.
+
+    Args:
+        incremental (bool, optional): Upsert only employees whose stored columns changed since the
+            last incremental run, as recorded in STATE_FILE. Defaults to False.
+        full_refresh (bool, optional): Replace the table with the fetched snapshot through a shadow
+            table swap, removing employees no longer returned by the API. Defaults to False.
+        resume (bool, optional): Continue an interrupted run with the same configuration, skipping
+            pages already fetched and rows already committed. Defaults to False.
+        csv_only (bool, optional): Only write the CSV export; the database is not touched and the
+            MySQL driver is never imported. Defaults to False.
+        api_client (Optional[APIClient], optional): A warm client to reuse instead of creating one.
+        db_handler (Optional[DatabaseHandler], optional): A warm handler to reuse instead of creating one.
+
+    Returns:
+        bool: True if every step of the run succeeded, False otherwise.
     """
     logging.basicConfig(level=logging.INFO)
 
-    # Initialize API client
-    api_client = APIClient(API_URL, HEADERS)
+    # Initialize API client, unless the caller keeps a warm one
+    owns_client = api_client is None
+    if api_client is None:
+        api_client = create_api_client()
+
+    journal = CheckpointJournal(CHECKPOINT_FILE)
+    key = run_key(API_URL, PAYLOAD, PAGE_SIZE, SHARD_FILTER, SHARD_VALUES, incremental, full_refresh, csv_only)
+    if journal.start(key, resume):
+        logging.info(
+            f"Resuming from checkpoint: {len(journal.completed_pages)} pages fetched, "
+            f"{len(journal.committed_keys)} rows committed"
+        )
+    elif resume:
+        logging.info("No checkpoint to resume; starting a new run")
 
-    # Query API
+    # Query API, following pagination until the full employee set is retrieved
     logging.info("Querying API...")
-    data = api_client.query_api(PAYLOAD)
+    with api_client if owns_client else nullcontext():
+        with metrics.span("sync.fetch") as span:
+            response_metadata: Dict = {}
+            try:
+                store = fetch_store(api_client, journal, response_metadata)
+                span.set(records=len(store))
+            except APIError as e:
+                logging.error(f"Failed to retrieve data from API: {e}. Exiting.")
+                span.fail(e)
+                journal.close()
+                return False
+        logging.info(f"Retrieved {len(store)} employees")
+        total = response_metadata.get("total")
+        expected_total = total if isinstance(total, int) else None
+        if api_client.cache is not None:
+            logging.info(f"HTTP cache: {api_client.cache.stats()}")
+        if isinstance(api_client.limiter, AdaptiveLimiter):
+            logging.info(f"API concurrency: {api_client.limiter.stats()}")
 
-    if not data:
-        logging.error("Failed to retrieve data from API. Exiting.")
-        return
+        # Photos are fetched over the same session, before it is closed
+        photo_success = sync_employee_photos(api_client, store)
 
     # Save to CSV
     logging.info("Saving data to CSV...")
-    csv_success = save_to_csv(data, CSV_FILENAME)
+    with metrics.span("sync.csv"):
+        csv_success = write_csv_stream(store, CSV_FILENAME, CSV_COMPRESSION) is not None
     if csv_success:
         logging.info(f"Data saved to {CSV_FILENAME}")
     else:
         logging.error("Failed to save data to CSV")
 
-    # Initialize database handler
-    db_handler = DatabaseHandler(**DB_CONFIG)
+    # Binary snapshot for fast reloads and diffs between runs
+    snapshot_success = True
+    if SNAPSHOT_FILE:
+        with metrics.span("sync.snapshot"):
+            snapshot_success = write_snapshot(store, SNAPSHOT_FILE) is not None
+        if snapshot_success:
+            logging.info(f"Snapshot saved to {SNAPSHOT_FILE}")
+        else:
+            logging.error("Failed to save snapshot")
+
+    # Change log of what differs from the previous run, for consumers that don't need the full export
+    delta_success = True
+    if DELTA_FILE:
+        with metrics.span("sync.delta"):
+            delta_success = write_delta(
+                store, DELTA_FILE, DELTA_STATE_FILE, DELTA_FORMAT, expected_total, REFRESH_MIN_FRACTION,
+                active_only=PAYLOAD.get("active") == 1,
+            ) is not None
+        if not delta_success:
+            logging.error("Failed to write delta export")
+
+    if csv_only:
+        if csv_success:
+            journal.finish()
+        else:
+            journal.close()
+        logging.info("Process completed.")
+        return csv_success and photo_success and snapshot_success and delta_success
+
+    # Large full syncs load the CSV just written in bulk instead of batching statements
+    use_bulk_load = (
+        csv_success
+        and CSV_COMPRESSION is None
+        and not incremental
+        and len(store) >= BULK_LOAD_THRESHOLD
+        and (db_handler is None or db_handler.config.get("allow_local_infile", False))
+    )
+
+    # Initialize database handler; parallel writers borrow pooled connections alongside the main one
+    if db_handler is None:
+        db_handler = create_db_handler(use_bulk_load, DB_WRITERS + 1 if DB_WRITERS > 1 else None)
 
     # Connect to database
     logging.info("Connecting to database...")
-    with db_handler.connect() as connection:
-        if not connection:
-            logging.error("Failed to connect to database. Exiting.")
-            return
+    connection = db_handler.connect()
+    if not connection:
+        logging.error("Failed to connect to database. Exiting.")
+        if csv_success:
+            logging.info(f"Once the database is back, load the export with: python main.py --ingest {CSV_FILENAME}")
+        journal.close()
+        return False
 
+    with connection, metrics.span("sync.db"):
         # Create table
         logging.info("Creating table if not exists...")
         table_created = db_handler.create_table(connection)
         if not table_created:
             logging.error("Failed to create table. Exiting.")
-            return
+            journal.close()
+            return False
+        if not db_handler.migrate_indexes(connection):
+            # Indexes only serve readers; the sync itself can go ahead without them
+            logging.warning("Secondary indexes are missing; reads by surname, position or status will be slow")
+
+        # In incremental mode, narrow the upsert down to rows that actually changed
+        tracker = None
+        if incremental:
+            tracker = ChangeTracker(STATE_FILE)
+            if not tracker.load():
+                logging.error("Failed to load sync state. Exiting.")
+                journal.close()
+                return False
+            changes = tracker.diff(store.iter_dicts())
+            logging.info(
+                f"Incremental sync: {len(changes.inserts)} inserts, {len(changes.updates)} updates, "
+                f"{changes.unchanged} unchanged"
+            )
+            employees: Union[EmployeeStore, List[Dict]] = changes.changed
+        else:
+            employees = store
 
         # Insert data
-        logging.info("Inserting data into database...")
-        insert_success = db_handler.insert_data(connection, data)
+        failed_keys: List[str] = []
+        if full_refresh:
+            logging.info("Refreshing table from snapshot...")
+            insert_success = db_handler.full_refresh(
+                connection, employees, CSV_FILENAME if use_bulk_load else None, BATCH_ROWS, BATCH_BYTES,
+                expected_rows=expected_total, min_live_fraction=REFRESH_MIN_FRACTION,
+            )
+            if insert_success:
+                # The table now holds exactly this snapshot; make the incremental state match it
+                tracker = ChangeTracker(STATE_FILE)
+                changes = tracker.diff(store.iter_dicts())
+        elif use_bulk_load:
+            logging.info(f"Bulk loading {CSV_FILENAME} into database...")
+            insert_success = db_handler.bulk_load_csv(connection, CSV_FILENAME)
+        else:
+            logging.info("Inserting data into database...")
+            if journal.committed_keys:
+                # Rows committed before the interruption don't need to be written again
+                records = employees.iter_dicts() if isinstance(employees, EmployeeStore) else employees
+                employees = [record for record in records if str(record["empNo"]) not in journal.committed_keys]
+            if DB_WRITERS > 1:
+                stats = db_handler.parallel_upsert(
+                    employees, DB_WRITERS, BATCH_ROWS, BATCH_BYTES, on_commit=journal.record_chunk
+                )
+            else:
+                stats = db_handler.write_batches(
+                    connection, employees, BATCH_ROWS, BATCH_BYTES, on_commit=journal.record_chunk
+                )
+            failed_keys = [key for batch in stats for key in batch.failed_keys]
+            insert_success = not failed_keys
+            logging.info(
+                f"Wrote {sum(batch.written for batch in stats)} rows in {len(stats)} batches, "
+                f"{len(failed_keys)} failed"
+            )
         if insert_success:
             logging.info("Data successfully inserted into database")
         else:
             logging.error("Failed to insert data into database")
+        state_success = True
+        if tracker is not None:
+            tracker.commit(changes, failed_keys)
+            state_success = tracker.save()
+            if not state_success:
+                # Stale fingerprints would make the next incremental run skip rows the table no longer matches
+                logging.error(f"Failed to save sync state; removing {STATE_FILE} so the next incremental run writes every row")
+                try:
+                    os.remove(STATE_FILE)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logging.error(f"Error removing stale sync state: {e}")
 
+    if csv_success and insert_success:
+        journal.finish()
+    else:
+        journal.close()
+        logging.info(f"Progress kept in {CHECKPOINT_FILE}; rerun with --resume to continue")
     logging.info("Process completed.")
+    return csv_success and photo_success and snapshot_success and delta_success and insert_success and state_success
+
+async def async_main() -> bool:
+    """
+    Asyncio variant of main() that runs fetching, CSV writing and database insertion
+    as overlapping stages joined by bounded queues.
+
+    Returns:
+        bool: True if every stage succeeded, False otherwise.
+    """
+    logging.basicConfig(level=logging.INFO)
+
+    api_client = create_api_client()
+    db_handler = create_db_handler()
+
+    logging.info("Running sync pipeline...")
+    with api_client:
+        success = await run_pipeline(
+            AsyncAPIClient(api_client, fetch_workers(api_client.limiter)), db_handler, PAYLOAD, CSV_FILENAME, PAGE_SIZE,
+            csv_compression=CSV_COMPRESSION,
+        )
+
+    if success:
+        logging.info("Process completed.")
+    else:
+        logging.error("Process completed with errors.")
+    return success
+
+def run_daemon() -> None:
+    """
+    Run syncs every SYNC_INTERVAL seconds, and on demand, until SIGTERM or SIGINT.
+
+    The API client's HTTP session and a database connection pool are created once and kept
+    warm across runs. Scheduled runs are incremental. When STATUS_PORT is set, run status and
+    timings are served on it and ``POST /trigger?mode=incremental|full|full_refresh`` starts
+    a run; SIGUSR1 triggers an incremental run as well.
+    """
+    logging.basicConfig(level=logging.INFO)
+
+    api_client = create_api_client()
+    db_handler = create_db_handler(pool_size=DB_WRITERS + 1)
+
+    def run_sync(mode: str) -> bool:
+        success = main(
+            incremental=mode == "incremental",
+            full_refresh=mode == "full_refresh",
+            api_client=api_client,
+            db_handler=db_handler,
+        )
+        registry = metrics.active()
+        if registry is not None:
+            export_metrics(registry)
+        return success
+
+    service = SyncService(run_sync, SYNC_INTERVAL if SYNC_INTERVAL > 0 else None)
+    server = StatusServer(service, STATUS_HOST, int(STATUS_PORT)) if STATUS_PORT else None
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: service.trigger("incremental"))
+
+    service.start()
+    if server is not None:
+        server.start()
+        logging.info(f"Sync status served on http://{server.address[0]}:{server.address[1]}/status")
+    logging.info("Sync daemon started.")
+    try:
+        while not stopping.wait(1.0):
+            pass
+    finally:
+        logging.info("Stopping sync daemon; waiting for the current run to finish...")
+        if server is not None:
+            server.stop()
+        service.stop()
+        api_client.close()
+    logging.info("Sync daemon stopped.")
+
+def run_ingest(filenames: List[str]) -> bool:
+    """
+    Load existing CSV exports into the database without calling the API.
+
+    Files are upserted in the given order, so a later export overrides an earlier one.
+    Parsing runs in INGEST_WORKERS processes and writing in DB_WRITERS connections.
+
+    Args:
+        filenames (List[str]): The CSV exports, oldest first.
+
+    Returns:
+        bool: True if every row was written, False otherwise.
+    """
+    logging.basicConfig(level=logging.INFO)
+    db_handler = create_db_handler(pool_size=DB_WRITERS + 1 if DB_WRITERS > 1 else None)
+
+    logging.info("Connecting to database...")
+    connection = db_handler.connect()
+    if not connection:
+        logging.error("Failed to connect to database. Exiting.")
+        return False
+
+    with connection, metrics.span("sync.ingest"):
+        if not db_handler.create_table(connection):
+            logging.error("Failed to create table. Exiting.")
+            return False
+        if not db_handler.migrate_indexes(connection):
+            logging.warning("Secondary indexes are missing; reads by surname, position or status will be slow")
+        try:
+            result = ingest_csv(
+                filenames, db_handler, connection, DB_WRITERS, INGEST_WORKERS, INGEST_CHUNK_BYTES,
+                BATCH_ROWS, BATCH_BYTES,
+            )
+        except (ValueError, csv.Error, OSError, BrokenProcessPool) as e:
+            logging.error(f"Failed to ingest CSV exports: {e}")
+            return False
+    if result.failed_keys:
+        logging.error(f"{len(result.failed_keys)} rows failed to insert")
+    return not result.failed_keys
+
+def run_tenants(manifest_file: str) -> bool:
+    """
+    Sync every tenant listed in a manifest concurrently, sharing HTTP sessions and DB pools.
+
+    Tenants that don't set their own payload use PAYLOAD.
+
+    Args:
+        manifest_file (str): Path of the tenant manifest (see src.tenants.load_manifest).
+
+    Returns:
+        bool: True if every tenant synced successfully, False otherwise.
+    """
+    logging.basicConfig(level=logging.INFO)
+    manifest = load_manifest(manifest_file)
+    if manifest is None:
+        return False
+    results = TenantRunner(manifest, PAYLOAD).run()
+    failed = [result.name for result in results if not result.success]
+    if failed:
+        logging.error(f"{len(failed)} of {len(results)} tenants failed: {', '.join(failed)}")
+    else:
+        logging.info(f"All {len(results)} tenants synced.")
+    return not failed
+
+def export_metrics(registry: metrics.Metrics) -> None:
+    """
+    Write the run's metrics to METRICS_FILE and its trace spans to TRACE_FILE, where set.
+    """
+    if METRICS_FILE and registry.write_prometheus(METRICS_FILE):
+        logging.info(f"Metrics written to {METRICS_FILE}")
+    if TRACE_FILE and registry.write_spans(TRACE_FILE):
+        logging.info(f"Trace spans for run {registry.run_id} written to {TRACE_FILE}")
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command-line options for the sync run.
+    """
+    parser = argparse.ArgumentParser(description="Sync employees from the API to CSV and MySQL.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--incremental", action="store_true",
+        help="only upsert employees that changed since the last incremental run",
+    )
+    mode.add_argument(
+        "--full-refresh", action="store_true",
+        help="replace the table with the fetched snapshot, removing employees no longer returned",
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="continue an interrupted run from its checkpoint, skipping completed pages and chunks",
+    )
+    parser.add_argument(
+        "--csv-only", action="store_true",
+        help="only write the CSV export, without touching the database",
+    )
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="stay resident and run incremental syncs every SYNC_INTERVAL seconds and on trigger",
+    )
+    parser.add_argument(
+        "--ingest", nargs="+", metavar="FILE",
+        help="load existing CSV exports, oldest first, into the database instead of calling the API",
+    )
+    parser.add_argument(
+        "--tenants", metavar="MANIFEST",
+        help="sync every tenant listed in a JSON manifest concurrently instead of the configured one",
+    )
+    parser.add_argument(
+        "--async", dest="use_async", action="store_true",
+        help="overlap fetching, CSV writing and database inserts using asyncio",
+    )
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.daemon:
+        # The daemon instruments and exports each run on its own
+        run_daemon()
+    else:
+        # Instrumentation is only switched on when there is somewhere to export it
+        registry = metrics.enable(os.getenv("RUN_ID")) if METRICS_FILE or TRACE_FILE else None
+        success = False
+        try:
+            if args.ingest:
+                success = run_ingest(args.ingest)
+            elif args.tenants:
+                success = run_tenants(args.tenants)
+            elif args.use_async:
+                success = asyncio.run(async_main())
+            else:
+                success = main(
+                    incremental=args.incremental, full_refresh=args.full_refresh, resume=args.resume,
+                    csv_only=args.csv_only,
+                )
+        finally:
+            if registry is not None:
+                export_metrics(registry)
+        # A failed run exits non-zero, so schedulers such as cron notice it
+        sys.exit(0 if success else 1)
@@ -1,32 +1,171 @@
 import requests
-from typing import Dict, Optional
+from requests.adapters import HTTPAdapter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Callable, Container, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import json
 import logging
+import queue
+import random
+import threading
+import time
+from src import metrics
+from src.concurrency import Limiter
+from src.http_cache import ResponseCache
+from src.json_stream import iter_array_items
+
+# HTTP status codes that indicate a transient condition worth retrying
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# HTTP status codes that indicate the server wants fewer concurrent requests
+THROTTLE_STATUSES = frozenset({429, 503})
+
+# Payload filters that can be used to split a query into disjoint shards
+SHARD_FILTERS = ("locations", "positions", "employmentStatus")
+
+# Marks the end of a shard's page stream
+_SHARD_DONE = object()
+
+def create_session(pool_maxsize: int = 10, adapter: Optional[HTTPAdapter] = None) -> requests.Session:
+    """
+    Create an HTTP session that keeps up to ``pool_maxsize`` connections alive per host.
+
+    Sessions given the same ``adapter`` share its connection pool but keep their own cookies.
+    """
+    session = requests.Session()
+    if adapter is None:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate"})
+    return session
+
+def _count_bytes(chunks: Iterable[bytes], operation: str) -> Iterator[bytes]:
+    """
+    Pass chunks of a response body through, counting their bytes once the body is read.
+    """
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        yield chunk
+    metrics.increment("sync_bytes_total", size, operation=operation)
+
+def shards_by(filter_name: str, values: List) -> List[Dict]:
+    """
+    Build one shard per filter value, for use with APIClient.iter_employees_sharded.
+
+    Args:
+        filter_name (str): One of the payload filters in SHARD_FILTERS, e.g. "locations".
+        values (List): The filter values; together they should cover every employee.
+
+    Returns:
+        List[Dict]: Payload overrides, one per value.
+
+    Raises:
+        ValueError: If the filter is not a known payload filter.
+    """
+    if filter_name not in SHARD_FILTERS:
+        raise ValueError(f"Unknown shard filter: {filter_name}")
+    return [{filter_name: [value]} for value in values]
+
+
+class APIError(Exception):
+    """
+    Raised when a page of a multi-page fetch cannot be retrieved.
+
+    Returning None halfway through a paginated fetch would silently truncate the
+    employee set, so the paging helpers raise this instead.
+    """
+
+class _ResponseReadError(APIError):
+    """
+    Raised when the connection fails while a streamed response body is being read.
+    """
 
 class APIClient:
     """
     A client for interacting with the employee API.
     
     This class encapsulates the logic for making HTTP requests to the API endpoint.
-    It handles authentication and request formatting.
+    It handles authentication and request formatting. Requests share a long-lived
+    keep-alive session, and transient failures are retried with exponential backoff.
     """
 
-    def __init__(self, url: str, headers: Dict[str, str]):
+    def __init__(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_max: float = 30.0,
+        retry_after_max: float = 120.0,
+        pool_maxsize: int = 10,
+        timeout: float = 30.0,
+        cache: Optional[ResponseCache] = None,
+        limiter: Optional[Limiter] = None,
+        session: Optional[requests.Session] = None,
+    ):
         """
         Initialize the APIClient with the API URL and headers.
 
         Args:
             url (str): The base URL of the API endpoint.
             headers (Dict[str, str]): Headers to be sent with each request, typically including authentication tokens.
+            max_retries (int, optional): Retries for connection errors, timeouts and retryable status codes. Defaults to 3.
+            backoff_factor (float, optional): Base delay in seconds, doubled on each retry. Defaults to 0.5.
+            backoff_max (float, optional): Upper bound in seconds for the computed backoff delay. Defaults to 30.0.
+            retry_after_max (float, optional): Upper bound in seconds for a delay requested by the server
+                through ``Retry-After``. Defaults to 120.0.
+            pool_maxsize (int, optional): Number of keep-alive connections kept per host. Should be at least
+                the number of concurrent page fetches. Defaults to 10.
+            timeout (float, optional): Per-request timeout in seconds. Defaults to 30.0.
+            cache (Optional[ResponseCache], optional): If given, query_api serves responses from this
+                on-disk cache and revalidates stale entries with conditional requests. Defaults to None.
+            limiter (Optional[Limiter], optional): If given, every request waits for a slot from
+                this limiter and reports its latency and throttling back to it. Worker pools should then
+                be sized to the limiter's ``max_limit``. Defaults to None.
+            session (Optional[requests.Session], optional): A session shared with other clients of the
+                same host, whose connection pool is then used instead of creating one. The caller keeps
+                ownership of it and close() leaves it open. Defaults to None.
         """
         self.url = url
         self.headers = headers
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self.timeout = timeout
+        self.cache = cache
+        self.limiter = limiter
 
+        # One session for the client's lifetime so TCP/TLS connections are reused
+        self._owns_session = session is None
+        self.session = session if session is not None else create_session(pool_maxsize)
+
+    def __enter__(self) -> "APIClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the underlying HTTP session and release its pooled connections, unless the
+        session is shared.
+        """
+        if self._owns_session:
+            self.session.close()
+
+    @metrics.traced("api.query_api")
     def query_api(self, payload: Dict) -> Optional[Dict]:
         """
         Send a POST request to the API with the given payload.
 
         This method handles the HTTP request, error checking, and response parsing.
-        If the request fails, it logs the error and returns None.
+        Connection errors, timeouts and 429/5xx responses are retried up to ``max_retries``
+        times, honoring ``Retry-After`` when the server sends it. If the request still
+        fails, it logs the error and returns None.
 
         Args:
             payload (Dict): The request payload containing query parameters.
@@ -38,15 +177,473 @@ class APIClient:
             requests.RequestException: For any network-related errors during the request.
         """
         try:
-            # Send POST request to the API
-            response = requests.post(self.url, json=payload, headers=self.headers)
-            
-            # Raise an HTTPError for bad responses (4xx and 5xx status codes)
-            response.raise_for_status()
-            
-            # Parse and return the JSON response
-            return response.json()
-        except requests.RequestException as e:
-            # Log any request-related errors
+            if self.cache is not None:
+                data = self._query_cached(payload, self.cache)
+            else:
+                # Send the request and parse the JSON response
+                response = self._post(payload)
+                data = response.json()
+                self._record_bytes(response)
+            if metrics.active() is not None and isinstance(data, dict):
+                records = len(data.get("employees") or [])
+                metrics.increment("sync_records_total", records, operation="api.query_api")
+                metrics.annotate(skip=payload.get("skip"), records=records)
+            return data
+        except (requests.RequestException, ValueError) as e:
+            # Log any request-related or response decoding errors
             logging.error(f"API request failed: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def _record_bytes(self, response: requests.Response) -> None:
+        """
+        Count the bytes of a downloaded response body, if metrics are enabled.
+        """
+        if metrics.active() is not None:
+            metrics.increment("sync_bytes_total", len(response.content), operation="api.query_api")
+
+    def _query_cached(self, payload: Dict, cache: ResponseCache) -> Dict:
+        """
+        Answer a query from the response cache, revalidating or downloading as needed.
+
+        A fresh entry is returned without a request. A stale entry is revalidated with
+        ``If-None-Match``/``If-Modified-Since`` and reused if the server answers 304.
+
+        Raises:
+            requests.RequestException: If the request fails.
+            ValueError: If the body is not valid JSON.
+        """
+        key = cache.key(self.url, payload, self.headers.get("Authorization", ""))
+        entry = cache.get(key)
+        if entry is not None and cache.is_fresh(entry):
+            cache.record_hit(entry)
+            return json.loads(entry.body)
+
+        conditional: Dict[str, str] = {}
+        if entry is not None and entry.etag:
+            conditional["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            conditional["If-Modified-Since"] = entry.last_modified
+
+        response = self._post(payload, extra_headers=conditional)
+        if response.status_code == 304 and entry is not None:
+            cache.refresh(key, entry)
+            cache.record_hit(entry, revalidated=True)
+            return json.loads(entry.body)
+
+        cache.record_miss()
+        data = response.json()
+        self._record_bytes(response)
+        cache.put(key, response.content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return data
+
+    @metrics.traced("api.query_page")
+    def query_page(self, payload: Dict) -> Optional[Dict]:
+        """
+        Fetch one page of the query, decoding the employees as the response downloads.
+
+        This is the page fetch used by iter_pages and the methods built on it. The body is
+        parsed incrementally by stream_employees, so the raw response is never held or decoded
+        as a whole; only the page's decoded records are collected. If the connection fails while
+        the body is read, the page is requested again, like a failed request, since none of its
+        records have reached the caller yet. With a response cache, the page goes through
+        query_api instead, since the cache stores complete bodies.
+
+        Args:
+            payload (Dict): The request payload containing query parameters.
+
+        Returns:
+            Optional[Dict]: The response fields, with ``employees`` as a list, or None if the request failed.
+        """
+        if self.cache is not None:
+            return self.query_api(payload)
+        for attempt in range(self.max_retries + 1):
+            metadata: Dict = {}
+            try:
+                employees = list(self.stream_employees(payload, metadata=metadata))
+                break
+            except _ResponseReadError as e:
+                if attempt == self.max_retries:
+                    logging.error(str(e))
+                    return None
+                delay = self._retry_delay(attempt)
+                logging.warning(f"{e}; retrying page in {delay:.2f}s")
+                metrics.increment("api_retries_total", reason="body_read")
+                time.sleep(delay)
+            except APIError as e:
+                logging.error(str(e))
+                return None
+        metrics.increment("sync_records_total", len(employees), operation="api.query_page")
+        metrics.annotate(skip=payload.get("skip"), records=len(employees))
+        return {**metadata, "employees": employees}
+
+    def stream_employees(
+        self, payload: Dict, chunk_size: int = 64 * 1024, metadata: Optional[Dict] = None
+    ) -> Iterator[Dict]:
+        """
+        Send a POST request and yield the ``employees`` array items as the body is parsed.
+
+        Unlike query_api, the response body is read incrementally and never decoded as a
+        whole, so memory use stays flat regardless of ``take`` and consumers can start
+        on the first records before the download finishes. The request itself is retried
+        like query_api; a failure after records have been yielded is not retried.
+
+        Args:
+            payload (Dict): The request payload containing query parameters.
+            chunk_size (int, optional): Number of bytes to read from the body at a time. Defaults to 64 KiB.
+            metadata (Optional[Dict], optional): If given, receives the response's other top-level
+                fields, such as ``total``.
+
+        Yields:
+            Dict: Individual employee records.
+
+        Raises:
+            APIError: If the request fails or the response body is malformed.
+        """
+        try:
+            response = self._post(payload, stream=True)
+        except requests.RequestException as e:
+            raise APIError(f"API request failed: {e}") from e
+
+        with response:
+            chunks: Iterable[bytes] = response.iter_content(chunk_size)
+            if metrics.active() is not None:
+                chunks = _count_bytes(chunks, "api.stream_employees")
+            try:
+                yield from iter_array_items(chunks, "employees", metadata)
+            except requests.RequestException as e:
+                raise _ResponseReadError(f"Failed to read API response: {e}") from e
+            except ValueError as e:
+                raise APIError(f"Failed to read API response: {e}") from e
+
+    def _post(self, payload: Dict, extra_headers: Optional[Dict[str, str]] = None, **kwargs) -> requests.Response:
+        """
+        Send a POST request to the API, retrying transient failures.
+
+        Connection errors, timeouts and 429/5xx responses are retried up to ``max_retries``
+        times, honoring ``Retry-After`` when the server sends it.
+
+        Args:
+            payload (Dict): The request payload containing query parameters.
+            extra_headers (Optional[Dict[str, str]], optional): Headers to send in addition to the client's own.
+            **kwargs: Extra arguments passed through to ``Session.post``, such as ``stream``.
+
+        Returns:
+            requests.Response: The successful response.
+
+        Raises:
+            requests.RequestException: If the request still fails after all retries.
+        """
+        headers = {**self.headers, **extra_headers} if extra_headers else self.headers
+        # Send POST request to the API over the pooled session
+        return self._with_retries(lambda: self._send(payload, headers, **kwargs))
+
+    def download(self, url: str) -> Optional[bytes]:
+        """
+        Download a binary resource, such as an employee photo, over the pooled session.
+
+        The request carries the client's authorization header and is retried like API queries.
+
+        Args:
+            url (str): The resource URL.
+
+        Returns:
+            Optional[bytes]: The response body, or None if the server answered 404.
+
+        Raises:
+            requests.RequestException: If the request still fails after all retries.
+        """
+        headers = {name: value for name, value in self.headers.items() if name.lower() != "content-type"}
+        try:
+            response = self._with_retries(lambda: self.session.get(url, headers=headers, timeout=self.timeout))
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+        return response.content
+
+    def _with_retries(self, send: Callable[[], requests.Response]) -> requests.Response:
+        """
+        Call ``send`` until it returns a successful response, retrying transient failures.
+
+        Raises:
+            requests.RequestException: If the request still fails after all retries.
+        """
+        for attempt in range(self.max_retries + 1):
+            retries_left = attempt < self.max_retries
+            try:
+                response = send()
+
+                if response.status_code in RETRY_STATUSES and retries_left:
+                    delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                    logging.warning(f"API returned {response.status_code}; retrying in {delay:.2f}s")
+                    metrics.increment("api_retries_total", reason=response.status_code)
+                    response.close()
+                    time.sleep(delay)
+                    continue
+
+                # Raise an HTTPError for bad responses (4xx and 5xx status codes)
+                if not response.ok:
+                    response.close()
+                response.raise_for_status()
+                return response
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not retries_left:
+                    raise
+                delay = self._retry_delay(attempt)
+                logging.warning(f"API request failed: {e}; retrying in {delay:.2f}s")
+                metrics.increment("api_retries_total", reason=type(e).__name__)
+                time.sleep(delay)
+        raise requests.RequestException("Retries exhausted")
+
+    def _send(self, payload: Dict, headers: Dict[str, str], **kwargs) -> requests.Response:
+        """
+        Send one POST request, holding a limiter slot for its duration when a limiter is set.
+        """
+        if self.limiter is None:
+            return self.session.post(self.url, json=payload, headers=headers, timeout=self.timeout, **kwargs)
+
+        self.limiter.acquire()
+        start = time.monotonic()
+        throttled = True
+        try:
+            response = self.session.post(self.url, json=payload, headers=headers, timeout=self.timeout, **kwargs)
+            throttled = response.status_code in THROTTLE_STATUSES
+            return response
+        finally:
+            self.limiter.release(time.monotonic() - start, throttled)
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Compute how long to wait before the next retry.
+
+        A server-provided ``Retry-After`` (in seconds or as an HTTP date) takes precedence,
+        capped at ``retry_after_max`` so a misbehaving server cannot stall the sync.
+        Otherwise the delay is exponential in the attempt number, capped at ``backoff_max``,
+        with full jitter so concurrent workers don't retry in lockstep.
+
+        Args:
+            attempt (int): Zero-based number of the attempt that just failed.
+            retry_after (Optional[str]): Value of the ``Retry-After`` response header, if any.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        if retry_after:
+            try:
+                return min(self.retry_after_max, max(0.0, float(retry_after)))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+                    return min(self.retry_after_max, max(0.0, delay))
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * 2 ** attempt))
+
+    def iter_pages(
+        self,
+        payload: Dict,
+        page_size: int = 100,
+        max_workers: int = 4,
+        completed: Container[int] = (),
+        metadata: Optional[Dict] = None,
+    ) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Fetch the full employee set page by page, yielding each page as it arrives.
+
+        The first page is requested on its own to learn the ``total`` reported by the API.
+        The remaining ``skip``/``take`` windows are then fetched concurrently on a bounded
+        thread pool. At most ``2 * max_workers`` pages are in flight or waiting to be
+        consumed at any time, so a slow consumer applies backpressure to the fetch.
+
+        If the response carries no ``total``, pages are fetched sequentially until a short
+        page is returned.
+
+        Pages whose ``skip`` offset is in ``completed`` (for example, recorded by a checkpoint
+        journal) are not yielded. They are not requested either, except for the first page,
+        which is still needed for the total, and pages walked without a total.
+
+        Args:
+            payload (Dict): The base request payload; ``skip`` and ``take`` are overridden per page.
+            page_size (int, optional): Number of records to request per page. Defaults to 100.
+            max_workers (int, optional): Maximum number of concurrent page requests. Defaults to 4.
+            completed (Container[int], optional): ``skip`` offsets of pages to leave out. Defaults to ().
+            metadata (Optional[Dict], optional): If given, receives the first response's other
+                top-level fields, such as ``total``.
+
+        Yields:
+            Tuple[int, List[Dict]]: The ``skip`` offset of the page and its employee records,
+            in completion order rather than ``skip`` order.
+
+        Raises:
+            APIError: If any page cannot be retrieved.
+        """
+        start = payload.get("skip", 0)
+        first = self._fetch_page(payload, start, page_size)
+        employees = first.get("employees") or []
+        if metadata is not None:
+            metadata.update((name, value) for name, value in first.items() if name != "employees")
+        if start not in completed:
+            yield start, employees
+
+        total = first.get("total")
+        if not isinstance(total, int):
+            # No total to plan against; walk forward until the server runs out of rows
+            skip = start
+            while len(employees) == page_size:
+                skip += page_size
+                employees = self._fetch_page(payload, skip, page_size).get("employees") or []
+                if skip not in completed:
+                    yield skip, employees
+            return
+
+        offsets = (skip for skip in range(start + page_size, total, page_size) if skip not in completed)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending: Dict[Future, int] = {}
+
+            def submit_next() -> None:
+                skip = next(offsets, None)
+                if skip is not None:
+                    pending[executor.submit(self._fetch_page, payload, skip, page_size)] = skip
+
+            for _ in range(2 * max_workers):
+                submit_next()
+
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        skip = pending.pop(future)
+                        yield skip, future.result().get("employees") or []
+                        submit_next()
+            finally:
+                # Don't start new requests if the consumer stopped early or a page failed
+                for future in pending:
+                    future.cancel()
+
+    def iter_employees(self, payload: Dict, page_size: int = 100, max_workers: int = 4) -> Iterator[Dict]:
+        """
+        Yield every employee record across all pages of the query.
+
+        This is a flattened view over :meth:`iter_pages`; records are yielded as soon as
+        their page arrives.
+
+        Args:
+            payload (Dict): The base request payload; ``skip`` and ``take`` are overridden per page.
+            page_size (int, optional): Number of records to request per page. Defaults to 100.
+            max_workers (int, optional): Maximum number of concurrent page requests. Defaults to 4.
+
+        Yields:
+            Dict: Individual employee records.
+
+        Raises:
+            APIError: If any page cannot be retrieved.
+        """
+        for _, employees in self.iter_pages(payload, page_size, max_workers):
+            yield from employees
+
+    def iter_employees_sharded(
+        self,
+        payload: Dict,
+        shards: List[Dict],
+        page_size: int = 100,
+        max_workers: int = 4,
+        metadata: Optional[Dict] = None,
+    ) -> Iterator[Dict]:
+        """
+        Fetch the employee set as disjoint filter shards queried in parallel.
+
+        Each shard's filter overrides (see shards_by) are applied to the payload and the shard
+        is paginated on its own, so ``skip`` offsets stay shallow as the dataset grows. Up to
+        ``max_workers`` shards run at once. Records are deduplicated by ``empNo``, and the
+        combined count is checked against the ``total`` of the unfiltered query so shards that
+        don't cover every employee fail loudly instead of truncating the result.
+
+        Args:
+            payload (Dict): The base request payload.
+            shards (List[Dict]): Payload overrides, one per shard.
+            page_size (int, optional): Number of records to request per page. Defaults to 100.
+            max_workers (int, optional): Maximum number of shards fetched concurrently. Defaults to 4.
+            metadata (Optional[Dict], optional): If given, receives the unfiltered query's other
+                top-level fields, such as ``total``.
+
+        Yields:
+            Dict: Individual employee records, each ``empNo`` once.
+
+        Raises:
+            APIError: If any page fails, or the shards return fewer employees than the unfiltered total.
+        """
+        unfiltered = self._fetch_page(payload, 0, 1)
+        if metadata is not None:
+            metadata.update((name, value) for name, value in unfiltered.items() if name != "employees")
+        total = unfiltered.get("total")
+        results: "queue.Queue" = queue.Queue(maxsize=2 * max_workers)
+        stop = threading.Event()
+
+        def put(item: object) -> bool:
+            # Give up once the consumer has gone away, instead of blocking forever
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def run_shard(shard: Dict) -> None:
+            try:
+                for _, employees in self.iter_pages({**payload, **shard}, page_size, max_workers=1):
+                    if not put(employees):
+                        return
+            except APIError as e:
+                put(e)
+            finally:
+                put(_SHARD_DONE)
+
+        seen: Set[str] = set()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run_shard, shard) for shard in shards]
+            try:
+                remaining = len(shards)
+                while remaining:
+                    item = results.get()
+                    if item is _SHARD_DONE:
+                        remaining -= 1
+                    elif isinstance(item, APIError):
+                        raise item
+                    else:
+                        for employee in item:
+                            emp_no = str(employee.get("empNo"))
+                            if emp_no not in seen:
+                                seen.add(emp_no)
+                                yield employee
+            finally:
+                stop.set()
+                for future in futures:
+                    future.cancel()
+
+        if isinstance(total, int):
+            if len(seen) < total:
+                raise APIError(f"Shards returned {len(seen)} employees but the unfiltered query reports {total}")
+            if len(seen) > total:
+                logging.warning(f"Shards returned {len(seen)} employees, more than the reported total of {total}")
+
+    def _fetch_page(self, payload: Dict, skip: int, take: int) -> Dict:
+        """
+        Fetch a single ``skip``/``take`` window of the query.
+
+        Args:
+            payload (Dict): The base request payload.
+            skip (int): Number of records to skip.
+            take (int): Number of records to return.
+
+        Returns:
+            Dict: The JSON response for the page.
+
+        Raises:
+            APIError: If the request fails.
+        """
+        data = self.query_page({**payload, "skip": skip, "take": take})
+        if data is None:
+            raise APIError(f"Failed to fetch page at skip={skip}")
+        return data
\ No newline at end of file
@@ -0,0 +1,127 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from src.api_client import APIClient, APIError
+
+class AsyncAPIClient:
+    """
+    An asyncio counterpart of APIClient.
+
+    Requests are delegated to a wrapped APIClient and run on worker threads, so the
+    async client shares its pooled keep-alive session and retry/backoff behaviour.
+    A semaphore bounds the number of requests in flight.
+    """
+
+    def __init__(self, client: APIClient, max_concurrency: int = 4):
+        """
+        Initialize the AsyncAPIClient around a synchronous client.
+
+        Args:
+            client (APIClient): The client whose session and retry settings are used for requests.
+            max_concurrency (int, optional): Maximum number of concurrent requests. Defaults to 4.
+        """
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def query_api(self, payload: Dict) -> Optional[Dict]:
+        """
+        Send a POST request to the API with the given payload without blocking the event loop.
+
+        Args:
+            payload (Dict): The request payload containing query parameters.
+
+        Returns:
+            Optional[Dict]: The JSON response from the API if successful, None otherwise.
+        """
+        async with self._semaphore:
+            return await asyncio.to_thread(self.client.query_api, payload)
+
+    async def query_page(self, payload: Dict) -> Optional[Dict]:
+        """
+        Fetch one page of the query without blocking the event loop, decoding the employees
+        as the response downloads (see APIClient.query_page).
+
+        Args:
+            payload (Dict): The request payload containing query parameters.
+
+        Returns:
+            Optional[Dict]: The response fields, with ``employees`` as a list, or None if the request failed.
+        """
+        async with self._semaphore:
+            return await asyncio.to_thread(self.client.query_page, payload)
+
+    async def iter_pages(self, payload: Dict, page_size: int = 100) -> AsyncIterator[Tuple[int, List[Dict]]]:
+        """
+        Fetch the full employee set page by page, yielding each page as it arrives.
+
+        Mirrors APIClient.iter_pages: the first page supplies ``total``, then the remaining
+        windows are requested concurrently with at most ``2 * max_concurrency`` pages in
+        flight or awaiting consumption.
+
+        Args:
+            payload (Dict): The base request payload; ``skip`` and ``take`` are overridden per page.
+            page_size (int, optional): Number of records to request per page. Defaults to 100.
+
+        Yields:
+            Tuple[int, List[Dict]]: The ``skip`` offset of the page and its employee records.
+
+        Raises:
+            APIError: If any page cannot be retrieved.
+        """
+        start = payload.get("skip", 0)
+        first = await self._fetch_page(payload, start, page_size)
+        employees = first.get("employees") or []
+        yield start, employees
+
+        total = first.get("total")
+        if not isinstance(total, int):
+            # No total to plan against; walk forward until the server runs out of rows
+            skip = start
+            while len(employees) == page_size:
+                skip += page_size
+                employees = (await self._fetch_page(payload, skip, page_size)).get("employees") or []
+                yield skip, employees
+            return
+
+        offsets = iter(range(start + page_size, total, page_size))
+        pending: Dict["asyncio.Task[Dict]", int] = {}
+
+        def submit_next() -> None:
+            skip = next(offsets, None)
+            if skip is not None:
+                pending[asyncio.ensure_future(self._fetch_page(payload, skip, page_size))] = skip
+
+        for _ in range(2 * self.max_concurrency):
+            submit_next()
+
+        try:
+            while pending:
+                done: Set["asyncio.Task[Dict]"]
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    skip = pending.pop(task)
+                    yield skip, task.result().get("employees") or []
+                    submit_next()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _fetch_page(self, payload: Dict, skip: int, take: int) -> Dict:
+        """
+        Fetch a single ``skip``/``take`` window of the query.
+
+        Args:
+            payload (Dict): The base request payload.
+            skip (int): Number of records to skip.
+            take (int): Number of records to return.
+
+        Returns:
+            Dict: The JSON response for the page.
+
+        Raises:
+            APIError: If the request fails.
+        """
+        data = await self.query_page({**payload, "skip": skip, "take": take})
+        if data is None:
+            raise APIError(f"Failed to fetch page at skip={skip}")
+        return data
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, NamedTuple
+from src.models import EMPLOYEE_COLUMNS
+
+def fingerprint(employee: Dict) -> str:
+    """
+    Compute a content fingerprint of the stored columns of an employee record.
+
+    Keys that are not stored in AVANTI_EMPLOYEES do not affect the fingerprint.
+
+    Args:
+        employee (Dict): An employee record.
+
+    Returns:
+        str: A hex digest that changes whenever a stored column changes.
+    """
+    values = [employee.get(column) for column in EMPLOYEE_COLUMNS]
+    encoded = json.dumps(values, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+class ChangeSet(NamedTuple):
+    """
+    The result of comparing fetched employees against the last synced state.
+    """
+
+    inserts: List[Dict]
+    updates: List[Dict]
+    unchanged: int
+    fingerprints: Dict[str, str]
+
+    @property
+    def changed(self) -> List[Dict]:
+        """
+        All records that need to be written, inserts first.
+        """
+        return self.inserts + self.updates
+
+class ChangeTracker:
+    """
+    Tracks a per-empNo content fingerprint of the rows last written to the database.
+
+    The fingerprints are kept in a local JSON state file, so an incremental run can
+    tell which fetched records are new, which changed and which are identical to what
+    is already stored, and upsert only the first two. The state file must be deleted
+    if the table is modified or recreated outside of the sync.
+    """
+
+    def __init__(self, state_file: str = "employee_state.json"):
+        """
+        Initialize the ChangeTracker with the path of its state file.
+
+        Args:
+            state_file (str, optional): Path of the JSON state file. Defaults to "employee_state.json".
+        """
+        self.state_file = state_file
+        self.fingerprints: Dict[str, str] = {}
+
+    def load(self) -> bool:
+        """
+        Load fingerprints from the state file. A missing file means an empty state.
+
+        Returns:
+            bool: True if the state was loaded or no state file exists, False otherwise.
+        """
+        try:
+            with open(self.state_file, "r") as f:
+                self.fingerprints = json.load(f)
+            return True
+        except FileNotFoundError:
+            self.fingerprints = {}
+            return True
+        except (IOError, ValueError) as e:
+            logging.error(f"Error loading sync state: {e}")
+            return False
+
+    def save(self) -> bool:
+        """
+        Write the fingerprints to the state file atomically.
+
+        Returns:
+            bool: True if the state was saved, False otherwise.
+        """
+        temp_file = f"{self.state_file}.tmp"
+        try:
+            with open(temp_file, "w") as f:
+                json.dump(self.fingerprints, f, separators=(",", ":"))
+            os.replace(temp_file, self.state_file)
+            return True
+        except IOError as e:
+            logging.error(f"Error saving sync state: {e}")
+            return False
+
+    def diff(self, employees: Iterable[Dict]) -> ChangeSet:
+        """
+        Split employees into inserts, updates and unchanged rows.
+
+        Args:
+            employees (Iterable[Dict]): The fetched employee records.
+
+        Returns:
+            ChangeSet: The records to insert and update, the number of unchanged records,
+            and the new fingerprints of the changed records.
+        """
+        inserts: List[Dict] = []
+        updates: List[Dict] = []
+        unchanged = 0
+        fingerprints: Dict[str, str] = {}
+
+        for employee in employees:
+            emp_no = str(employee["empNo"])
+            current = fingerprint(employee)
+            previous = self.fingerprints.get(emp_no)
+            if previous == current:
+                unchanged += 1
+                continue
+            fingerprints[emp_no] = current
+            (inserts if previous is None else updates).append(employee)
+
+        return ChangeSet(inserts, updates, unchanged, fingerprints)
+
+    def commit(self, changes: ChangeSet, failed_keys: Iterable[str] = ()) -> None:
+        """
+        Record the changed rows as synced. Call only after they were written to the database.
+
+        Args:
+            changes (ChangeSet): The change set that was written.
+            failed_keys (Iterable[str], optional): empNo values of rows that could not be written;
+                they keep their previous state so the next run retries them.
+        """
+        failed = set(failed_keys)
+        self.fingerprints.update(
+            (emp_no, value) for emp_no, value in changes.fingerprints.items() if emp_no not in failed
+        )
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set, TextIO
+
+def run_key(*parts: object) -> str:
+    """
+    Identify a sync configuration, so a journal is only resumed by an identical run.
+
+    Args:
+        *parts: JSON-serializable values that define the run, such as the URL and payload.
+
+    Returns:
+        str: A hex digest of the parts.
+    """
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+class CheckpointJournal:
+    """
+    An append-only journal of completed sync work, used to resume interrupted runs.
+
+    Each line is a JSON event, flushed and fsynced before the work it describes is
+    considered durable. ``page`` events hold the records of a fetched API page, keyed by
+    its ``skip`` offset, so a resumed run doesn't refetch them; ``chunk`` events hold the
+    empNo of every row in a committed database chunk. A truncated last line from a crash
+    is ignored on load. The journal is deleted once a run completes.
+
+    Attributes:
+        recovered_pages (Dict[int, List[Dict]]): Records of the pages loaded from a previous run.
+        completed_pages (Set[int]): ``skip`` offsets of every page recorded so far.
+        committed_keys (Set[str]): empNo of every row recorded as committed so far.
+    """
+
+    def __init__(self, path: str = "sync_checkpoint.jsonl"):
+        """
+        Initialize the CheckpointJournal with the path of its file.
+
+        Args:
+            path (str, optional): Path of the journal file. Defaults to "sync_checkpoint.jsonl".
+        """
+        self.path = path
+        self.recovered_pages: Dict[int, List[Dict]] = {}
+        self.completed_pages: Set[int] = set()
+        self.committed_keys: Set[str] = set()
+        self._file: Optional[TextIO] = None
+        self._lock = threading.Lock()
+
+    def start(self, key: str, resume: bool = False) -> bool:
+        """
+        Open the journal for a run, resuming the previous one if possible.
+
+        The previous journal is resumed only if ``resume`` is set and it was written by a
+        run with the same key; otherwise it is discarded and a new journal is started.
+
+        Args:
+            key (str): The run key of the current configuration (see run_key).
+            resume (bool, optional): Whether to continue from an existing journal. Defaults to False.
+
+        Returns:
+            bool: True if previous progress was loaded, False if starting from scratch.
+        """
+        resumed = resume and self._load(key)
+        if not resumed:
+            self.recovered_pages = {}
+            self.completed_pages = set()
+            self.committed_keys = set()
+        self._file = open(self.path, "a" if resumed else "w", encoding="utf-8")
+        if not resumed:
+            self._append({"event": "start", "key": key})
+        return resumed
+
+    def record_page(self, skip: int, employees: List[Dict]) -> None:
+        """
+        Durably record a fetched API page.
+
+        Args:
+            skip (int): The page's ``skip`` offset.
+            employees (List[Dict]): The page's employee records.
+        """
+        with self._lock:
+            self.completed_pages.add(skip)
+            self._append({"event": "page", "skip": skip, "employees": employees})
+
+    def record_chunk(self, keys: Iterable[str]) -> None:
+        """
+        Durably record the rows of a committed database chunk.
+
+        Args:
+            keys (Iterable[str]): The empNo of every row the chunk wrote.
+        """
+        keys = [str(key) for key in keys]
+        with self._lock:
+            self.committed_keys.update(keys)
+            self._append({"event": "chunk", "keys": keys})
+
+    def finish(self) -> None:
+        """
+        Close and delete the journal after a successful run.
+        """
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError as e:
+            logging.warning(f"Error removing checkpoint journal: {e}")
+
+    def close(self) -> None:
+        """
+        Close the journal file, keeping it for a later resume.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _append(self, event: Dict) -> None:
+        if self._file is None:
+            raise ValueError("Checkpoint journal is not started")
+        self._file.write(json.dumps(event, separators=(",", ":"), default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _load(self, key: str) -> bool:
+        """
+        Load the progress recorded by a previous run with the same key.
+
+        Returns:
+            bool: True if a matching journal was loaded, False otherwise.
+        """
+        pages: Dict[int, List[Dict]] = {}
+        committed: Set[str] = set()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return False
+        except IOError as e:
+            logging.error(f"Error reading checkpoint journal: {e}")
+            return False
+
+        for number, line in enumerate(lines):
+            try:
+                event = json.loads(line)
+            except ValueError:
+                if number == len(lines) - 1:
+                    # The run died while writing this line; the work it described is not durable
+                    break
+                logging.error(f"Corrupt checkpoint journal at line {number + 1}")
+                return False
+            if number == 0 and (event.get("event") != "start" or event.get("key") != key):
+                logging.warning("Checkpoint journal belongs to a different configuration; starting over")
+                return False
+            if event.get("event") == "page":
+                pages[event["skip"]] = event["employees"]
+            elif event.get("event") == "chunk":
+                committed.update(event["keys"])
+
+        if not lines:
+            return False
+        if lines[-1] and not lines[-1].endswith("\n"):
+            # Drop the torn line so new events start on a fresh line
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.writelines(lines[:-1])
+        self.recovered_pages = pages
+        self.completed_pages = set(pages)
+        self.committed_keys = committed
+        return True
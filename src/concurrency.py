@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Protocol
+
+class Limiter(Protocol):
+    """
+    The interface APIClient uses to bound concurrent requests, implemented by AdaptiveLimiter.
+
+    Callers acquire a slot before each request and release it with the observed latency
+    and whether the server throttled the request. ``max_limit`` is the most slots the
+    limiter will ever grant, which worker pools should be sized to.
+    """
+
+    max_limit: int
+
+    def acquire(self) -> None: ...
+
+    def release(self, latency: float, throttled: bool = False) -> None: ...
+
+class AdaptiveLimiter:
+    """
+    An adaptive concurrency limit for API requests using AIMD.
+
+    Callers acquire a slot before each request and release it with the observed latency
+    and whether the server throttled the request. Every successful, unhurried response
+    raises the limit by ``1 / limit``, so the limit grows by about one per round of
+    requests (additive increase). A 429/503, a connection failure, or a latency beyond
+    ``latency_tolerance`` times the baseline multiplies the limit by ``backoff_ratio``
+    (multiplicative decrease), at most once per baseline latency so a burst of failures
+    from one overloaded moment only counts once. The baseline is the lowest recently
+    observed latency, allowed to drift upward slowly as the server's normal speed changes.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 2.0,
+        rate_window: float = 10.0,
+    ):
+        """
+        Initialize the AdaptiveLimiter.
+
+        Args:
+            initial_limit (int, optional): Starting concurrency limit. Defaults to 4.
+            min_limit (int, optional): Lowest limit the controller may reach. Defaults to 1.
+            max_limit (int, optional): Highest limit the controller may reach. Defaults to 64.
+            backoff_ratio (float, optional): Factor applied to the limit on congestion. Defaults to 0.5.
+            latency_tolerance (float, optional): Latency, as a multiple of the baseline, above which
+                a response counts as congestion. Defaults to 2.0.
+            rate_window (float, optional): Seconds over which the request rate is measured. Defaults to 10.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.rate_window = rate_window
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._baseline: Optional[float] = None
+        self._last_decrease = float("-inf")
+        self._throttled = 0
+        self._completions: Deque[float] = deque()
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """
+        The current number of requests allowed in flight.
+        """
+        return int(self._limit)
+
+    def acquire(self) -> None:
+        """
+        Block until a request slot is available, then take it.
+        """
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, latency: float, throttled: bool = False) -> None:
+        """
+        Return a request slot and adjust the limit based on the request's outcome.
+
+        Args:
+            latency (float): The request's response time in seconds.
+            throttled (bool, optional): Whether the server signalled overload (429/503) or the
+                request failed to connect or timed out. Defaults to False.
+        """
+        now = time.monotonic()
+        with self._condition:
+            self._in_flight -= 1
+            self._completions.append(now)
+            while self._completions and now - self._completions[0] > self.rate_window:
+                self._completions.popleft()
+
+            if self._baseline is None or latency < self._baseline:
+                self._baseline = latency
+            else:
+                self._baseline += (latency - self._baseline) * 0.01
+
+            congested = throttled or latency > self._baseline * self.latency_tolerance
+            if throttled:
+                self._throttled += 1
+            if congested:
+                if now - self._last_decrease >= self._baseline:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff_ratio)
+                    self._last_decrease = now
+            else:
+                self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return the current limit, requests in flight, throttle count and achieved request rate.
+        """
+        with self._condition:
+            if len(self._completions) > 1:
+                span = max(self._completions[-1] - self._completions[0], 1e-9)
+                rate = (len(self._completions) - 1) / span
+            else:
+                rate = 0.0
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "throttled": self._throttled,
+                "baseline_latency": self._baseline or 0.0,
+                "requests_per_second": rate,
+            }
@@ -1,8 +1,26 @@
 import csv
-from typing import Dict
+import gzip
+import io
+import itertools
+import os
+import shutil
+import stat
+import tempfile
+from typing import IO, Dict, Iterable, List, Optional, Tuple, Union, cast
 import logging
+from src import metrics
+from src.models import EMPLOYEE_COLUMNS, EmployeeStore
 
-def save_to_csv(data: Dict, filename: str = "employees.csv") -> bool:
+try:
+    import zstandard  # type: ignore[import-not-found]
+except ImportError:  # zstd output is optional
+    zstandard = None
+
+# Compression formats accepted by write_csv_stream
+COMPRESSIONS = (None, "gzip", "zstd")
+
+@metrics.traced("csv.save_to_csv")
+def save_to_csv(data: Union[Dict, EmployeeStore], filename: str = "employees.csv") -> bool:
     """
     Save the given employee data to a CSV file.
 
@@ -10,7 +28,8 @@ def save_to_csv(data: Dict, filename: str = "employees.csv") -> bool:
     It handles file creation, writing headers, and row data.
 
     Args:
-        data (Dict): A dictionary containing an 'employees' key with a list of employee records.
+        data (Union[Dict, EmployeeStore]): An EmployeeStore, or a dictionary containing an 'employees' key
+            with a list of employee records.
         filename (str, optional): The name of the CSV file to create. Defaults to "employees.csv".
 
     Returns:
@@ -19,26 +38,276 @@ def save_to_csv(data: Dict, filename: str = "employees.csv") -> bool:
     Raises:
         IOError: If there's an issue writing to the file.
     """
-    # Check if the data is valid and contains employee records
-    if not data or "employees" not in data or not data["employees"]:
-        logging.warning("No data to save to CSV")
-        return False
+    if isinstance(data, EmployeeStore):
+        # A store always has the table's columns
+        if not len(data):
+            logging.warning("No data to save to CSV")
+            return False
+        fieldnames = EMPLOYEE_COLUMNS
+        employees: Iterable[Dict] = data.iter_dicts()
+    else:
+        # Check if the data is valid and contains employee records
+        if not data or "employees" not in data or not data["employees"]:
+            logging.warning("No data to save to CSV")
+            return False
+        # Assume all employees have the same structure; use keys from the first employee as fieldnames
+        fieldnames = data["employees"][0].keys()
+        employees = data["employees"]
 
     try:
         with open(filename, 'w', newline='') as csvfile:
-            # Assume all employees have the same structure; use keys from the first employee as fieldnames
-            fieldnames = data["employees"][0].keys()
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             
             # Write the header row
             writer.writeheader()
             
             # Write all employee records
-            writer.writerows(data["employees"])
+            writer.writerows(employees)
         
         logging.info(f"Data successfully saved to {filename}")
+        _record_output("csv.save_to_csv", len(data) if isinstance(data, EmployeeStore) else len(data["employees"]), filename)
         return True
     except IOError as e:
         # Log any file I/O errors
         logging.error(f"Error saving to CSV: {e}")
-        return False
\ No newline at end of file
+        return False
+
+@metrics.traced("csv.write_csv_stream")
+def write_csv_stream(
+    records: Union[Iterable[Dict], EmployeeStore],
+    filename: str = "employees.csv",
+    compression: Optional[str] = None,
+    append: bool = False,
+    buffer_size: int = 1024 * 1024,
+) -> Optional[int]:
+    """
+    Stream employee records to a CSV file without holding them in memory.
+
+    Records are consumed one at a time and written through large buffered writes. The
+    header is the union of the keys seen across all records, in first-seen order, so a
+    record with new keys extends the schema instead of failing; earlier rows get empty
+    values for the new columns. Output is written to a temporary file next to
+    ``filename`` and atomically renamed over it, so readers never see a partial file.
+
+    Rows are written straight to that file, under the fields of an EmployeeStore or the keys
+    of the first record. Only if a later record adds keys are it and the following rows
+    staged, and the file rewritten once under the wider header.
+
+    In append mode, new rows are added after the rows of an existing file. If the schema
+    is unchanged, the existing bytes are copied as-is and the new rows are appended as a
+    separate gzip member or zstd frame, which standard readers decode as one stream.
+
+    Args:
+        records (Union[Iterable[Dict], EmployeeStore]): The employee records to write.
+        filename (str, optional): The CSV file to write. Defaults to "employees.csv".
+        compression (Optional[str], optional): None, "gzip" or "zstd". zstd requires the
+            zstandard package. Defaults to None.
+        append (bool, optional): Add to an existing file instead of replacing it. Defaults to False.
+        buffer_size (int, optional): Size of the write buffers in bytes. Defaults to 1 MiB.
+
+    Returns:
+        Optional[int]: The number of records written, or None if writing failed.
+
+    Raises:
+        ValueError: If the compression format is unknown or unavailable.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression: {compression}")
+    if compression == "zstd" and zstandard is None:
+        raise ValueError("zstd compression requires the zstandard package")
+
+    header: Optional[List[str]] = None
+    if isinstance(records, EmployeeStore):
+        header = records.fields()
+        records = records.iter_records()
+    else:
+        # The first record's keys give the header, unless a later record brings new ones
+        records = iter(records)
+        first = next(records, None)
+        if first is not None:
+            header = list(first)
+            records = itertools.chain([first], records)
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    temp_paths: List[str] = []
+    try:
+        existing_fields = _read_header(filename, compression) if append and os.path.exists(filename) else None
+        fields = list(existing_fields or [])
+        known = set(fields)
+        fields.extend(field for field in header or [] if field not in known)
+
+        out_fd, out_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        temp_paths.append(out_path)
+        with open(out_fd, "wb", buffering=buffer_size) as out:
+            if existing_fields is not None and fields == existing_fields:
+                with open(filename, "rb") as existing:
+                    shutil.copyfileobj(existing, out, buffer_size)
+                with _open_encoder(out, compression) as text:
+                    rows, staged_path = _write_rows(records, text, fields, directory, temp_paths, buffer_size)
+            else:
+                with _open_encoder(out, compression) as text:
+                    writer = csv.writer(text)
+                    writer.writerow(fields)
+                    if existing_fields is not None:
+                        # New columns: existing rows must be rewritten with the wider header
+                        with open(filename, "rb") as existing_raw, _open_decoder(existing_raw, compression) as existing:
+                            reader = csv.reader(existing)
+                            next(reader, None)
+                            _copy_padded(reader, writer, len(fields))
+                    rows, staged_path = _write_rows(records, text, fields, directory, temp_paths, buffer_size)
+            out.flush()
+            os.fsync(out.fileno())
+
+        if staged_path is not None:
+            # A record added columns after rows were written; rewrite everything under the final header
+            final_fd, final_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            temp_paths.append(final_path)
+            with open(final_fd, "wb", buffering=buffer_size) as final:
+                with _open_encoder(final, compression) as text:
+                    writer = csv.writer(text)
+                    writer.writerow(fields)
+                    with open(out_path, "rb") as written_raw, _open_decoder(written_raw, compression) as written:
+                        reader = csv.reader(written)
+                        next(reader, None)
+                        _copy_padded(reader, writer, len(fields))
+                    with open(staged_path, newline="", encoding="utf-8") as staged:
+                        _copy_padded(csv.reader(staged), writer, len(fields))
+                final.flush()
+                os.fsync(final.fileno())
+            out_path = final_path
+
+        _copy_mode(filename, out_path)
+        os.replace(out_path, filename)
+        logging.info(f"{rows} records successfully saved to {filename}")
+        _record_output("csv.write_csv_stream", rows, filename)
+        return rows
+    except (IOError, csv.Error) as e:
+        logging.error(f"Error saving to CSV: {e}")
+        return None
+    finally:
+        for path in temp_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+def _copy_mode(filename: str, temp_path: str) -> None:
+    """
+    Give a temporary file the permissions ``filename`` has, or would get if created with open().
+
+    mkstemp creates files readable by their owner only, which would otherwise stick to the export.
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(filename).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    os.chmod(temp_path, mode)
+
+def _record_output(operation: str, records: int, filename: str) -> None:
+    """
+    Count the records and file bytes written by an export, if metrics are enabled.
+    """
+    if metrics.active() is None:
+        return
+    metrics.increment("sync_records_total", records, operation=operation)
+    metrics.increment("sync_bytes_total", os.path.getsize(filename), operation=operation)
+    metrics.annotate(records=records, filename=filename)
+
+def _write_rows(
+    records: Iterable[Dict], out: IO[str], fields: List[str], directory: str, temp_paths: List[str], buffer_size: int
+) -> Tuple[int, Optional[str]]:
+    """
+    Write records as CSV rows, extending ``fields`` in place when new keys appear.
+
+    Rows go straight to ``out`` while they fit the header. Once a record brings a new key,
+    it and every later row are staged uncompressed in a temporary file in ``directory``
+    instead, since the header already written no longer fits. The file is added to ``temp_paths``.
+
+    Returns:
+        Tuple[int, Optional[str]]: The number of rows written, and the path of the staged
+        rows, or None if the header never grew.
+    """
+    known = set(fields)
+    writer = csv.DictWriter(out, fieldnames=fields)
+    staged: Optional[IO[str]] = None
+    rows = 0
+    try:
+        for record in records:
+            new_fields = [key for key in record if key not in known]
+            if new_fields:
+                fields.extend(new_fields)
+                known.update(new_fields)
+                if staged is None:
+                    staged_fd, staged_path = tempfile.mkstemp(dir=directory, suffix=".body")
+                    temp_paths.append(staged_path)
+                    staged = open(staged_fd, "w", newline="", encoding="utf-8", buffering=buffer_size)
+                    writer = csv.DictWriter(staged, fieldnames=fields)
+            writer.writerow(record)
+            rows += 1
+    finally:
+        if staged is not None:
+            staged.close()
+    return rows, temp_paths[-1] if staged is not None else None
+
+def _copy_padded(reader: Iterable[List[str]], writer, width: int) -> None:
+    """
+    Copy CSV rows, padding short rows with empty values up to ``width`` columns.
+    """
+    for row in reader:
+        if len(row) < width:
+            row.extend([""] * (width - len(row)))
+        writer.writerow(row)
+
+def _read_header(filename: str, compression: Optional[str]) -> List[str]:
+    """
+    Read the header row of an existing, possibly compressed, CSV file.
+    """
+    with open(filename, "rb") as raw, _open_decoder(raw, compression) as text:
+        return next(csv.reader(text), [])
+
+def _open_encoder(out: IO[bytes], compression: Optional[str]) -> io.TextIOWrapper:
+    """
+    Wrap a binary file in a text stream that compresses into it. Closing the text
+    stream finishes the compressed member but leaves ``out`` open.
+    """
+    if compression == "gzip":
+        stream: IO[bytes] = cast(IO[bytes], gzip.GzipFile(fileobj=out, mode="wb"))
+    elif compression == "zstd":
+        stream = zstandard.ZstdCompressor().stream_writer(out, closefd=False)
+    else:
+        stream = cast(IO[bytes], _Unclosable(out))
+    return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+
+def _open_decoder(raw: IO[bytes], compression: Optional[str]) -> io.TextIOWrapper:
+    """
+    Wrap a binary file in a text stream that decompresses from it.
+    """
+    if compression == "gzip":
+        stream: IO[bytes] = cast(IO[bytes], gzip.GzipFile(fileobj=raw, mode="rb"))
+    elif compression == "zstd":
+        stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=False)
+    else:
+        stream = cast(IO[bytes], _Unclosable(raw))
+    return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+
+class _Unclosable(io.RawIOBase):
+    """
+    A pass-through stream whose close() leaves the wrapped file open.
+    """
+
+    def __init__(self, raw: IO[bytes]):
+        self._raw = raw
+
+    def readable(self) -> bool:
+        return self._raw.readable()
+
+    def writable(self) -> bool:
+        return self._raw.writable()
+
+    def readinto(self, buffer) -> int:
+        data = self._raw.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def write(self, data) -> int:
+        return self._raw.write(data)
\ No newline at end of file
@@ -0,0 +1,257 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from src import metrics
+
+# Sync modes, from least to most thorough; coalesced triggers keep the most thorough one
+MODES = ("incremental", "full", "full_refresh")
+
+class SyncService:
+    """
+    A resident service that runs syncs on a schedule or on demand.
+
+    The service owns a single worker thread, so syncs never overlap. A trigger that arrives
+    while a sync is running is not queued behind it as a separate run: all triggers received
+    during a run coalesce into one follow-up run, in the most thorough mode requested.
+    Scheduled runs start ``interval`` seconds after the previous run started.
+
+    Each run is instrumented with its own metrics registry; the stage timings of recent runs
+    and the last run's metrics are kept for the status endpoint.
+    """
+
+    def __init__(
+        self,
+        run_sync: Callable[[str], bool],
+        interval: Optional[float] = None,
+        scheduled_mode: str = "incremental",
+        history_size: int = 20,
+    ):
+        """
+        Initialize the SyncService.
+
+        Args:
+            run_sync (Callable[[str], bool]): Runs one sync in the given mode and returns whether it
+                succeeded; it should reuse warm clients and connection pools.
+            interval (Optional[float], optional): Seconds between scheduled runs; None runs only on
+                trigger. Defaults to None.
+            scheduled_mode (str, optional): Mode of scheduled runs. Defaults to "incremental".
+            history_size (int, optional): Number of finished runs kept for the status. Defaults to 20.
+
+        Raises:
+            ValueError: If ``scheduled_mode`` is not one of MODES.
+        """
+        if scheduled_mode not in MODES:
+            raise ValueError(f"Unknown sync mode: {scheduled_mode}")
+        self.run_sync = run_sync
+        self.interval = interval
+        self.scheduled_mode = scheduled_mode
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self.coalesced = 0
+        self.last_metrics: Optional[metrics.Metrics] = None
+        self._pending: Optional[str] = None
+        self._current: Optional[Dict[str, Any]] = None
+        self._next_run: Optional[float] = time.time() if interval is not None else None
+        self._stopping = False
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Start the worker thread.
+        """
+        self._worker = threading.Thread(target=self._run_loop, name="sync-worker", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop scheduling runs and wait for the current run, if any, to finish.
+
+        Args:
+            timeout (Optional[float], optional): Maximum seconds to wait for the worker. Defaults to None.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def trigger(self, mode: str = "incremental") -> bool:
+        """
+        Request a sync as soon as possible.
+
+        Args:
+            mode (str, optional): One of MODES. Defaults to "incremental".
+
+        Returns:
+            bool: True if a new run was scheduled, False if the request was coalesced into one
+            that is already pending.
+
+        Raises:
+            ValueError: If ``mode`` is not one of MODES.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown sync mode: {mode}")
+        with self._condition:
+            coalesced = self._pending is not None
+            if coalesced:
+                self.coalesced += 1
+                if MODES.index(mode) > MODES.index(self._pending):
+                    self._pending = mode
+            else:
+                self._pending = mode
+            self._condition.notify_all()
+            return not coalesced
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Return the current state, the pending request, the schedule and recent run timings.
+        """
+        with self._condition:
+            return {
+                "state": "running" if self._current is not None else "idle",
+                "current": dict(self._current) if self._current is not None else None,
+                "pending": self._pending,
+                "next_run": self._next_run,
+                "interval": self.interval,
+                "coalesced": self.coalesced,
+                "runs": list(self.history),
+            }
+
+    def _run_loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopping and not self._due():
+                    self._condition.wait(self._wait_time())
+                if self._stopping:
+                    return
+                mode = self._pending or self.scheduled_mode
+                self._pending = None
+                now = time.time()
+                if self.interval is not None:
+                    self._next_run = now + self.interval
+                self._current = {"run_id": uuid.uuid4().hex, "mode": mode, "started": now}
+                run = self._current
+            self._run_once(run)
+
+    def _due(self) -> bool:
+        return self._pending is not None or (self._next_run is not None and time.time() >= self._next_run)
+
+    def _wait_time(self) -> Optional[float]:
+        return None if self._next_run is None else max(self._next_run - time.time(), 0.0)
+
+    def _run_once(self, run: Dict[str, Any]) -> None:
+        """
+        Run one sync under its own metrics registry and record its outcome and stage timings.
+        """
+        registry = metrics.enable(run["run_id"])
+        start = time.perf_counter()
+        try:
+            success = bool(self.run_sync(run["mode"]))
+        except Exception as e:
+            logging.error(f"Sync run {run['run_id']} failed: {e}")
+            success = False
+        finally:
+            metrics.disable()
+        stages = {
+            span["name"]: round(span["duration"], 4)
+            for span in registry.spans
+            if span["parent_id"] is None and span["name"].startswith("sync.")
+        }
+        finished = {**run, "duration": round(time.perf_counter() - start, 4), "success": success, "stages": stages}
+        with self._condition:
+            self.last_metrics = registry
+            self.history.append(finished)
+            self._current = None
+        logging.info(f"Sync run {run['run_id']} ({run['mode']}) finished in {finished['duration']}s: success={success}")
+
+class StatusServer:
+    """
+    A small HTTP endpoint for a SyncService.
+
+    ``GET /status`` returns the service status as JSON, ``GET /metrics`` the last run's
+    metrics in the Prometheus text format, and ``POST /trigger?mode=...`` requests a run.
+    """
+
+    def __init__(self, service: SyncService, host: str = "127.0.0.1", port: int = 8080):
+        """
+        Initialize the StatusServer.
+
+        Args:
+            service (SyncService): The service to report on and trigger.
+            host (str, optional): Interface to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on; 0 picks a free one. Defaults to 8080.
+        """
+        self.service = service
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """
+        The host and port the server listens on.
+        """
+        host, port = self._server.server_address[:2]
+        if isinstance(host, (bytes, bytearray)):
+            host = host.decode()
+        return host, port
+
+    def start(self) -> None:
+        """
+        Serve requests in a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, name="sync-status", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop serving requests.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self) -> type:
+        service = self.service
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                path = urlparse(self.path).path
+                if path == "/status":
+                    self._reply(200, json.dumps(service.status(), default=str), "application/json")
+                elif path == "/metrics":
+                    registry = service.last_metrics
+                    self._reply(200, registry.to_prometheus() if registry else "", "text/plain; version=0.0.4")
+                else:
+                    self._reply(404, '{"error": "not found"}', "application/json")
+
+            def do_POST(self) -> None:
+                url = urlparse(self.path)
+                if url.path != "/trigger":
+                    self._reply(404, '{"error": "not found"}', "application/json")
+                    return
+                mode = parse_qs(url.query).get("mode", ["incremental"])[0]
+                try:
+                    scheduled = service.trigger(mode)
+                except ValueError as e:
+                    self._reply(400, json.dumps({"error": str(e)}), "application/json")
+                    return
+                self._reply(202, json.dumps({"scheduled": scheduled, "mode": mode}), "application/json")
+
+            def _reply(self, status: int, body: str, content_type: str) -> None:
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: object) -> None:
+                logging.debug(f"Status server: {format % args}")
+
+        return Handler
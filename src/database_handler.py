@@ -1,7 +1,229 @@
 import mysql.connector
-from mysql.connector import Error
-from typing import Dict, Optional
+import mysql.connector.pooling
+from mysql.connector import Error, InterfaceError, OperationalError
+from mysql.connector.abstracts import MySQLCursorAbstract
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union, cast
+import csv
 import logging
+import os
+import queue
+import threading
+import time
+import zlib
+from src import metrics
+from src.models import EMPLOYEE_COLUMNS, EmployeeStore
+
+# Name of the managed employee table
+TABLE_NAME = "AVANTI_EMPLOYEES"
+
+# Secondary indexes of the managed schema. InnoDB appends the primary key to every
+# secondary index, so each of these also serves keyset pagination by empNo within a filter.
+SECONDARY_INDEXES = {
+    "idx_surname": ("surname", "givenName"),
+    "idx_position_active": ("positionName", "active"),
+    "idx_active": ("active",),
+}
+
+
+def _index_definitions() -> str:
+    """
+    Build the INDEX clauses of SECONDARY_INDEXES for a CREATE TABLE statement.
+    """
+    return "".join(
+        f",\n            INDEX {name} ({', '.join(columns)})" for name, columns in SECONDARY_INDEXES.items()
+    )
+
+def _add_indexes_clause(names: Iterable[str]) -> str:
+    """
+    Build the ADD INDEX clauses of an ALTER TABLE statement for the given indexes.
+    """
+    return ", ".join(f"ADD INDEX {name} ({', '.join(SECONDARY_INDEXES[name])})" for name in names)
+
+def _create_table_query(table: str, indexes: bool = True) -> str:
+    """
+    Build the CREATE TABLE statement for an employee table with the given name.
+    """
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            empNo VARCHAR(255) PRIMARY KEY,
+            givenName VARCHAR(255),
+            surname VARCHAR(255),
+            preferredName VARCHAR(255),
+            initial VARCHAR(10),
+            positionName VARCHAR(255),
+            positionNameFr VARCHAR(255),
+            photoRevision INT,
+            active BOOLEAN,
+            email VARCHAR(255){_index_definitions() if indexes else ""}
+        )
+        """
+
+def _prepared_insert_query(table: str, rows: int, columns: Sequence[str] = EMPLOYEE_COLUMNS) -> str:
+    """
+    Build a multi-row upsert statement with ``?`` placeholders for server-side preparation.
+    """
+    placeholders = f"({', '.join('?' for _ in columns)})"
+    return f"""
+        INSERT INTO {table}
+        ({', '.join(columns)})
+        VALUES {', '.join(placeholders for _ in range(rows))}
+        {_upsert_clause(columns)}
+        """
+
+def _upsert_clause(columns: Sequence[str] = EMPLOYEE_COLUMNS) -> str:
+    """
+    Build the ON DUPLICATE KEY UPDATE clause that overwrites the given non-key columns.
+
+    Columns that are not inserted must not be assigned, or existing rows would lose their values.
+    """
+    assignments = ",\n        ".join(f"{column} = VALUES({column})" for column in columns if column != "empNo")
+    return f"ON DUPLICATE KEY UPDATE\n        {assignments or 'empNo = empNo'}"
+
+def _insert_query(table: str, columns: Sequence[str] = EMPLOYEE_COLUMNS) -> str:
+    """
+    Build the parameterized upsert statement for an employee table with the given name.
+    """
+    values = ", ".join(f"%({column})s" for column in columns)
+    return f"""
+        INSERT INTO {table}
+        ({', '.join(columns)})
+        VALUES ({values})
+        {_upsert_clause(columns)}
+        """
+
+class BatchStats(NamedTuple):
+    """
+    Outcome of writing one chunk of records with DatabaseHandler.write_batches.
+    """
+
+    # Position of the chunk in the write; ``index`` would shadow tuple.index
+    chunk: int
+    rows: int
+    bytes: int
+    written: int
+    failed_keys: List[str]
+    seconds: float
+
+def _row_size(record: Dict) -> int:
+    """
+    Estimate the number of bytes a record adds to a multi-row INSERT statement.
+    """
+    # Each value is quoted and comma-separated, hence the per-column overhead
+    return sum(len(str(record.get(column))) + 3 for column in EMPLOYEE_COLUMNS) + 2
+
+def _chunk_records(records: Iterable[Dict], batch_rows: int, batch_bytes: int) -> Iterator[Tuple[List[Dict], int]]:
+    """
+    Group records into chunks bounded by row count and estimated statement size.
+
+    A single record larger than ``batch_bytes`` still forms a chunk of its own.
+
+    Yields:
+        Tuple[List[Dict], int]: The records of a chunk and their estimated size in bytes.
+    """
+    chunk: List[Dict] = []
+    size = 0
+    for record in records:
+        row_size = _row_size(record)
+        if chunk and (len(chunk) >= batch_rows or size + row_size > batch_bytes):
+            yield chunk, size
+            chunk, size = [], 0
+        chunk.append(record)
+        size += row_size
+    if chunk:
+        yield chunk, size
+
+def _select_query(
+    table: str,
+    position_name: Optional[str],
+    active: Optional[bool],
+    surname_prefix: Optional[str],
+    after: Optional[str],
+    limit: int,
+) -> Tuple[str, List]:
+    """
+    Build a filtered keyset page query over an employee table and its parameters.
+    """
+    conditions: List[str] = []
+    params: List = []
+    if position_name is not None:
+        conditions.append("positionName = %s")
+        params.append(position_name)
+    if active is not None:
+        conditions.append("active = %s")
+        params.append(active)
+    if surname_prefix:
+        # A prefix LIKE can use idx_surname; escape the pattern characters in the prefix
+        escaped = surname_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        conditions.append("surname LIKE %s")
+        params.append(f"{escaped}%")
+    if after is not None:
+        conditions.append("empNo > %s")
+        params.append(after)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    params.append(limit)
+    return f"SELECT {', '.join(EMPLOYEE_COLUMNS)} FROM {table} {where} ORDER BY empNo LIMIT %s", params
+
+def partition_for(emp_no: object, partitions: int) -> int:
+    """
+    Map an empNo to a writer partition.
+
+    A stable hash is used so the same key always lands on the same partition,
+    independent of Python's per-process hash randomization.
+    """
+    return zlib.crc32(str(emp_no).encode("utf-8")) % partitions
+
+# Marks the end of a writer partition's record stream
+_END = None
+
+# MySQL accepts at most this many placeholders in one prepared statement
+_MAX_PREPARED_PARAMS = 65535
+
+# Hosts reached without crossing the network, where protocol compression only costs CPU
+_LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+class _PreparedUpsert:
+    """
+    Upserts chunks through server-side prepared multi-row statements.
+
+    One statement is prepared per distinct chunk size, on first use, and reused for every
+    later chunk of that size, so full chunks share a single statement; rows are sent in the
+    binary protocol instead of as SQL text that the server has to parse.
+    """
+
+    def __init__(
+        self, connection: mysql.connector.MySQLConnection, table: str, columns: Sequence[str] = EMPLOYEE_COLUMNS
+    ):
+        self.connection = connection
+        self.table = table
+        self.columns = columns
+        self._statements: Dict[int, Tuple[str, MySQLCursorAbstract]] = {}
+
+    def __call__(self, rows: List[Dict]) -> None:
+        step = _MAX_PREPARED_PARAMS // len(self.columns)
+        for start in range(0, len(rows), step):
+            part = rows[start:start + step]
+            query, cursor = self._statement(len(part))
+            cursor.execute(query, tuple(row.get(column) for row in part for column in self.columns))
+
+    def close(self) -> None:
+        """
+        Close the prepared statements.
+        """
+        for _, cursor in self._statements.values():
+            try:
+                cursor.close()
+            except Error as e:
+                logging.warning(f"Error closing prepared statement: {e}")
+        self._statements.clear()
+
+    def _statement(self, rows: int) -> Tuple[str, MySQLCursorAbstract]:
+        # The cursor reuses its prepared statement only when given the same query object
+        if rows not in self._statements:
+            self._statements[rows] = (
+                _prepared_insert_query(self.table, rows, self.columns), self.connection.cursor(prepared=True)
+            )
+        return self._statements[rows]
 
 class DatabaseHandler:
     """
@@ -11,7 +233,20 @@ class DatabaseHandler:
     for creating tables and inserting employee data.
     """
 
-    def __init__(self, host: str, user: str, password: str, database: str):
+    def __init__(
+        self,
+        host: str,
+        user: str,
+        password: str,
+        database: str,
+        allow_local_infile: bool = False,
+        pool_size: Optional[int] = None,
+        pool: Optional[mysql.connector.pooling.MySQLConnectionPool] = None,
+        use_pure: Optional[bool] = None,
+        compress: Optional[bool] = False,
+        prepared_statements: bool = False,
+        load_session: bool = False,
+    ):
         """
         Initialize the DatabaseHandler with connection parameters.
 
@@ -20,18 +255,58 @@ class DatabaseHandler:
             user (str): The database user.
             password (str): The database password.
             database (str): The name of the database to use.
+            allow_local_infile (bool, optional): Allow LOAD DATA LOCAL INFILE on connections,
+                as required by bulk_load_csv. Defaults to False.
+            pool_size (Optional[int], optional): If set, connect() hands out connections from a
+                mysql.connector pool of this size (at most 32) instead of opening new ones.
+                Defaults to None.
+            pool (Optional[mysql.connector.pooling.MySQLConnectionPool], optional): A pool shared with
+                handlers of other databases on the same server and account. Connections borrowed from
+                it are switched to ``database``. Overrides ``pool_size``. Defaults to None.
+            use_pure (Optional[bool], optional): False selects the C extension connection class, which
+                parses and serializes packets in C; True the pure Python one. None keeps the connector's
+                default. Falls back to pure Python if the C extension isn't installed. Defaults to None.
+            compress (Optional[bool], optional): Compress the client/server protocol, which pays off
+                when the server is far away. None enables it for every host but the local one.
+                Defaults to False.
+            prepared_statements (bool, optional): Upsert through server-side prepared statements in
+                the binary protocol instead of SQL text. Defaults to False.
+            load_session (bool, optional): Tune the session while write_batches runs: autocommit,
+                unique_checks and foreign_key_checks are turned off and restored afterwards. Upserts
+                still match on the primary key, which is always checked. Defaults to False.
         """
-        self.config = {
+        self.config: Dict[str, Any] = {
             "host": host,
             "user": user,
             "password": password,
             "database": database
         }
+        if allow_local_infile:
+            self.config["allow_local_infile"] = True
+        if use_pure is False and not getattr(mysql.connector, "HAVE_CEXT", False):
+            logging.warning("MySQL Connector C extension is not installed; using the pure Python connection")
+            use_pure = True
+        if use_pure is not None:
+            self.config["use_pure"] = use_pure
+        if compress is None:
+            compress = host not in _LOCAL_HOSTS
+        if compress:
+            self.config["compress"] = True
+        self.prepared_statements = prepared_statements
+        self.load_session = load_session
+        self.pool_size = pool.pool_size if pool is not None else pool_size
+        self._pool: Optional[mysql.connector.pooling.MySQLConnectionPool] = pool
+        self._shared_pool = pool is not None
+        self._pool_lock = threading.Lock()
 
+    @metrics.traced("db.connect")
     def connect(self) -> Optional[mysql.connector.MySQLConnection]:
         """
         Establish a connection to the MySQL database.
 
+        In pooled mode the connection is borrowed from the pool, which is created on first
+        use, and closing it returns it to the pool.
+
         Returns:
             Optional[mysql.connector.MySQLConnection]: A database connection object if successful, None otherwise.
 
@@ -39,19 +314,47 @@ class DatabaseHandler:
             mysql.connector.Error: If connection fails.
         """
         try:
+            if self.pool_size:
+                connection = self._get_pool().get_connection()
+                if self._shared_pool:
+                    # The previous borrower may have used another database
+                    try:
+                        connection.cmd_init_db(self.config["database"])
+                    except Error:
+                        connection.close()
+                        raise
+                # Pooled connections proxy every MySQLConnection method
+                return cast(mysql.connector.MySQLConnection, connection)
             return mysql.connector.connect(**self.config)
         except Error as e:
             logging.error(f"Error connecting to MySQL: {e}")
             return None
 
-    def create_table(self, connection: mysql.connector.MySQLConnection) -> bool:
+    def _get_pool(self) -> mysql.connector.pooling.MySQLConnectionPool:
+        """
+        Return the connection pool, creating it on first use. Only called once ``pool_size`` is set.
+        """
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = mysql.connector.pooling.MySQLConnectionPool(
+                    pool_name=f"employees_{id(self):x}", pool_size=cast(int, self.pool_size), **self.config
+                )
+            return self._pool
+
+    @metrics.traced("db.create_table")
+    def create_table(
+        self, connection: mysql.connector.MySQLConnection, table: str = TABLE_NAME, indexes: bool = True
+    ) -> bool:
         """
         Create the AVANTI_EMPLOYEES table if it doesn't exist.
 
         This method defines the schema for the employee table and executes the CREATE TABLE query.
+        Tables created before the secondary indexes existed are upgraded by migrate_indexes.
 
         Args:
             connection (mysql.connector.MySQLConnection): An active database connection.
+            table (str, optional): Name of the table to create. Defaults to AVANTI_EMPLOYEES.
+            indexes (bool, optional): Whether to define the secondary indexes. Defaults to True.
 
         Returns:
             bool: True if the table was created successfully or already exists, False otherwise.
@@ -59,20 +362,7 @@ class DatabaseHandler:
         Raises:
             mysql.connector.Error: If there's an error executing the SQL query.
         """
-        create_table_query = """
-        CREATE TABLE IF NOT EXISTS AVANTI_EMPLOYEES (
-            empNo VARCHAR(255) PRIMARY KEY,
-            givenName VARCHAR(255),
-            surname VARCHAR(255),
-            preferredName VARCHAR(255),
-            initial VARCHAR(10),
-            positionName VARCHAR(255),
-            positionNameFr VARCHAR(255),
-            photoRevision INT,
-            active BOOLEAN,
-            email VARCHAR(255)
-        )
-        """
+        create_table_query = _create_table_query(table, indexes)
         try:
             with connection.cursor() as cursor:
                 cursor.execute(create_table_query)
@@ -81,7 +371,45 @@ class DatabaseHandler:
             logging.error(f"Error creating table: {e}")
             return False
 
-    def insert_data(self, connection: mysql.connector.MySQLConnection, data: Dict) -> bool:
+    @metrics.traced("db.migrate_indexes")
+    def migrate_indexes(self, connection: mysql.connector.MySQLConnection, table: str = TABLE_NAME) -> bool:
+        """
+        Add any secondary indexes missing from an existing table, without blocking writers.
+
+        Existing indexes are read from information_schema, so this is a single cheap query
+        when the table is up to date. Missing indexes are added in one ALTER TABLE with
+        ``ALGORITHM=INPLACE, LOCK=NONE``, which builds them online while reads and writes
+        continue; the statement fails rather than silently locking the table if the server
+        can't do that.
+
+        Args:
+            connection (mysql.connector.MySQLConnection): An active database connection.
+            table (str, optional): Name of the table to migrate. Defaults to AVANTI_EMPLOYEES.
+
+        Returns:
+            bool: True if the table has every secondary index, False otherwise.
+        """
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+                    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+                    """,
+                    (table,),
+                )
+                existing = {row[0] for row in cast(List[Tuple[str]], cursor.fetchall())}
+                missing = [name for name in SECONDARY_INDEXES if name not in existing]
+                if missing:
+                    logging.info(f"Adding indexes {', '.join(missing)} to {table}...")
+                    cursor.execute(f"ALTER TABLE {table} {_add_indexes_clause(missing)}, ALGORITHM=INPLACE, LOCK=NONE")
+            return True
+        except Error as e:
+            logging.error(f"Error adding indexes: {e}")
+            return False
+
+    @metrics.traced("db.insert_data")
+    def insert_data(self, connection: mysql.connector.MySQLConnection, data: Union[Dict, EmployeeStore]) -> bool:
         """
         Insert or update employee data in the AVANTI_EMPLOYEES table.
 
@@ -90,7 +418,8 @@ class DatabaseHandler:
 
         Args:
             connection (mysql.connector.MySQLConnection): An active database connection.
-            data (Dict): The data to insert, expected to have an 'employees' key with a list of employee records.
+            data (Union[Dict, EmployeeStore]): The data to insert, either an EmployeeStore or a dict with an
+                'employees' key holding a list of employee records.
 
         Returns:
             bool: True if the data was inserted successfully, False otherwise.
@@ -98,28 +427,542 @@ class DatabaseHandler:
         Raises:
             mysql.connector.Error: If there's an error executing the SQL query.
         """
-        insert_query = """
-        INSERT INTO AVANTI_EMPLOYEES 
-        (empNo, givenName, surname, preferredName, initial, positionName, positionNameFr, photoRevision, active, email) 
-        VALUES (%(empNo)s, %(givenName)s, %(surname)s, %(preferredName)s, %(initial)s, %(positionName)s, %(positionNameFr)s, %(photoRevision)s, %(active)s, %(email)s)
-        ON DUPLICATE KEY UPDATE
-        givenName = VALUES(givenName),
-        surname = VALUES(surname),
-        preferredName = VALUES(preferredName),
-        initial = VALUES(initial),
-        positionName = VALUES(positionName),
-        positionNameFr = VALUES(positionNameFr),
-        photoRevision = VALUES(photoRevision),
-        active = VALUES(active),
-        email = VALUES(email)
-        """
+        insert_query = _insert_query(TABLE_NAME)
+        employees = list(data.iter_dicts()) if isinstance(data, EmployeeStore) else data["employees"]
         try:
             with connection.cursor() as cursor:
                 # Execute the query for each employee record
-                cursor.executemany(insert_query, data["employees"])
+                cursor.executemany(insert_query, employees)
             connection.commit()
+            metrics.increment("sync_records_total", len(employees), operation="db.insert_data")
             return True
         except Error as e:
             logging.error(f"Error inserting data: {e}")
             connection.rollback()
-            return False
\ No newline at end of file
+            return False
+
+    @metrics.traced("db.bulk_load_csv")
+    def bulk_load_csv(self, connection: mysql.connector.MySQLConnection, filename: str, table: str = TABLE_NAME) -> bool:
+        """
+        Upsert a CSV export into the AVANTI_EMPLOYEES table using LOAD DATA LOCAL INFILE.
+
+        The file is streamed by the server into a temporary staging table, then merged into
+        AVANTI_EMPLOYEES with a single set-based INSERT ... SELECT ... ON DUPLICATE KEY UPDATE.
+        Columns are matched by the CSV header; unknown columns are ignored and empty fields
+        are stored as NULL; table columns missing from the header keep their stored values.
+        The connection must allow local infile (see ``allow_local_infile``).
+
+        Args:
+            connection (mysql.connector.MySQLConnection): An active database connection.
+            filename (str): Path of a CSV file written by save_to_csv.
+            table (str, optional): Name of the table to load into. Defaults to AVANTI_EMPLOYEES.
+
+        Returns:
+            bool: True if the data was loaded successfully, False otherwise.
+
+        Raises:
+            mysql.connector.Error: If there's an error executing the SQL queries.
+        """
+        staging_table = f"{table}_STAGING"
+        try:
+            with open(filename, newline="") as csvfile:
+                header = next(csv.reader(csvfile), [])
+        except IOError as e:
+            logging.error(f"Error reading CSV header: {e}")
+            return False
+
+        # Read every field into a user variable so values can be converted on the way in
+        targets: List[str] = []
+        assignments: List[str] = []
+        for field in header:
+            if field in EMPLOYEE_COLUMNS and field not in targets:
+                targets.append(field)
+                if field == "active":
+                    # csv writes Python booleans as True/False
+                    assignments.append(
+                        "active = CASE @active WHEN 'True' THEN 1 WHEN 'False' THEN 0 ELSE NULLIF(@active, '') END"
+                    )
+                else:
+                    assignments.append(f"{field} = NULLIF(@{field}, '')")
+        if "empNo" not in targets:
+            logging.error(f"CSV file {filename} has no empNo column")
+            return False
+        variables = ", ".join(f"@{field}" if field in targets else "@_ignored" for field in header)
+
+        columns = ", ".join(targets)
+        load_query = f"""
+        LOAD DATA LOCAL INFILE %s
+        INTO TABLE {staging_table}
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+        LINES TERMINATED BY '\\r\\n'
+        IGNORE 1 LINES
+        ({variables})
+        SET {", ".join(assignments)}
+        """
+        merge_query = f"""
+        INSERT INTO {table} ({columns})
+        SELECT {columns} FROM {staging_table}
+        {_upsert_clause(targets)}
+        """
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging_table}")
+                cursor.execute(f"CREATE TEMPORARY TABLE {staging_table} LIKE {table}")
+                cursor.execute(load_query, (filename,))
+                cursor.execute(merge_query)
+                cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging_table}")
+            connection.commit()
+            if metrics.active() is not None:
+                metrics.increment("sync_bytes_total", os.path.getsize(filename), operation="db.bulk_load_csv")
+            return True
+        except Error as e:
+            logging.error(f"Error bulk loading data: {e}")
+            connection.rollback()
+            return False
+
+    @metrics.traced("db.write_batches")
+    def write_batches(
+        self,
+        connection: mysql.connector.MySQLConnection,
+        records: Union[Iterable[Dict], EmployeeStore],
+        batch_rows: int = 1000,
+        batch_bytes: int = 4 * 1024 * 1024,
+        table: str = TABLE_NAME,
+        on_commit: Optional[Callable[[List[str]], None]] = None,
+        columns: Sequence[str] = EMPLOYEE_COLUMNS,
+    ) -> List[BatchStats]:
+        """
+        Upsert employee records in chunks, committing once per chunk.
+
+        Records are consumed lazily and grouped into chunks of at most ``batch_rows`` rows
+        and roughly ``batch_bytes`` bytes of statement text, which keeps each multi-row
+        INSERT below ``max_allowed_packet`` and releases row locks after every chunk. If a
+        chunk fails, it is rolled back and split in half until the failing rows are isolated,
+        so one bad record only costs itself. Connection errors are not split, since every
+        retry would fail the same way.
+
+        Args:
+            connection (mysql.connector.MySQLConnection): An active database connection.
+            records (Union[Iterable[Dict], EmployeeStore]): The employee records to upsert.
+            batch_rows (int, optional): Maximum rows per chunk. Defaults to 1000.
+            batch_bytes (int, optional): Approximate maximum statement size per chunk. Defaults to 4 MiB.
+            table (str, optional): Name of the table to write to. Defaults to AVANTI_EMPLOYEES.
+            on_commit (Optional[Callable[[List[str]], None]], optional): Called after each chunk with
+                the empNo of every row it committed, e.g. to record progress in a checkpoint journal.
+            columns (Sequence[str], optional): The columns to write, starting with ``empNo``; other
+                columns of existing rows are left as they are. Defaults to all columns.
+
+        Returns:
+            List[BatchStats]: Per-chunk row counts, sizes, failed keys and timings.
+        """
+        if isinstance(records, EmployeeStore):
+            records = records.iter_dicts()
+        if self.prepared_statements:
+            execute: Callable[[List[Dict]], None] = _PreparedUpsert(connection, table, columns)
+        else:
+            insert_query = _insert_query(table, columns)
+
+            def execute(rows: List[Dict]) -> None:
+                with connection.cursor() as cursor:
+                    cursor.executemany(insert_query, rows)
+
+        restore_session = self._tune_session(connection) if self.load_session else None
+        stats: List[BatchStats] = []
+        try:
+            for index, (chunk, size) in enumerate(_chunk_records(records, batch_rows, batch_bytes)):
+                start = time.perf_counter()
+                written, failed_keys = self._write_chunk(connection, execute, chunk)
+                stats.append(BatchStats(index, len(chunk), size, written, failed_keys, time.perf_counter() - start))
+                metrics.observe("db_batch_rows", len(chunk))
+                metrics.observe("db_batch_bytes", size)
+                metrics.increment("sync_records_total", written, operation="db.write_batches")
+                if failed_keys:
+                    metrics.increment("db_failed_rows_total", len(failed_keys))
+                if on_commit is not None and written:
+                    failed = set(failed_keys)
+                    on_commit([key for key in (str(row.get("empNo")) for row in chunk) if key not in failed])
+        finally:
+            if isinstance(execute, _PreparedUpsert):
+                execute.close()
+            if restore_session is not None:
+                restore_session()
+        return stats
+
+    def _tune_session(self, connection: mysql.connector.MySQLConnection) -> Callable[[], None]:
+        """
+        Turn off autocommit and per-row checks for a load, in one round trip.
+
+        The settings are changed in SQL rather than through connection properties, which
+        pooled connection wrappers don't forward.
+
+        Returns:
+            Callable[[], None]: Restores the previous session settings.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SET @sync_autocommit = @@SESSION.autocommit, "
+                "@sync_unique_checks = @@SESSION.unique_checks, "
+                "@sync_foreign_key_checks = @@SESSION.foreign_key_checks, "
+                "SESSION autocommit = 0, SESSION unique_checks = 0, SESSION foreign_key_checks = 0"
+            )
+
+        def restore() -> None:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SET SESSION autocommit = @sync_autocommit, "
+                        "SESSION unique_checks = @sync_unique_checks, "
+                        "SESSION foreign_key_checks = @sync_foreign_key_checks"
+                    )
+            except Error as e:
+                logging.error(f"Error restoring session settings: {e}")
+
+        return restore
+
+    def _write_chunk(
+        self, connection: mysql.connector.MySQLConnection, execute: Callable[[List[Dict]], None], rows: List[Dict]
+    ) -> Tuple[int, List[str]]:
+        """
+        Write and commit one chunk, bisecting it on failure to isolate bad rows.
+
+        Bisecting stops when the connection is gone, that is when the error is an interface
+        or operational one or the rollback fails too; the whole chunk is then reported failed.
+
+        Returns:
+            Tuple[int, List[str]]: The number of rows written and the empNo of every failed row.
+        """
+        try:
+            execute(rows)
+            connection.commit()
+            return len(rows), []
+        except Error as e:
+            connection_lost = isinstance(e, (InterfaceError, OperationalError))
+            try:
+                connection.rollback()
+            except Error as rollback_error:
+                logging.error(f"Error rolling back failed chunk: {rollback_error}")
+                connection_lost = True
+            if len(rows) == 1 or connection_lost:
+                logging.error(f"Error inserting {len(rows)} row(s) starting at empNo {rows[0].get('empNo')}: {e}")
+                return 0, [str(row.get("empNo")) for row in rows]
+
+        middle = len(rows) // 2
+        left_written, left_failed = self._write_chunk(connection, execute, rows[:middle])
+        right_written, right_failed = self._write_chunk(connection, execute, rows[middle:])
+        return left_written + right_written, left_failed + right_failed
+
+    @metrics.traced("db.parallel_upsert")
+    def parallel_upsert(
+        self,
+        records: Union[Iterable[Dict], EmployeeStore],
+        workers: int = 4,
+        batch_rows: int = 1000,
+        batch_bytes: int = 4 * 1024 * 1024,
+        table: str = TABLE_NAME,
+        queue_size: int = 10000,
+        on_commit: Optional[Callable[[List[str]], None]] = None,
+        columns: Sequence[str] = EMPLOYEE_COLUMNS,
+    ) -> List[BatchStats]:
+        """
+        Upsert employee records over several connections in parallel.
+
+        Records are partitioned by a stable hash of ``empNo`` across ``workers`` threads,
+        each of which runs write_batches on its own connection. Keeping every key on one
+        session means concurrent transactions never contend for the same rows, which
+        avoids deadlocks. Records are streamed to the workers through bounded queues, so
+        the input is never fully materialized. In pooled mode the pool should hold at least
+        ``workers`` connections that are not otherwise in use.
+
+        Args:
+            records (Union[Iterable[Dict], EmployeeStore]): The employee records to upsert.
+            workers (int, optional): Number of writer threads and connections. Defaults to 4.
+            batch_rows (int, optional): Maximum rows per chunk. Defaults to 1000.
+            batch_bytes (int, optional): Approximate maximum statement size per chunk. Defaults to 4 MiB.
+            table (str, optional): Name of the table to write to. Defaults to AVANTI_EMPLOYEES.
+            queue_size (int, optional): Maximum records buffered per worker. Defaults to 10000.
+            on_commit (Optional[Callable[[List[str]], None]], optional): Passed to write_batches; it is
+                called from the worker threads, so it must be thread-safe.
+            columns (Sequence[str], optional): Passed to write_batches. Defaults to all columns.
+
+        Returns:
+            List[BatchStats]: Per-chunk stats from every worker; chunk indexes are per worker.
+        """
+        if isinstance(records, EmployeeStore):
+            records = records.iter_dicts()
+        queues: List["queue.Queue[Optional[Dict]]"] = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+
+        def drain(partition: "queue.Queue[Optional[Dict]]") -> Iterator[Dict]:
+            while (record := partition.get()) is not _END:
+                yield record
+
+        def write_partition(partition: "queue.Queue[Optional[Dict]]") -> List[BatchStats]:
+            partition_records = drain(partition)
+            try:
+                connection = self.connect()
+                if connection is None:
+                    failed_keys = [str(record.get("empNo")) for record in partition_records]
+                    return [BatchStats(0, len(failed_keys), 0, 0, failed_keys, 0.0)] if failed_keys else []
+                try:
+                    return self.write_batches(
+                        connection, partition_records, batch_rows, batch_bytes, table, on_commit, columns
+                    )
+                finally:
+                    connection.close()
+            finally:
+                # Keep consuming so the producer never blocks on a worker that stopped early
+                for _ in partition_records:
+                    pass
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(write_partition, partition) for partition in queues]
+            try:
+                for record in records:
+                    queues[partition_for(record.get("empNo"), workers)].put(record)
+            finally:
+                for partition in queues:
+                    partition.put(_END)
+            return [batch for future in futures for batch in future.result()]
+
+    @metrics.traced("db.full_refresh")
+    def full_refresh(
+        self,
+        connection: mysql.connector.MySQLConnection,
+        records: Optional[Union[Iterable[Dict], EmployeeStore]] = None,
+        csv_filename: Optional[str] = None,
+        batch_rows: int = 1000,
+        batch_bytes: int = 4 * 1024 * 1024,
+        expected_rows: Optional[int] = None,
+        min_live_fraction: float = 0.5,
+    ) -> bool:
+        """
+        Replace the contents of AVANTI_EMPLOYEES with a complete snapshot.
+
+        The snapshot is loaded into a shadow table created with the same schema, then swapped
+        in with a single atomic RENAME TABLE, so readers see either the old or the new table
+        but never a partially loaded one, and employees missing from the snapshot disappear.
+        Readers of the live table don't contend with the load. The shadow table's secondary
+        indexes are built after the load rather than maintained row by row during it. If any
+        row of the snapshot fails to load, the shadow table is dropped and the live table is
+        left untouched.
+
+        A snapshot that looks truncated is refused the same way: the swap only happens if the
+        shadow table holds at least one row, at least ``expected_rows`` and at least
+        ``min_live_fraction`` of the live table's rows, so an empty or partial fetch can never
+        wipe the table.
+
+        Args:
+            connection (mysql.connector.MySQLConnection): An active database connection.
+            records (Optional[Union[Iterable[Dict], EmployeeStore]], optional): The complete set of employee records.
+            csv_filename (Optional[str], optional): A CSV export to bulk load instead of ``records``;
+                requires ``allow_local_infile``.
+            batch_rows (int, optional): Maximum rows per chunk when loading ``records``. Defaults to 1000.
+            batch_bytes (int, optional): Approximate maximum statement size per chunk. Defaults to 4 MiB.
+            expected_rows (Optional[int], optional): The number of employees the API reported, if known.
+            min_live_fraction (float, optional): Smallest size of the snapshot, as a fraction of the live
+                table's row count, that is swapped in. Defaults to 0.5.
+
+        Returns:
+            bool: True if the new snapshot was swapped in, False otherwise.
+
+        Raises:
+            mysql.connector.Error: If there's an error executing the SQL queries.
+        """
+        shadow_table = f"{TABLE_NAME}_SHADOW"
+        old_table = f"{TABLE_NAME}_OLD"
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {shadow_table}, {old_table}")
+        except Error as e:
+            logging.error(f"Error preparing shadow table: {e}")
+            return False
+
+        # RENAME TABLE needs both tables to exist. The shadow table is loaded without its
+        # secondary indexes, which are built afterwards in one sorted pass per index.
+        if not self.create_table(connection) or not self.create_table(connection, shadow_table, indexes=False):
+            return False
+
+        if csv_filename is not None:
+            loaded = self.bulk_load_csv(connection, csv_filename, shadow_table)
+        else:
+            stats = self.write_batches(connection, records or [], batch_rows, batch_bytes, shadow_table)
+            loaded = not any(batch.failed_keys for batch in stats)
+
+        try:
+            with connection.cursor() as cursor:
+                if loaded:
+                    cursor.execute(f"SELECT COUNT(*) FROM {shadow_table}")
+                    shadow_rows = cast(List[Tuple[int]], cursor.fetchall())[0][0]
+                    cursor.execute(f"SELECT COUNT(*) FROM {TABLE_NAME}")
+                    live_rows = cast(List[Tuple[int]], cursor.fetchall())[0][0]
+                    if shadow_rows == 0:
+                        logging.error("Full refresh refused: the snapshot is empty")
+                        loaded = False
+                    elif expected_rows is not None and shadow_rows < expected_rows:
+                        logging.error(
+                            f"Full refresh refused: the snapshot has {shadow_rows} rows but the API reported {expected_rows}"
+                        )
+                        loaded = False
+                    elif shadow_rows < live_rows * min_live_fraction:
+                        logging.error(
+                            f"Full refresh refused: the snapshot has {shadow_rows} rows, fewer than "
+                            f"{min_live_fraction:.0%} of the {live_rows} live rows"
+                        )
+                        loaded = False
+                if not loaded:
+                    logging.error("Full refresh aborted; the live table was not modified")
+                    cursor.execute(f"DROP TABLE IF EXISTS {shadow_table}")
+                    return False
+                cursor.execute(f"ALTER TABLE {shadow_table} {_add_indexes_clause(SECONDARY_INDEXES)}")
+                cursor.execute(
+                    f"RENAME TABLE {TABLE_NAME} TO {old_table}, {shadow_table} TO {TABLE_NAME}"
+                )
+        except Error as e:
+            logging.error(f"Error swapping in refreshed table: {e}")
+            return False
+
+        # The new table is live; a leftover old table is dropped by the next refresh
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE {old_table}")
+        except Error as e:
+            logging.warning(f"Refreshed table is live, but dropping {old_table} failed: {e}")
+        return True
+
+    @metrics.traced("db.get_employees")
+    def get_employees(
+        self,
+        connection: mysql.connector.MySQLConnection,
+        emp_nos: Iterable[str],
+        batch_size: int = 1000,
+        table: str = TABLE_NAME,
+    ) -> Optional[List[Dict]]:
+        """
+        Look up employees by empNo in batches, one primary key lookup query per batch.
+
+        Args:
+            connection (mysql.connector.MySQLConnection): An active database connection.
+            emp_nos (Iterable[str]): The employee numbers to look up.
+            batch_size (int, optional): Maximum keys per query. Defaults to 1000.
+            table (str, optional): Name of the table to read. Defaults to AVANTI_EMPLOYEES.
+
+        Returns:
+            Optional[List[Dict]]: The employees found, in no particular order; unknown keys are
+            left out. None if a query failed.
+        """
+        keys = list(dict.fromkeys(str(emp_no) for emp_no in emp_nos))
+        employees: List[Dict] = []
+        try:
+            for start in range(0, len(keys), batch_size):
+                batch = keys[start:start + batch_size]
+                placeholders = ", ".join(["%s"] * len(batch))
+                query = f"SELECT {', '.join(EMPLOYEE_COLUMNS)} FROM {table} WHERE empNo IN ({placeholders})"
+                employees.extend(self._stream_rows(connection, query, batch))
+            return employees
+        except Error as e:
+            logging.error(f"Error looking up employees: {e}")
+            return None
+
+    @metrics.traced("db.page_employees")
+    def page_employees(
+        self,
+        connection: mysql.connector.MySQLConnection,
+        after: Optional[str] = None,
+        limit: int = 100,
+        position_name: Optional[str] = None,
+        active: Optional[bool] = None,
+        surname_prefix: Optional[str] = None,
+        table: str = TABLE_NAME,
+    ) -> Optional[Tuple[List[Dict], Optional[str]]]:
+        """
+        Fetch one page of employees in empNo order, using keyset pagination.
+
+        Instead of ``OFFSET``, which makes the server read and discard every skipped row, each
+        page seeks past the last empNo of the previous one (``empNo > after``). Without filters,
+        with ``active`` alone, or with ``position_name`` and ``active`` together, the index used
+        ends in the primary key and also provides the order, so the server reads only the page's
+        rows and every page costs the same no matter how deep it is. A ``surname_prefix``, or
+        ``position_name`` without ``active``, is served by an index in another order, so each
+        page reads and sorts all matching rows past the cursor; its cost grows with the number
+        of matches rather than with the depth.
+
+        Args:
+            connection (mysql.connector.MySQLConnection): An active database connection.
+            after (Optional[str], optional): The cursor returned with the previous page; None for the first page.
+            limit (int, optional): Maximum rows per page. Defaults to 100.
+            position_name (Optional[str], optional): Only employees holding this position.
+            active (Optional[bool], optional): Only employees with this active flag.
+            surname_prefix (Optional[str], optional): Only employees whose surname starts with this.
+            table (str, optional): Name of the table to read. Defaults to AVANTI_EMPLOYEES.
+
+        Returns:
+            Optional[Tuple[List[Dict], Optional[str]]]: The page's employees and the cursor of the
+            next page, which is None after the last page. None if the query failed.
+        """
+        query, params = _select_query(table, position_name, active, surname_prefix, after, limit)
+        try:
+            employees = list(self._stream_rows(connection, query, params))
+        except Error as e:
+            logging.error(f"Error reading employees: {e}")
+            return None
+        next_after = employees[-1]["empNo"] if len(employees) == limit else None
+        return employees, next_after
+
+    def query_employees(
+        self,
+        connection: mysql.connector.MySQLConnection,
+        position_name: Optional[str] = None,
+        active: Optional[bool] = None,
+        surname_prefix: Optional[str] = None,
+        page_size: int = 1000,
+        table: str = TABLE_NAME,
+    ) -> Iterator[Dict]:
+        """
+        Stream every employee matching the filters, in empNo order.
+
+        The result is read as a sequence of keyset pages (see page_employees), and each page is
+        streamed from the server with an unbuffered cursor instead of being fetched whole, so
+        memory stays bounded by one row however large the result set is. The connection is busy
+        until the iteration finishes or is closed.
+
+        Args:
+            connection (mysql.connector.MySQLConnection): An active database connection.
+            position_name (Optional[str], optional): Only employees holding this position.
+            active (Optional[bool], optional): Only employees with this active flag.
+            surname_prefix (Optional[str], optional): Only employees whose surname starts with this.
+            page_size (int, optional): Rows per keyset page. Defaults to 1000.
+            table (str, optional): Name of the table to read. Defaults to AVANTI_EMPLOYEES.
+
+        Yields:
+            Dict: Each matching employee.
+
+        Raises:
+            mysql.connector.Error: If a query fails.
+        """
+        after: Optional[str] = None
+        while True:
+            query, params = _select_query(table, position_name, active, surname_prefix, after, page_size)
+            rows = 0
+            for employee in self._stream_rows(connection, query, params):
+                rows += 1
+                after = employee["empNo"]
+                yield employee
+            if rows < page_size:
+                return
+
+    def _stream_rows(self, connection: mysql.connector.MySQLConnection, query: str, params: Iterable) -> Iterator[Dict]:
+        """
+        Execute a SELECT and yield its rows as they arrive from the server.
+        """
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        try:
+            cursor.execute(query, tuple(params))
+            for row in cast(Iterator[Dict[str, Any]], cursor):
+                if row.get("active") is not None:
+                    row["active"] = bool(row["active"])
+                yield row
+        finally:
+            # If the caller stopped early, drain the rest of the page so the connection is usable again
+            if connection.unread_result:
+                connection.consume_results()
+            cursor.close()
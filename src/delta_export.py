@@ -0,0 +1,236 @@
+import csv
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union, cast
+from src import metrics
+from src.models import EMPLOYEE_COLUMNS, Employee, EmployeeStore
+from src.snapshot import Snapshot, diff_snapshots, write_snapshot
+
+# Output formats accepted by write_delta
+DELTA_FORMATS = ("ndjson", "csv")
+
+# Columns of the CSV change log; ``changed`` lists the value columns an event sets
+DELTA_CSV_COLUMNS = ("seq", "op", "empNo", "changed") + EMPLOYEE_COLUMNS[1:]
+
+class DeltaResult(NamedTuple):
+    """
+    Counts of the events of one delta export, and the sequence numbers they were given.
+    """
+
+    inserts: int
+    updates: int
+    deactivations: int
+    removals: int
+    # Sequence numbers of the first and last event written, or None if nothing changed
+    first_sequence: Optional[int]
+    last_sequence: Optional[int]
+
+@metrics.traced("delta.write_delta")
+def write_delta(
+    records: Union[Iterable[Dict], EmployeeStore],
+    filename: str = "employees.delta.ndjson",
+    state_file: str = "delta_state.snap",
+    delta_format: str = "ndjson",
+    expected_total: Optional[int] = None,
+    min_previous_fraction: float = 0.5,
+    active_only: bool = False,
+) -> Optional[DeltaResult]:
+    """
+    Append the changes since the previous export to a change log.
+
+    The fetched employees are compared by empNo with the state the previous export left in
+    ``state_file`` (a snapshot, see src.snapshot). One event is appended per employee that
+    changed, in empNo order:
+
+    - ``insert``: a new employee, with all of its columns.
+    - ``update``: a changed employee, with only the columns that changed.
+    - ``deactivate``: like ``update``, for an employee whose ``active`` flag turned false.
+    - ``remove``: an employee no longer returned, without columns.
+
+    When the fetch was filtered to active employees (``active_only``, as in the payload
+    main.py sends), a deactivated employee is not returned at all rather than returned with
+    ``active`` false. An employee that was active in the previous state and is no longer
+    returned is then emitted as ``deactivate`` with ``{"active": false}`` instead of
+    ``remove``; if it becomes active again, it is emitted as an ``insert``.
+
+    Every event gets the next number of a sequence that increases across runs and is kept
+    in ``<state_file>.seq``, so consumers can remember the last event they applied and
+    resume after it. As NDJSON, each line is an object with ``seq``, ``op``, ``empNo`` and
+    ``fields``; as CSV, each row has ``seq``, ``op``, ``empNo``, ``changed`` (the
+    ``;``-separated columns the event sets) and the column values.
+
+    The sequence numbers are reserved in ``<state_file>.seq`` before the events are appended,
+    and the state is only replaced once the events are flushed to disk. A crash can therefore
+    cause changes to be emitted again with later sequence numbers, or leave a gap in the
+    sequence, but never lose a change or give two events the same number. The first export
+    has no state and emits every employee.
+
+    A fetch that looks truncated is refused without appending events or replacing the state:
+    one that is empty, smaller than ``expected_total``, or smaller than
+    ``min_previous_fraction`` of the previous state. Otherwise a partial fetch would emit a
+    ``remove`` for every missing employee, and an ``insert`` for each of them on the next run.
+
+    Args:
+        records (Union[Iterable[Dict], EmployeeStore]): The fetched employee records.
+        filename (str, optional): The change log to append to. Defaults to "employees.delta.ndjson".
+        state_file (str, optional): Snapshot of the employees as of the previous export.
+            Defaults to "delta_state.snap".
+        delta_format (str, optional): "ndjson" or "csv". Defaults to "ndjson".
+        expected_total (Optional[int], optional): The number of employees the API reported, if known.
+        min_previous_fraction (float, optional): Smallest size of the fetch, as a fraction of the
+            previous state's employee count, that is exported. Defaults to 0.5.
+        active_only (bool, optional): Whether the fetch only returned active employees.
+            Defaults to False.
+
+    Returns:
+        Optional[DeltaResult]: The event counts and sequence numbers, or None if the export failed
+        or the fetch looks truncated.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if delta_format not in DELTA_FORMATS:
+        raise ValueError(f"Unsupported delta format: {delta_format}")
+    if not isinstance(records, EmployeeStore):
+        records = EmployeeStore.from_records(records)
+
+    directory = os.path.dirname(os.path.abspath(state_file))
+    sequence_file = f"{state_file}.seq"
+    temp_path = None
+    try:
+        previous_rows = 0
+        if os.path.exists(state_file):
+            with Snapshot(state_file) as previous:
+                previous_rows = len(previous)
+        if len(records) == 0:
+            logging.error("Delta export refused: the fetch is empty")
+            return None
+        if expected_total is not None and len(records) < expected_total:
+            logging.error(f"Delta export refused: fetched {len(records)} employees but the API reported {expected_total}")
+            return None
+        if len(records) < previous_rows * min_previous_fraction:
+            logging.error(
+                f"Delta export refused: fetched {len(records)} employees, fewer than "
+                f"{min_previous_fraction:.0%} of the {previous_rows} previously exported"
+            )
+            return None
+
+        descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".snap")
+        os.close(descriptor)
+        if write_snapshot(records, temp_path) is None:
+            return None
+        events = _events(records, state_file, temp_path, active_only)
+
+        sequence = _load_sequence(sequence_file)
+        first_sequence = sequence + 1 if events else None
+        if events:
+            # Reserve the numbers first, so events appended before a failure are never renumbered
+            _save_sequence(sequence_file, sequence + len(events))
+            with open(filename, "a", newline="", encoding="utf-8") as f:
+                if delta_format == "csv":
+                    _write_csv_events(f, events, sequence)
+                else:
+                    _write_ndjson_events(f, events, sequence)
+                f.flush()
+                os.fsync(f.fileno())
+            sequence += len(events)
+        os.replace(temp_path, state_file)
+        temp_path = None
+    except (IOError, ValueError, csv.Error) as e:
+        logging.error(f"Error writing delta export: {e}")
+        return None
+    finally:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    counts = {op: 0 for op in ("insert", "update", "deactivate", "remove")}
+    for op, _, _ in events:
+        counts[op] += 1
+    result = DeltaResult(
+        counts["insert"], counts["update"], counts["deactivate"], counts["remove"],
+        first_sequence, sequence if events else None,
+    )
+    metrics.increment("sync_records_total", len(events), operation="delta.write_delta")
+    metrics.annotate(events=len(events))
+    logging.info(
+        f"Delta: {result.inserts} inserts, {result.updates} updates, {result.deactivations} deactivations, "
+        f"{result.removals} removals appended to {filename}"
+    )
+    return result
+
+def _events(
+    store: EmployeeStore, state_file: str, snapshot_file: str, active_only: bool = False
+) -> List[Tuple[str, str, Dict]]:
+    """
+    Compare the new snapshot with the previous state and return (op, empNo, fields) events.
+    """
+    if not os.path.exists(state_file):
+        return [("insert", employee.empNo, employee.to_dict()) for employee in sorted(store, key=lambda e: e.empNo)]
+
+    with Snapshot(state_file) as previous, Snapshot(snapshot_file) as current:
+        diff = diff_snapshots(previous, current)
+        # Without inactive employees in the fetch, an active one that disappears was deactivated
+        dropped_active = {
+            emp_no for emp_no in diff.removed
+            if active_only and previous.value("active", cast(int, previous.find(emp_no))) is True
+        }
+
+    # The current snapshot was written from the store, so every added or changed empNo is in it
+    events: List[Tuple[str, str, Dict]] = []
+    for emp_no in diff.added:
+        events.append(("insert", emp_no, cast(Employee, store.get(emp_no)).to_dict()))
+    for emp_no, columns in diff.changed.items():
+        employee = cast(Employee, store.get(emp_no))
+        fields = {column: getattr(employee, column) for column in columns}
+        deactivated = "active" in columns and employee.active is False
+        events.append(("deactivate" if deactivated else "update", emp_no, fields))
+    for emp_no in diff.removed:
+        if emp_no in dropped_active:
+            events.append(("deactivate", emp_no, {"active": False}))
+        else:
+            events.append(("remove", emp_no, {}))
+    events.sort(key=lambda event: event[1])
+    return events
+
+def _write_ndjson_events(f, events: List[Tuple[str, str, Dict]], sequence: int) -> None:
+    for offset, (op, emp_no, fields) in enumerate(events, 1):
+        event = {"seq": sequence + offset, "op": op, "empNo": emp_no, "fields": fields}
+        f.write(json.dumps(event, ensure_ascii=False, separators=(",", ":"), default=str))
+        f.write("\n")
+
+def _write_csv_events(f, events: List[Tuple[str, str, Dict]], sequence: int) -> None:
+    writer = csv.DictWriter(f, fieldnames=DELTA_CSV_COLUMNS)
+    if f.tell() == 0:
+        writer.writeheader()
+    for offset, (op, emp_no, fields) in enumerate(events, 1):
+        changed = [column for column in EMPLOYEE_COLUMNS[1:] if column in fields]
+        writer.writerow({
+            "seq": sequence + offset, "op": op, "empNo": emp_no, "changed": ";".join(changed),
+            **{column: fields[column] for column in changed},
+        })
+
+def _load_sequence(sequence_file: str) -> int:
+    """
+    Return the last sequence number handed out, or 0 before the first event.
+    """
+    try:
+        with open(sequence_file, "r") as f:
+            return int(json.load(f)["sequence"])
+    except FileNotFoundError:
+        return 0
+    except (KeyError, TypeError) as e:
+        # Starting over would hand out sequence numbers consumers have already seen
+        raise ValueError(f"Invalid delta sequence file {sequence_file}: {e}")
+
+def _save_sequence(sequence_file: str, sequence: int) -> None:
+    """
+    Atomically record the last sequence number handed out.
+    """
+    descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(sequence_file)), suffix=".tmp")
+    with os.fdopen(descriptor, "w") as f:
+        json.dump({"sequence": sequence}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, sequence_file)
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+class CacheEntry(NamedTuple):
+    """
+    A cached response body with the validators needed to revalidate it.
+    """
+
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+class ResponseCache:
+    """
+    An on-disk cache of API response bodies.
+
+    Entries are keyed by the request URL, a canonicalized JSON payload and the request's
+    credentials, so payloads that differ only in key order share an entry while a cache
+    directory shared between tokens never serves one token's response to another. Each entry is a body file and a small
+    JSON metadata file holding the ``ETag``/``Last-Modified`` validators. Entries are
+    fresh for ``ttl`` seconds; stale entries can still be revalidated with a conditional
+    request. When the total size of the bodies exceeds ``max_bytes``, the least recently
+    used entries are evicted. Recency is kept in the body files' modification times so it
+    survives across runs.
+    """
+
+    def __init__(self, directory: str = ".http_cache", ttl: float = 300.0, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the ResponseCache and index any entries already on disk.
+
+        Args:
+            directory (str, optional): Directory holding the cache files. Defaults to ".http_cache".
+            ttl (float, optional): Seconds an entry is served without revalidation. Defaults to 300.
+            max_bytes (int, optional): Maximum total size of cached bodies. Defaults to 256 MiB.
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.bytes_served = 0
+        self.bytes_stored = 0
+        self._lock = threading.Lock()
+        # key -> (body size, last access time)
+        self._index: Dict[str, Tuple[int, float]] = {}
+
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.endswith(".body"):
+                path = os.path.join(directory, name)
+                stat = os.stat(path)
+                self._index[name[:-5]] = (stat.st_size, stat.st_mtime)
+
+    @staticmethod
+    def key(url: str, payload: Dict, credentials: str = "") -> str:
+        """
+        Compute the cache key of a request.
+
+        Args:
+            url (str): The request URL.
+            payload (Dict): The JSON request payload.
+            credentials (str, optional): The request's ``Authorization`` header. Only its hash
+                ends up in the key. Defaults to "".
+
+        Returns:
+            str: A hex digest identifying the request.
+        """
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        credentials_hash = hashlib.sha256(credentials.encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{url}\n{canonical}\n{credentials_hash}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Read an entry, fresh or stale, and mark it as recently used.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[CacheEntry]: The entry, or None if it is not cached.
+        """
+        try:
+            with open(self._path(key, "json"), "r") as f:
+                meta = json.load(f)
+            with open(self._path(key, "body"), "rb") as f:
+                body = f.read()
+        except (IOError, ValueError):
+            return None
+        stored_at = meta.get("stored_at") if isinstance(meta, dict) else None
+        if not isinstance(stored_at, (int, float)):
+            # A truncated or hand-edited entry is a miss, like any other corrupt entry
+            return None
+        self._touch(key, len(body))
+        return CacheEntry(body, meta.get("etag"), meta.get("last_modified"), stored_at)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """
+        Check whether an entry can be served without revalidation.
+        """
+        return time.time() - entry.stored_at < self.ttl
+
+    def record_hit(self, entry: CacheEntry, revalidated: bool = False) -> None:
+        """
+        Count a response served from the cache.
+
+        Args:
+            entry (CacheEntry): The entry that was served.
+            revalidated (bool, optional): Whether the server confirmed it with a 304. Defaults to False.
+        """
+        with self._lock:
+            if revalidated:
+                self.revalidations += 1
+            else:
+                self.hits += 1
+            self.bytes_served += len(entry.body)
+
+    def record_miss(self) -> None:
+        """
+        Count a response that had to be downloaded.
+        """
+        with self._lock:
+            self.misses += 1
+
+    def put(self, key: str, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Store a response body and its validators, evicting old entries if needed.
+
+        Args:
+            key (str): The cache key.
+            body (bytes): The raw response body.
+            etag (Optional[str], optional): The response's ETag header.
+            last_modified (Optional[str], optional): The response's Last-Modified header.
+        """
+        meta = {"etag": etag, "last_modified": last_modified, "stored_at": time.time()}
+        try:
+            self._write_atomic(self._path(key, "body"), body)
+            self._write_atomic(self._path(key, "json"), json.dumps(meta).encode("utf-8"))
+        except IOError as e:
+            logging.warning(f"Error writing HTTP cache entry: {e}")
+            return
+        with self._lock:
+            self.bytes_stored += len(body)
+        self._touch(key, len(body))
+        self._evict()
+
+    def refresh(self, key: str, entry: CacheEntry) -> None:
+        """
+        Restart the TTL of an entry the server confirmed as unchanged.
+        """
+        self.put(key, entry.body, entry.etag, entry.last_modified)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the hit, miss and byte counters.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "bytes_served": self.bytes_served,
+                "bytes_stored": self.bytes_stored,
+                "entries": len(self._index),
+                "size": sum(size for size, _ in self._index.values()),
+            }
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def _touch(self, key: str, size: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._index[key] = (size, now)
+        try:
+            os.utime(self._path(key, "body"), (now, now))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        """
+        Remove least recently used entries until the cache fits in ``max_bytes``.
+        """
+        with self._lock:
+            total = sum(size for size, _ in self._index.values())
+            if total <= self.max_bytes:
+                return
+            victims = []
+            for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+                if total <= self.max_bytes:
+                    break
+                victims.append(key)
+                total -= size
+            for key in victims:
+                del self._index[key]
+        for key in victims:
+            for extension in ("body", "json"):
+                try:
+                    os.remove(self._path(key, extension))
+                except OSError:
+                    pass
@@ -0,0 +1,235 @@
+import csv
+import io
+import logging
+import mmap
+import os
+from collections import deque
+from itertools import groupby
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from src import metrics
+from src.csv_handler import _open_decoder
+from src.models import EMPLOYEE_COLUMNS
+
+if TYPE_CHECKING:
+    from src.database_handler import DatabaseHandler
+
+# Leading bytes of compressed exports, which can only be parsed from start to end
+_MAGIC_NUMBERS = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd"}
+
+class IngestResult(NamedTuple):
+    """
+    Outcome of an ingest.
+    """
+
+    rows: int
+    written: int
+    failed_keys: List[str]
+
+def split_csv(filename: str, chunk_bytes: int = 16 * 1024 * 1024) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Read the header of a CSV export and split its rows into byte ranges.
+
+    Ranges end at line boundaries that are not inside a quoted field, so every range holds
+    whole records and can be parsed on its own. Compressed exports cannot be split and are
+    returned as one range covering the whole file.
+
+    Args:
+        filename (str): The CSV export, optionally gzip or zstd compressed.
+        chunk_bytes (int, optional): Approximate size of each range. Defaults to 16 MiB.
+
+    Returns:
+        Tuple[List[str], List[Tuple[int, int]]]: The header fields and the (start, end) byte
+        offsets of each range.
+    """
+    compression = _compression(filename)
+    if compression is not None:
+        with open(filename, "rb") as raw, _open_decoder(raw, compression) as text:
+            return next(csv.reader(text), []), [(0, os.path.getsize(filename))]
+
+    with open(filename, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return [], []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = _next_record(data, 0, 0)
+            header = next(csv.reader(io.StringIO(data[:start].decode("utf-8-sig"), newline="")), [])
+            ranges: List[Tuple[int, int]] = []
+            while start < size:
+                end = _next_record(data, start, min(start + chunk_bytes, size))
+                ranges.append((start, end))
+                start = end
+    return header, ranges
+
+def parse_range(filename: str, fields: Sequence[str], start: int, end: int) -> List[Tuple]:
+    """
+    Parse and type-convert the records in a byte range of a CSV export.
+
+    Runs in a worker process. Rows are returned as tuples in EMPLOYEE_COLUMNS order, which
+    are much cheaper to send back to the parent than dicts. Empty values become None,
+    ``photoRevision`` an int and ``active`` a bool; columns that are not in the table are dropped.
+
+    Args:
+        filename (str): The CSV export.
+        fields (Sequence[str]): The export's header fields.
+        start (int): Offset of the first byte of the range.
+        end (int): Offset just past the last byte of the range.
+
+    Returns:
+        List[Tuple]: The converted rows.
+    """
+    compression = _compression(filename)
+    with open(filename, "rb") as raw:
+        if compression is not None:
+            text: io.TextIOBase = _open_decoder(raw, compression)
+            next(csv.reader(text), None)
+        else:
+            raw.seek(start)
+            text = io.StringIO(raw.read(end - start).decode("utf-8"), newline="")
+        positions = {field: position for position, field in enumerate(fields)}
+        columns = [positions.get(column) for column in EMPLOYEE_COLUMNS]
+        return [_convert(row, columns) for row in csv.reader(text) if row]
+
+@metrics.traced("ingest.ingest_csv")
+def ingest_csv(
+    filenames: Sequence[str],
+    db_handler: "DatabaseHandler",
+    connection: Any = None,
+    writers: int = 1,
+    parse_workers: Optional[int] = None,
+    chunk_bytes: int = 16 * 1024 * 1024,
+    batch_rows: int = 1000,
+    batch_bytes: int = 4 * 1024 * 1024,
+) -> IngestResult:
+    """
+    Load CSV exports into the employees table without calling the API.
+
+    Each file is split into byte ranges at record boundaries, and the ranges are parsed
+    in a pool of worker processes, so parsing scales with the number of cores. Parsed
+    chunks are streamed into the database writers in file and range order, with at most
+    two chunks per parser in flight, so memory stays bounded however large the files are.
+    Because rows are upserted in order, a later export overrides an earlier one when
+    both contain the same employee. Only the columns in an export's header are written, so
+    an older export without some columns leaves the stored values of those columns alone.
+
+    Args:
+        filenames (Sequence[str]): The CSV exports, oldest first.
+        db_handler (DatabaseHandler): The handler whose writers upsert the rows.
+        connection (Any, optional): An open connection, used when ``writers`` is 1. Defaults to None.
+        writers (int, optional): Number of parallel database writers; more than one uses
+            parallel_upsert over pooled connections. Defaults to 1.
+        parse_workers (Optional[int], optional): Number of parser processes. Defaults to the CPU count.
+        chunk_bytes (int, optional): Approximate size of each parsed range. Defaults to 16 MiB.
+        batch_rows (int, optional): Maximum rows per database chunk. Defaults to 1000.
+        batch_bytes (int, optional): Approximate maximum statement size per chunk. Defaults to 4 MiB.
+
+    Returns:
+        IngestResult: The rows parsed and written, and the empNo of every row that failed to insert.
+
+    Raises:
+        ValueError: If ``writers`` is 1 and no connection is given, an export has no empNo
+            column, or a value cannot be converted.
+        csv.Error: If an export is malformed.
+        OSError: If an export cannot be read.
+        BrokenProcessPool: If a parser process died, e.g. because it ran out of memory.
+    """
+    if writers <= 1 and connection is None:
+        raise ValueError("A connection is required for a single writer")
+    parse_workers = parse_workers or os.cpu_count() or 1
+    parsed = 0
+
+    ranges: List[Tuple[str, List[str], int, int]] = []
+    for filename in filenames:
+        fields, file_ranges = split_csv(filename, chunk_bytes)
+        if "empNo" not in fields:
+            raise ValueError(f"CSV file {filename} has no empNo column")
+        logging.info(f"Ingesting {filename} in {len(file_ranges)} chunks")
+        ranges.extend((filename, fields, start, end) for start, end in file_ranges)
+
+    def chunks() -> Iterator[Tuple[Tuple[str, ...], List[Tuple]]]:
+        # Each chunk comes with the table columns its export has
+        if parse_workers == 1:
+            # A single parser gains nothing from a process, only pickling overhead
+            for task in ranges:
+                yield _header_columns(task[1]), parse_range(*task)
+            return
+        with ProcessPoolExecutor(max_workers=parse_workers) as executor:
+            pending: Deque[Tuple[Tuple[str, ...], "Future[List[Tuple]]"]] = deque()
+            for task in ranges:
+                if len(pending) >= 2 * parse_workers:
+                    columns, future = pending.popleft()
+                    yield columns, future.result()
+                pending.append((_header_columns(task[1]), executor.submit(parse_range, *task)))
+            while pending:
+                columns, future = pending.popleft()
+                yield columns, future.result()
+
+    def records(group: Iterator[Tuple[Tuple[str, ...], List[Tuple]]]) -> Iterator[Dict]:
+        nonlocal parsed
+        for _, rows in group:
+            parsed += len(rows)
+            for row in rows:
+                yield dict(zip(EMPLOYEE_COLUMNS, row))
+
+    # Consecutive exports with the same columns are written together, in file order
+    stats = []
+    for columns, group in groupby(chunks(), key=lambda chunk: chunk[0]):
+        if writers > 1:
+            stats.extend(db_handler.parallel_upsert(records(group), writers, batch_rows, batch_bytes, columns=columns))
+        else:
+            stats.extend(db_handler.write_batches(connection, records(group), batch_rows, batch_bytes, columns=columns))
+    failed_keys = [key for batch in stats for key in batch.failed_keys]
+    written = sum(batch.written for batch in stats)
+    metrics.increment("sync_records_total", written, operation="ingest.ingest_csv")
+    metrics.annotate(rows=parsed, failed=len(failed_keys))
+    logging.info(f"Ingested {parsed} rows from {len(filenames)} files: {written} written, {len(failed_keys)} failed")
+    return IngestResult(parsed, written, failed_keys)
+
+def _header_columns(fields: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Return the table columns present in an export's header, in table column order.
+    """
+    return tuple(column for column in EMPLOYEE_COLUMNS if column in fields)
+
+def _next_record(data: mmap.mmap, start: int, position: int) -> int:
+    """
+    Return the offset just past the first line break at or after ``position`` that ends a
+    record, i.e. is preceded by an even number of quote characters since ``start``.
+    """
+    quotes = data[start:position].count(b'"')
+    while True:
+        newline = data.find(b"\n", position)
+        if newline == -1:
+            return len(data)
+        quotes += data[position:newline].count(b'"')
+        position = newline + 1
+        if quotes % 2 == 0:
+            return position
+
+def _convert(row: List[str], columns: List[Optional[int]]) -> Tuple:
+    """
+    Convert the text values of a CSV row into table values.
+    """
+    values: List[Any] = []
+    for column, position in zip(EMPLOYEE_COLUMNS, columns):
+        value = row[position] if position is not None and position < len(row) else ""
+        if value == "":
+            values.append(None)
+        elif column == "photoRevision":
+            values.append(int(value))
+        elif column == "active":
+            values.append(value.lower() in ("true", "1"))
+        else:
+            values.append(value)
+    return tuple(values)
+
+def _compression(filename: str) -> Optional[str]:
+    """
+    Detect a compressed export from its leading bytes.
+    """
+    with open(filename, "rb") as f:
+        head = f.read(4)
+    for magic, compression in _MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return compression
+    return None
@@ -0,0 +1,139 @@
+import codecs
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+
+# Consumed text is discarded from the buffer once it grows past this many characters
+_COMPACT_THRESHOLD = 64 * 1024
+
+class _TextBuffer:
+    """
+    A sliding window over an incrementally decoded stream of JSON text.
+    """
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._decode = json.JSONDecoder().raw_decode
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """
+        Append the next chunk of the stream to the buffer.
+
+        Returns:
+            bool: False if the stream is exhausted, True otherwise.
+        """
+        if self.eof:
+            return False
+        if self.pos > _COMPACT_THRESHOLD:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.eof = True
+            self.text += self._decoder.decode(b"", final=True)
+        elif isinstance(chunk, bytes):
+            self.text += self._decoder.decode(chunk)
+        else:
+            self.text += chunk
+        return True
+
+    def peek(self) -> str:
+        """
+        Skip whitespace and return the next significant character without consuming it.
+
+        Raises:
+            ValueError: If the stream ends first.
+        """
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(self, chars: str) -> str:
+        """
+        Consume the next significant character, which must be one of ``chars``.
+
+        Raises:
+            ValueError: If a different character or the end of the stream is found.
+        """
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self.pos}, found {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """
+        Decode the next complete JSON value, reading more of the stream as needed.
+
+        A value ending exactly at the end of the buffer may be a truncated number or
+        literal, so it is only accepted once the stream is known to be exhausted.
+
+        Raises:
+            ValueError: If the value is malformed or the stream ends first.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decode(self.text, self.pos)
+                if end < len(self.text) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+def iter_array_items(
+    chunks: Iterable[Union[bytes, str]], key: str, metadata: Optional[Dict[str, Any]] = None
+) -> Iterator[Any]:
+    """
+    Yield the items of an array-valued key of a top-level JSON object as they are parsed.
+
+    Only the item being decoded is held in memory, so memory use depends on the size of
+    a single item rather than on the length of the array. Chunks may split the text at
+    any byte, including inside multi-byte UTF-8 sequences.
+
+    Args:
+        chunks (Iterable[Union[bytes, str]]): The JSON document as a stream of chunks,
+            such as ``response.iter_content()``.
+        key (str): The top-level key whose array items should be yielded.
+        metadata (Optional[Dict[str, Any]], optional): If given, the other top-level keys
+            (for example ``total``) are stored in it as they are parsed. Keys appearing
+            after the array are only available once the generator is exhausted.
+
+    Yields:
+        Any: The decoded items of the array, in order.
+
+    Raises:
+        ValueError: If the document is not a JSON object or is malformed.
+    """
+    buffer = _TextBuffer(chunks)
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        return
+
+    while True:
+        name = buffer.value()
+        buffer.expect(":")
+        if name == key and buffer.peek() == "[":
+            buffer.expect("[")
+            if buffer.peek() == "]":
+                buffer.pos += 1
+            else:
+                while True:
+                    yield buffer.value()
+                    if buffer.expect(",]") == "]":
+                        break
+        else:
+            value = buffer.value()
+            if metadata is not None:
+                metadata[name] = value
+        if buffer.expect(",}") == "}":
+            return
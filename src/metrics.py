@@ -0,0 +1,376 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Upper bounds of the histogram buckets, per metric; others use DURATION_BUCKETS
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+SIZE_BUCKETS = (1, 10, 100, 500, 1000, 5000, 10000, 50000, 100000, 1000000, 10000000)
+_BUCKETS: Dict[str, Tuple[float, ...]] = {"db_batch_rows": SIZE_BUCKETS, "db_batch_bytes": SIZE_BUCKETS}
+
+_HELP = {
+    "sync_operation_duration_seconds": "Duration of instrumented operations.",
+    "sync_operation_errors_total": "Instrumented operations that raised or reported failure.",
+    "sync_records_total": "Employee records processed.",
+    "sync_bytes_total": "Bytes received from the API or written to files.",
+    "api_retries_total": "API requests retried.",
+    "db_batch_rows": "Rows per database batch.",
+    "db_batch_bytes": "Approximate statement bytes per database batch.",
+    "db_failed_rows_total": "Rows that could not be written to the database.",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class Span:
+    """
+    A timed operation within a run, recorded as a trace span when it ends.
+    """
+
+    __slots__ = ("name", "span_id", "parent_id", "start", "attributes", "status")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.attributes = attributes
+        self.status = "ok"
+
+    def set(self, **attributes: Any) -> None:
+        """
+        Add attributes to the span, such as the number of records it processed.
+        """
+        self.attributes.update(attributes)
+
+    def fail(self, error: object) -> None:
+        """
+        Mark the span as failed without raising, for errors that are handled.
+        """
+        self.status = "error"
+        self.attributes["error"] = str(error)
+
+class _NoopSpan:
+    """
+    Stand-in span returned while metrics are disabled; every operation does nothing.
+    """
+
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def fail(self, error: object) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+class Metrics:
+    """
+    A registry of counters, histograms and trace spans for one sync run.
+
+    Counters and histograms are keyed by name and labels and exported in the Prometheus
+    text format. Spans carry the run ID, so the spans of one run can be told apart from
+    another's in a shared trace file. All methods are thread-safe.
+    """
+
+    def __init__(self, run_id: Optional[str] = None):
+        """
+        Initialize the Metrics registry.
+
+        Args:
+            run_id (Optional[str], optional): Identifier of the run; generated if not given.
+        """
+        self.run_id = run_id or uuid.uuid4().hex
+        self.spans: List[Dict[str, Any]] = []
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        # name -> labels -> [bucket counts..., sum, count]
+        self._histograms: Dict[str, Dict[LabelKey, List[float]]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        """
+        Add ``value`` to a counter.
+        """
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """
+        Record one observation in a histogram.
+        """
+        buckets = _BUCKETS.get(name, DURATION_BUCKETS)
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            values = series.get(key)
+            if values is None:
+                values = series[key] = [0.0] * (len(buckets) + 2)
+            index = bisect_left(buckets, value)
+            if index < len(buckets):
+                values[index] += 1
+            values[-2] += value
+            values[-1] += 1
+
+    def span(self, name: str, **attributes: Any) -> "_SpanContext":
+        """
+        Time an operation as a span nested under the thread's current span.
+
+        Args:
+            name (str): Name of the operation, e.g. "db.write_batches".
+            **attributes: Initial span attributes.
+
+        Returns:
+            A context manager yielding the Span.
+        """
+        return _SpanContext(self, name, attributes)
+
+    def current_span(self) -> Optional[Span]:
+        """
+        Return the innermost open span of the calling thread, if any.
+        """
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    def counter(self, name: str, **labels: Any) -> float:
+        """
+        Return the current value of a counter.
+        """
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def to_prometheus(self) -> str:
+        """
+        Render every counter and histogram in the Prometheus text exposition format.
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                _header(lines, name, "counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+            for name, histograms in sorted(self._histograms.items()):
+                buckets = _BUCKETS.get(name, DURATION_BUCKETS)
+                _header(lines, name, "histogram")
+                for key, values in sorted(histograms.items()):
+                    cumulative = 0.0
+                    for bound, count in zip(buckets, values):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, le=_format_value(bound))} {_format_value(cumulative)}")
+                    lines.append(f"{name}_bucket{_format_labels(key, le='+Inf')} {_format_value(values[-1])}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(values[-2])}")
+                    lines.append(f"{name}_count{_format_labels(key)} {_format_value(values[-1])}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, filename: str) -> bool:
+        """
+        Atomically write the Prometheus text export to a file, e.g. for the node exporter's
+        textfile collector.
+
+        Args:
+            filename (str): The file to write.
+
+        Returns:
+            bool: True if the file was written, False otherwise.
+        """
+        temp_filename = f"{filename}.tmp"
+        try:
+            with open(temp_filename, "w") as f:
+                f.write(self.to_prometheus())
+            os.replace(temp_filename, filename)
+            return True
+        except IOError as e:
+            logging.error(f"Error writing metrics: {e}")
+            return False
+
+    def write_spans(self, filename: str) -> bool:
+        """
+        Append the finished spans to a JSON-lines trace file.
+
+        Args:
+            filename (str): The file to append to.
+
+        Returns:
+            bool: True if the spans were written, False otherwise.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        try:
+            with open(filename, "a") as f:
+                for span in spans:
+                    f.write(json.dumps(span, default=str) + "\n")
+            return True
+        except IOError as e:
+            logging.error(f"Error writing trace spans: {e}")
+            return False
+
+    def _finish(self, span: Span, duration: float) -> None:
+        self.observe("sync_operation_duration_seconds", duration, operation=span.name)
+        if span.status != "ok":
+            self.increment("sync_operation_errors_total", operation=span.name)
+        record = {
+            "run_id": self.run_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "name": span.name,
+            "start": span.start,
+            "duration": duration,
+            "status": span.status,
+            "thread": threading.current_thread().name,
+            "attributes": span.attributes,
+        }
+        with self._lock:
+            self.spans.append(record)
+
+class _SpanContext:
+    """
+    Context manager that opens a span on entry and records it on exit.
+    """
+
+    __slots__ = ("_metrics", "_name", "_attributes", "_span", "_start")
+
+    def __init__(self, metrics: Metrics, name: str, attributes: Dict[str, Any]):
+        self._metrics = metrics
+        self._name = name
+        self._attributes = attributes
+
+    def __enter__(self) -> Span:
+        local = self._metrics._local
+        stack = getattr(local, "stack", None)
+        if stack is None:
+            stack = local.stack = []
+        self._span = Span(self._name, stack[-1].span_id if stack else None, self._attributes)
+        stack.append(self._span)
+        self._start = time.perf_counter()
+        return self._span
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        duration = time.perf_counter() - self._start
+        self._metrics._local.stack.pop()
+        if exc_type is not None:
+            self._span.status = "error"
+            self._span.attributes.setdefault("error", repr(exc_value))
+        self._metrics._finish(self._span, duration)
+
+# The active registry; None while instrumentation is disabled
+_active: Optional[Metrics] = None
+
+def enable(run_id: Optional[str] = None) -> Metrics:
+    """
+    Start collecting metrics and spans into a new registry.
+
+    Args:
+        run_id (Optional[str], optional): Identifier of the run; generated if not given.
+
+    Returns:
+        Metrics: The active registry.
+    """
+    global _active
+    _active = Metrics(run_id)
+    return _active
+
+def disable() -> None:
+    """
+    Stop collecting metrics; instrumentation calls become no-ops.
+    """
+    global _active
+    _active = None
+
+def active() -> Optional[Metrics]:
+    """
+    Return the active registry, or None if instrumentation is disabled.
+    """
+    return _active
+
+def increment(name: str, value: float = 1, **labels: Any) -> None:
+    """
+    Add to a counter of the active registry, if any.
+    """
+    if _active is not None:
+        _active.increment(name, value, **labels)
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    """
+    Record a histogram observation in the active registry, if any.
+    """
+    if _active is not None:
+        _active.observe(name, value, **labels)
+
+def span(name: str, **attributes: Any) -> Any:
+    """
+    Time an operation as a span of the active registry; a no-op context when disabled.
+    """
+    if _active is None:
+        return _NOOP_SPAN
+    return _active.span(name, **attributes)
+
+def annotate(**attributes: Any) -> None:
+    """
+    Add attributes to the calling thread's current span, if any.
+    """
+    if _active is not None:
+        current = _active.current_span()
+        if current is not None:
+            current.set(**attributes)
+
+def traced(name: str) -> Callable[[F], F]:
+    """
+    Decorate a function so each call is recorded as a span named ``name``.
+
+    Following this codebase's convention, a call that returns None or False is recorded as
+    failed as well as one that raises. While instrumentation is disabled the wrapper only
+    checks a global before calling through.
+
+    Args:
+        name (str): The span name.
+
+    Returns:
+        The decorator.
+    """
+    def decorator(function: F) -> F:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _active is None:
+                return function(*args, **kwargs)
+            with _active.span(name) as current:
+                result = function(*args, **kwargs)
+                if result is None or result is False:
+                    current.fail("returned failure")
+                return result
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _header(lines: List[str], name: str, kind: str) -> None:
+    if name in _HELP:
+        lines.append(f"# HELP {name} {_HELP[name]}")
+    lines.append(f"# TYPE {name} {kind}")
+
+def _format_labels(key: LabelKey, **extra: str) -> str:
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{label}="{_escape(value)}"' for label, value in pairs) + "}"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,273 @@
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Columns of the AVANTI_EMPLOYEES table, in schema order
+EMPLOYEE_COLUMNS = (
+    "empNo",
+    "givenName",
+    "surname",
+    "preferredName",
+    "initial",
+    "positionName",
+    "positionNameFr",
+    "photoRevision",
+    "active",
+    "email",
+)
+
+# String columns with few distinct values, interned so rows share one copy
+INTERNED_COLUMNS = frozenset({"positionName", "positionNameFr"})
+
+# Fast membership test for record keys that are table columns
+_COLUMN_SET = frozenset(EMPLOYEE_COLUMNS)
+
+# String columns stored as plain lists in EmployeeStore
+_STRING_COLUMNS = tuple(c for c in EMPLOYEE_COLUMNS if c not in ("photoRevision", "active"))
+
+# Sentinels for missing values in the packed numeric columns
+_NO_REVISION = -(2 ** 63)
+_NO_ACTIVE = 2
+
+def _intern(value: Any) -> Any:
+    """
+    Intern string values; other values are returned unchanged.
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+class Employee:
+    """
+    A compact employee record.
+
+    Attributes are limited to the AVANTI_EMPLOYEES columns through ``__slots__``, which
+    avoids a per-record ``__dict__``. Position names are interned, since they repeat
+    across many employees.
+    """
+
+    __slots__ = EMPLOYEE_COLUMNS
+
+    empNo: str
+    givenName: Optional[str]
+    surname: Optional[str]
+    preferredName: Optional[str]
+    initial: Optional[str]
+    positionName: Optional[str]
+    positionNameFr: Optional[str]
+    photoRevision: Optional[int]
+    active: Optional[bool]
+    email: Optional[str]
+
+    def __init__(self, **values: Any):
+        """
+        Initialize the Employee from column values. Missing columns default to None.
+
+        Args:
+            **values: Column values keyed by column name.
+
+        Raises:
+            TypeError: If a value is given for an unknown column.
+        """
+        unknown = set(values) - set(EMPLOYEE_COLUMNS)
+        if unknown:
+            raise TypeError(f"Unknown employee fields: {', '.join(sorted(unknown))}")
+        for column in EMPLOYEE_COLUMNS:
+            value = values.get(column)
+            setattr(self, column, _intern(value) if column in INTERNED_COLUMNS else value)
+
+    @classmethod
+    def from_dict(cls, record: Dict) -> "Employee":
+        """
+        Build an Employee from an API record, ignoring keys that are not table columns.
+
+        Args:
+            record (Dict): An employee record as returned by the API.
+
+        Returns:
+            Employee: The compact record.
+        """
+        return cls(**{column: record.get(column) for column in EMPLOYEE_COLUMNS})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return the record as a plain dict keyed by column name.
+        """
+        return {column: getattr(self, column) for column in EMPLOYEE_COLUMNS}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Employee):
+            return NotImplemented
+        return all(getattr(self, column) == getattr(other, column) for column in EMPLOYEE_COLUMNS)
+
+    def __repr__(self) -> str:
+        return f"Employee(empNo={self.empNo!r}, surname={self.surname!r})"
+
+class EmployeeStore:
+    """
+    A columnar in-memory container for employee records.
+
+    Each column is stored as its own sequence instead of one dict per employee:
+    strings in lists (with position names interned), ``photoRevision`` in a packed
+    64-bit integer array and ``active`` in a byte array. Lookups by ``empNo`` are O(1),
+    and secondary indexes map each position and active flag to its rows.
+
+    API fields that are not table columns are stored column-wise too, one list per field,
+    created when the field first appears and with string values interned. Each row refers
+    to its original field order by the index of an order shared between rows with the same
+    fields, so exports can still carry every field the API returned; see iter_records.
+
+    Adding a record whose ``empNo`` is already stored replaces it in place.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty EmployeeStore.
+        """
+        self._strings: Dict[str, List[Optional[str]]] = {column: [] for column in _STRING_COLUMNS}
+        self._photo_revisions = array("q")
+        self._active = bytearray()
+        self._rows_by_emp_no: Dict[str, int] = {}
+        self._rows_by_position: Dict[Optional[str], List[int]] = {}
+        self._rows_by_active: Dict[Optional[bool], List[int]] = {}
+        self._extra_columns: Dict[str, List[Any]] = {}
+        self._field_orders: List[Tuple[str, ...]] = []
+        self._field_order_ids: Dict[Tuple[str, ...], int] = {}
+        self._row_field_orders = array("I")
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "EmployeeStore":
+        """
+        Build a store from employee records, such as the output of APIClient.iter_employees.
+
+        Args:
+            records (Iterable[Dict]): The employee records.
+
+        Returns:
+            EmployeeStore: The populated store.
+        """
+        store = cls()
+        for record in records:
+            store.add(record)
+        return store
+
+    def add(self, record: Dict) -> None:
+        """
+        Add or replace an employee. Keys that are not table columns are kept aside for iter_records.
+
+        Args:
+            record (Dict): An employee record as returned by the API.
+        """
+        emp_no = str(record["empNo"])
+        row = self._rows_by_emp_no.get(emp_no)
+        if row is None:
+            row = len(self)
+            self._rows_by_emp_no[emp_no] = row
+            for values in self._strings.values():
+                values.append(None)
+            self._photo_revisions.append(_NO_REVISION)
+            self._active.append(_NO_ACTIVE)
+            for values in self._extra_columns.values():
+                values.append(None)
+            self._row_field_orders.append(0)
+        else:
+            self._rows_by_position[self._strings["positionName"][row]].remove(row)
+            self._rows_by_active[self._get_active(row)].remove(row)
+
+        for column, values in self._strings.items():
+            value = emp_no if column == "empNo" else record.get(column)
+            values[row] = _intern(value) if column in INTERNED_COLUMNS else value
+        revision = record.get("photoRevision")
+        self._photo_revisions[row] = _NO_REVISION if revision is None else int(revision)
+        active = record.get("active")
+        self._active[row] = _NO_ACTIVE if active is None else int(bool(active))
+        for key, values in self._extra_columns.items():
+            values[row] = _intern(record.get(key))
+        field_order = tuple(record)
+        order_id = self._field_order_ids.get(field_order)
+        if order_id is None:
+            # A new combination of fields; any field not seen before gets its own column
+            order_id = self._field_order_ids[field_order] = len(self._field_orders)
+            self._field_orders.append(field_order)
+            for key in field_order:
+                if key not in _COLUMN_SET and key not in self._extra_columns:
+                    self._extra_columns[key] = [None] * len(self)
+                    self._extra_columns[key][row] = _intern(record[key])
+        self._row_field_orders[row] = order_id
+
+        self._rows_by_position.setdefault(self._strings["positionName"][row], []).append(row)
+        self._rows_by_active.setdefault(self._get_active(row), []).append(row)
+
+    def get(self, emp_no: str) -> Optional[Employee]:
+        """
+        Look up an employee by empNo.
+
+        Args:
+            emp_no (str): The employee number.
+
+        Returns:
+            Optional[Employee]: The employee, or None if it is not stored.
+        """
+        row = self._rows_by_emp_no.get(str(emp_no))
+        return None if row is None else self._employee(row)
+
+    def by_position(self, position_name: Optional[str]) -> List[Employee]:
+        """
+        Return the employees holding the given position.
+        """
+        return [self._employee(row) for row in self._rows_by_position.get(position_name, [])]
+
+    def by_active(self, active: Optional[bool]) -> List[Employee]:
+        """
+        Return the employees with the given active flag.
+        """
+        return [self._employee(row) for row in self._rows_by_active.get(active, [])]
+
+    def iter_dicts(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield each employee as a plain dict, for consumers such as csv or executemany.
+        """
+        for row in range(len(self)):
+            yield self._row_dict(row)
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield each employee with the fields it was added with, in their original order,
+        including fields that are not table columns. Used for exports of the API data.
+        """
+        for row in range(len(self)):
+            values = self._row_dict(row)
+            for key, column in self._extra_columns.items():
+                values[key] = column[row]
+            yield {field: values[field] for field in self._field_orders[self._row_field_orders[row]]}
+
+    def fields(self) -> List[str]:
+        """
+        Return every field the stored employees were added with, in first-seen order.
+        """
+        fields: Dict[str, None] = {}
+        for order_id in sorted(set(self._row_field_orders)):
+            fields.update(dict.fromkeys(self._field_orders[order_id]))
+        return list(fields)
+
+    def __len__(self) -> int:
+        return len(self._photo_revisions)
+
+    def __contains__(self, emp_no: object) -> bool:
+        return str(emp_no) in self._rows_by_emp_no
+
+    def __iter__(self) -> Iterator[Employee]:
+        for row in range(len(self)):
+            yield self._employee(row)
+
+    def _get_active(self, row: int) -> Optional[bool]:
+        value = self._active[row]
+        return None if value == _NO_ACTIVE else bool(value)
+
+    def _row_dict(self, row: int) -> Dict[str, Any]:
+        revision = self._photo_revisions[row]
+        values: Dict[str, Any] = {column: self._strings[column][row] for column in _STRING_COLUMNS}
+        values["photoRevision"] = None if revision == _NO_REVISION else revision
+        values["active"] = self._get_active(row)
+        return {column: values[column] for column in EMPLOYEE_COLUMNS}
+
+    def _employee(self, row: int) -> Employee:
+        return Employee(**self._row_dict(row))
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import quote
+import requests
+from src import metrics
+from src.api_client import APIClient
+from src.models import EmployeeStore
+
+class PhotoSyncResult(NamedTuple):
+    """
+    Outcome of a photo sync.
+    """
+
+    downloaded: int
+    unchanged: int
+    missing: int
+    failed_keys: List[str]
+    bytes: int
+
+class PhotoStore:
+    """
+    A content-addressed store of employee photos.
+
+    Photos are stored once per distinct content under ``objects/<aa>/<sha256>``, so
+    employees sharing a photo (such as a default avatar) share one file, and a photo that
+    changes back to earlier content costs nothing to store. ``index.json`` maps each empNo
+    to the ``photoRevision`` last downloaded and the digest of its content, which lets a
+    sync skip every photo whose revision hasn't changed.
+    """
+
+    def __init__(self, directory: str = "photos"):
+        """
+        Initialize the PhotoStore.
+
+        Args:
+            directory (str, optional): Directory holding the index and photo objects. Defaults to "photos".
+        """
+        self.directory = directory
+        self.index_file = os.path.join(directory, "index.json")
+        # empNo -> {"revision": int, "digest": Optional[str]}; a None digest means the employee has no photo
+        self.index: Dict[str, Dict] = {}
+
+    def load(self) -> bool:
+        """
+        Load the index from disk. A missing index is treated as an empty store.
+
+        Returns:
+            bool: True if the index was loaded or did not exist yet, False if it could not be read.
+        """
+        try:
+            with open(self.index_file, "r") as f:
+                self.index = json.load(f)
+            return True
+        except FileNotFoundError:
+            self.index = {}
+            return True
+        except (IOError, ValueError) as e:
+            logging.error(f"Error loading photo index: {e}")
+            return False
+
+    def save(self) -> bool:
+        """
+        Atomically write the index to disk.
+
+        Returns:
+            bool: True if the index was saved, False otherwise.
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(descriptor, "w") as f:
+                json.dump(self.index, f)
+            os.replace(temp_path, self.index_file)
+            return True
+        except IOError as e:
+            logging.error(f"Error saving photo index: {e}")
+            return False
+
+    def is_current(self, emp_no: str, revision: int) -> bool:
+        """
+        Check whether the stored photo of an employee is at the given revision.
+        """
+        entry = self.index.get(emp_no)
+        if entry is None or entry["revision"] != revision:
+            return False
+        return entry["digest"] is None or os.path.exists(self.path(entry["digest"]))
+
+    def put(self, data: bytes) -> str:
+        """
+        Store photo content, if it isn't stored already.
+
+        Args:
+            data (bytes): The photo content.
+
+        Returns:
+            str: The SHA-256 digest addressing the content.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(descriptor, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        return digest
+
+    def record(self, emp_no: str, revision: int, digest: Optional[str]) -> None:
+        """
+        Record the revision and content now stored for an employee.
+        """
+        self.index[emp_no] = {"revision": revision, "digest": digest}
+
+    def path(self, digest: str) -> str:
+        """
+        Return the file path of the content with the given digest.
+        """
+        return os.path.join(self.directory, "objects", digest[:2], digest)
+
+    def prune(self) -> int:
+        """
+        Delete photo objects no longer referenced by the index, such as the previous
+        content of changed photos. Objects that cannot be deleted are logged and kept.
+
+        Returns:
+            int: The number of objects deleted.
+        """
+        referenced = {entry["digest"] for entry in self.index.values()}
+        removed = 0
+        for root, _, files in os.walk(os.path.join(self.directory, "objects")):
+            for name in files:
+                if name not in referenced:
+                    try:
+                        os.remove(os.path.join(root, name))
+                    except OSError as e:
+                        logging.warning(f"Error deleting photo object {name}: {e}")
+                        continue
+                    removed += 1
+        return removed
+
+@metrics.traced("photos.sync_photos")
+def sync_photos(
+    api_client: APIClient,
+    records: Union[Iterable[Dict], EmployeeStore],
+    store: PhotoStore,
+    url_template: str,
+    max_workers: int = 8,
+) -> PhotoSyncResult:
+    """
+    Download the photos of employees whose ``photoRevision`` changed since the last sync.
+
+    Records whose revision matches the one recorded in the store's index are skipped
+    without a request. The remaining photos are downloaded concurrently over the API
+    client's pooled session, with at most ``2 * max_workers`` downloads in flight, and
+    written to the content-addressed store. The index is saved once the sync ends, even if
+    some downloads failed, so completed downloads are never repeated.
+
+    Args:
+        api_client (APIClient): The client whose session and credentials are used for downloads.
+        records (Union[Iterable[Dict], EmployeeStore]): The employee records.
+        store (PhotoStore): The loaded photo store.
+        url_template (str): Photo URL with an ``{empNo}`` placeholder.
+        max_workers (int, optional): Maximum number of concurrent downloads. Defaults to 8.
+
+    Returns:
+        PhotoSyncResult: Counts of downloaded, unchanged and missing photos, the empNo of
+        every failed download, and the bytes downloaded.
+    """
+    if isinstance(records, EmployeeStore):
+        records = records.iter_dicts()
+
+    downloaded = unchanged = missing = size = 0
+    failed_keys: List[str] = []
+
+    def download(emp_no: str) -> Optional[bytes]:
+        return api_client.download(url_template.format(empNo=quote(emp_no, safe="")))
+
+    def finish(future: "Future[Optional[bytes]]", emp_no: str, revision: int) -> None:
+        nonlocal downloaded, missing, size
+        try:
+            data = future.result()
+        except requests.RequestException as e:
+            logging.error(f"Error downloading photo for empNo {emp_no}: {e}")
+            failed_keys.append(emp_no)
+            return
+        if data is None:
+            missing += 1
+            store.record(emp_no, revision, None)
+            return
+        try:
+            store.record(emp_no, revision, store.put(data))
+        except OSError as e:
+            # A full disk or a permission error fails this photo only; it is retried next sync
+            logging.error(f"Error storing photo for empNo {emp_no}: {e}")
+            failed_keys.append(emp_no)
+            return
+        downloaded += 1
+        size += len(data)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending: Dict["Future[Optional[bytes]]", Tuple[str, int]] = {}
+            for record in records:
+                revision = record.get("photoRevision")
+                if revision is None:
+                    continue
+                emp_no = str(record["empNo"])
+                if store.is_current(emp_no, revision):
+                    unchanged += 1
+                    continue
+                if len(pending) >= 2 * max_workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finish(future, *pending.pop(future))
+                pending[executor.submit(download, emp_no)] = (emp_no, revision)
+            for future in list(pending):
+                finish(future, *pending.pop(future))
+    finally:
+        store.save()
+
+    metrics.increment("sync_records_total", downloaded, operation="photos.sync_photos")
+    metrics.increment("sync_bytes_total", size, operation="photos.sync_photos")
+    logging.info(
+        f"Photos: {downloaded} downloaded ({size} bytes), {unchanged} unchanged, "
+        f"{missing} without photo, {len(failed_keys)} failed"
+    )
+    return PhotoSyncResult(downloaded, unchanged, missing, failed_keys, size)
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+from src.api_client import APIError
+from src.async_api_client import AsyncAPIClient
+from src.csv_handler import write_csv_stream
+
+if TYPE_CHECKING:
+    from src.database_handler import DatabaseHandler
+
+# Marks the end of the page stream on a stage queue
+_END = None
+
+async def run_pipeline(
+    api_client: AsyncAPIClient,
+    db_handler: "DatabaseHandler",
+    payload: Dict,
+    csv_filename: str = "employees.csv",
+    page_size: int = 100,
+    queue_size: int = 8,
+    csv_compression: Optional[str] = None,
+) -> bool:
+    """
+    Fetch, write and upsert the employee set as three overlapping stages.
+
+    Pages fetched from the API are fanned out to a CSV stage and a database stage
+    through bounded queues. A full queue suspends the fetch, so memory is bounded by
+    ``queue_size`` pages per stage instead of by the size of the dataset, and wall
+    time approaches that of the slowest stage.
+
+    A failing stage logs its error and keeps draining its queue so the other stages
+    can run to completion.
+
+    Args:
+        api_client (AsyncAPIClient): The client used to fetch pages.
+        db_handler (DatabaseHandler): The handler used to upsert pages into the database.
+        payload (Dict): The base request payload.
+        csv_filename (str, optional): The CSV file to write. Defaults to "employees.csv".
+        page_size (int, optional): Number of records to request per page. Defaults to 100.
+        queue_size (int, optional): Maximum number of pages buffered per stage. Defaults to 8.
+        csv_compression (Optional[str], optional): None, "gzip" or "zstd". Defaults to None.
+
+    Returns:
+        bool: True if every stage succeeded, False otherwise.
+    """
+    csv_queue: "asyncio.Queue[Optional[List[Dict]]]" = asyncio.Queue(maxsize=queue_size)
+    db_queue: "asyncio.Queue[Optional[List[Dict]]]" = asyncio.Queue(maxsize=queue_size)
+
+    results = await asyncio.gather(
+        _fetch_stage(api_client, payload, page_size, [csv_queue, db_queue]),
+        _csv_stage(csv_queue, csv_filename, csv_compression),
+        _db_stage(db_queue, db_handler),
+    )
+    return all(results)
+
+async def _fetch_stage(
+    api_client: AsyncAPIClient, payload: Dict, page_size: int, queues: List["asyncio.Queue[Optional[List[Dict]]]"]
+) -> bool:
+    """
+    Fetch pages from the API and put each one on every stage queue.
+
+    Args:
+        api_client (AsyncAPIClient): The client used to fetch pages.
+        payload (Dict): The base request payload.
+        page_size (int): Number of records to request per page.
+        queues (List[asyncio.Queue]): The downstream stage queues.
+
+    Returns:
+        bool: True if every page was fetched, False otherwise.
+    """
+    total = 0
+    try:
+        async for _, employees in api_client.iter_pages(payload, page_size):
+            total += len(employees)
+            for queue in queues:
+                await queue.put(employees)
+        logging.info(f"Retrieved {total} employees")
+        return True
+    except APIError as e:
+        logging.error(f"Failed to retrieve data from API: {e}")
+        return False
+    finally:
+        for queue in queues:
+            await queue.put(_END)
+
+async def _csv_stage(
+    queue: "asyncio.Queue[Optional[List[Dict]]]", filename: str, compression: Optional[str] = None
+) -> bool:
+    """
+    Write pages to a CSV file as they arrive.
+
+    The queue is bridged into a blocking record iterator consumed by write_csv_stream on a
+    worker thread, so the file gets the same union schema and atomic rename as a
+    synchronous export.
+
+    Args:
+        queue (asyncio.Queue): The queue of pages to write.
+        filename (str): The CSV file to write.
+        compression (Optional[str], optional): Compression passed to write_csv_stream. Defaults to None.
+
+    Returns:
+        bool: True if all pages were written, False otherwise.
+    """
+    loop = asyncio.get_running_loop()
+    finished = False
+
+    def records() -> Iterator[Dict]:
+        nonlocal finished
+        while (employees := asyncio.run_coroutine_threadsafe(queue.get(), loop).result()) is not _END:
+            yield from employees
+        finished = True
+
+    rows = await asyncio.to_thread(write_csv_stream, records(), filename, compression)
+
+    # If the writer stopped early, keep draining so the fetch stage is never blocked
+    while not finished:
+        finished = await queue.get() is _END
+
+    return bool(rows)
+
+async def _db_stage(queue: "asyncio.Queue[Optional[List[Dict]]]", db_handler: "DatabaseHandler") -> bool:
+    """
+    Upsert pages into the database as they arrive, committing once per page.
+
+    Args:
+        queue (asyncio.Queue): The queue of pages to upsert.
+        db_handler (DatabaseHandler): The handler used for the database operations.
+
+    Returns:
+        bool: True if all pages were upserted, False otherwise.
+    """
+    connection = await asyncio.to_thread(db_handler.connect)
+    success = connection is not None
+    if connection is None:
+        logging.error("Failed to connect to database.")
+    elif not await asyncio.to_thread(db_handler.create_table, connection):
+        logging.error("Failed to create table.")
+        success = False
+
+    try:
+        while (employees := await queue.get()) is not _END:
+            if success and employees and connection is not None:
+                success = await asyncio.to_thread(db_handler.insert_data, connection, {"employees": employees})
+    finally:
+        if connection is not None:
+            await asyncio.to_thread(connection.close)
+
+    if success:
+        logging.info("Data successfully inserted into database")
+    return success
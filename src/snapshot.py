@@ -0,0 +1,428 @@
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Literal, NamedTuple, Optional, Sequence, Tuple, Union
+from src import metrics
+from src.models import EMPLOYEE_COLUMNS, EmployeeStore
+
+# File signature and version of the snapshot format
+MAGIC = b"EMPSNAP1"
+
+# Header: magic, row count, section count; followed by one directory entry per section
+_HEADER = struct.Struct("<8sII")
+_SECTION = struct.Struct("<32sQQ")
+
+# Columns stored as a dictionary of distinct strings plus one code per row
+DICTIONARY_COLUMNS = tuple(c for c in EMPLOYEE_COLUMNS if c not in ("empNo", "photoRevision", "active"))
+
+# Sentinels for missing values in the fixed-width columns; code 0 is None in dictionary columns
+_NO_REVISION = -(2 ** 63)
+_NO_ACTIVE = 2
+
+# Rows compared at once when diffing columns of snapshots with identical row layouts
+_DIFF_BLOCK_ROWS = 4096
+
+class SnapshotDiff(NamedTuple):
+    """
+    Differences between two snapshots, keyed by empNo.
+    """
+
+    added: List[str]
+    removed: List[str]
+    # empNo -> names of the columns whose values differ, in table column order
+    changed: Dict[str, List[str]]
+
+@metrics.traced("snapshot.write_snapshot")
+def write_snapshot(records: Union[Iterable[Dict], EmployeeStore], filename: str = "employees.snap") -> Optional[int]:
+    """
+    Write employee records to a binary columnar snapshot.
+
+    Rows are sorted by empNo, so snapshots of the same employees have the same layout.
+    Every column is stored as a contiguous section: ``empNo`` as packed UTF-8 strings with
+    an offset array, the other string columns dictionary-encoded (a sorted dictionary of
+    distinct values and one 1, 2 or 4-byte code per row), ``photoRevision`` as 64-bit
+    integers and ``active`` as bytes. An open-addressing hash table maps empNo to its row.
+    String columns are stored as text, so non-string values come back as strings.
+    Sections are 8-byte aligned and in native byte order, so Snapshot can use them in place.
+
+    The file is written to a temporary file and atomically renamed over ``filename``.
+
+    Args:
+        records (Union[Iterable[Dict], EmployeeStore]): The employee records; a later record
+            replaces an earlier one with the same empNo.
+        filename (str, optional): The snapshot file to write. Defaults to "employees.snap".
+
+    Returns:
+        Optional[int]: The number of employees written, or None if writing failed.
+    """
+    if not isinstance(records, EmployeeStore):
+        records = EmployeeStore.from_records(records)
+
+    columns: Dict[str, List] = {column: [] for column in EMPLOYEE_COLUMNS}
+    for record in records.iter_dicts():
+        for column, values in columns.items():
+            values.append(record[column])
+    order = sorted(range(len(records)), key=columns["empNo"].__getitem__)
+    emp_nos = [columns["empNo"][row] for row in order]
+
+    sections: List[Tuple[str, bytes]] = list(_string_sections("empNo", emp_nos))
+    for column in DICTIONARY_COLUMNS:
+        values = [None if value is None else str(value) for value in (columns[column][row] for row in order)]
+        dictionary = sorted({value for value in values if value is not None})
+        codes_by_value = {value: code for code, value in enumerate(dictionary, 1)}
+        sections.extend(_string_sections(f"{column}.dict", dictionary))
+        codes = array(_code_type(len(dictionary)), [0 if value is None else codes_by_value[value] for value in values])
+        sections.append((f"{column}.codes", codes.tobytes()))
+    revisions = (columns["photoRevision"][row] for row in order)
+    sections.append(("photoRevision", array("q", (_NO_REVISION if r is None else int(r) for r in revisions)).tobytes()))
+    flags = (columns["active"][row] for row in order)
+    sections.append(("active", bytes(_NO_ACTIVE if a is None else int(bool(a)) for a in flags)))
+    sections.append(("index", _hash_index(emp_nos).tobytes()))
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    try:
+        descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                offset = _align(_HEADER.size + _SECTION.size * len(sections))
+                f.write(_HEADER.pack(MAGIC, len(emp_nos), len(sections)))
+                for name, data in sections:
+                    f.write(_SECTION.pack(name.encode("ascii"), offset, len(data)))
+                    offset = _align(offset + len(data))
+                for name, data in sections:
+                    f.write(b"\0" * (_align(f.tell()) - f.tell()))
+                    f.write(data)
+            os.replace(temp_path, filename)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    except OSError as e:
+        logging.error(f"Error writing snapshot: {e}")
+        return None
+
+    metrics.increment("sync_records_total", len(emp_nos), operation="snapshot.write_snapshot")
+    metrics.increment("sync_bytes_total", os.path.getsize(filename), operation="snapshot.write_snapshot")
+    return len(emp_nos)
+
+class Snapshot:
+    """
+    A read-only view of a snapshot written by write_snapshot.
+
+    The file is memory-mapped and its sections are used in place: opening a snapshot reads
+    only the header, and values are decoded when they are accessed. Lookups by empNo go
+    through the stored hash table and are O(1).
+    """
+
+    def __init__(self, filename: str):
+        """
+        Open and map a snapshot.
+
+        Args:
+            filename (str): The snapshot file.
+
+        Raises:
+            OSError: If the file cannot be opened.
+            ValueError: If the file is not a snapshot.
+        """
+        self.filename = filename
+        with open(filename, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views: List[memoryview] = [memoryview(self._mmap)]
+        try:
+            if len(self._mmap) < _HEADER.size:
+                raise ValueError(f"{filename} is not an employee snapshot")
+            magic, self._rows, count = _HEADER.unpack_from(self._mmap)
+            if magic != MAGIC:
+                raise ValueError(f"{filename} is not an employee snapshot")
+            self._sections: Dict[str, memoryview] = {}
+            for position in range(count):
+                name, offset, length = _SECTION.unpack_from(self._mmap, _HEADER.size + position * _SECTION.size)
+                if offset + length > len(self._mmap):
+                    raise ValueError(f"{filename} is truncated")
+                self._sections[name.rstrip(b"\0").decode("ascii")] = self._view(self._views[0][offset:offset + length])
+            self._emp_no_offsets = self._view(self._sections["empNo.offsets"].cast("Q"))
+            self._codes = {
+                column: self._view(self._sections[f"{column}.codes"].cast(_code_type(self._dictionary_size(column))))
+                for column in DICTIONARY_COLUMNS
+            }
+            self._revisions = self._view(self._sections["photoRevision"].cast("q"))
+            self._active = self._sections["active"]
+            self._index = self._view(self._sections["index"].cast("I"))
+        except (KeyError, TypeError, struct.error) as e:
+            self.close()
+            raise ValueError(f"{filename} is not a valid employee snapshot: {e}")
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Release the sections and unmap the file.
+        """
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __contains__(self, emp_no: object) -> bool:
+        return self.find(str(emp_no)) is not None
+
+    def find(self, emp_no: str) -> Optional[int]:
+        """
+        Look up the row of an employee.
+
+        Args:
+            emp_no (str): The employee number.
+
+        Returns:
+            Optional[int]: The row, or None if the employee is not in the snapshot.
+        """
+        key = str(emp_no).encode("utf-8")
+        mask = len(self._index) - 1
+        slot = zlib.crc32(key) & mask
+        while True:
+            entry = self._index[slot]
+            if entry == 0:
+                return None
+            if self._emp_no_bytes(entry - 1) == key:
+                return entry - 1
+            slot = (slot + 1) & mask
+
+    def get(self, emp_no: str) -> Optional[Dict]:
+        """
+        Look up an employee by empNo.
+
+        Args:
+            emp_no (str): The employee number.
+
+        Returns:
+            Optional[Dict]: The employee's columns, or None if the employee is not in the snapshot.
+        """
+        row = self.find(emp_no)
+        return None if row is None else self.row(row)
+
+    def row(self, row: int) -> Dict:
+        """
+        Return the columns of the employee stored at a row.
+        """
+        return {column: self.value(column, row) for column in EMPLOYEE_COLUMNS}
+
+    def value(self, column: str, row: int):
+        """
+        Return a single column value of the employee stored at a row.
+        """
+        if column == "empNo":
+            return self._emp_no_bytes(row).decode("utf-8")
+        if column == "photoRevision":
+            revision = self._revisions[row]
+            return None if revision == _NO_REVISION else revision
+        if column == "active":
+            active = self._active[row]
+            return None if active == _NO_ACTIVE else bool(active)
+        code = self._codes[column][row]
+        return None if code == 0 else self._dictionary_value(column, code).decode("utf-8")
+
+    def iter_dicts(self) -> Iterator[Dict]:
+        """
+        Yield each employee as a plain dict, in empNo order.
+        """
+        # Decode each column once up front instead of one value at a time
+        emp_nos = self._emp_nos()
+        strings = {
+            column: ([None] + [value.decode("utf-8") for value in self._dictionary(column)], self._codes[column].tolist())
+            for column in DICTIONARY_COLUMNS
+        }
+        revisions = self._revisions.tolist()
+        active = self._active.tolist()
+        for row in range(self._rows):
+            record: Dict[str, Any] = {"empNo": emp_nos[row]}
+            for column, (dictionary, codes) in strings.items():
+                record[column] = dictionary[codes[row]]
+            record["photoRevision"] = None if revisions[row] == _NO_REVISION else revisions[row]
+            record["active"] = None if active[row] == _NO_ACTIVE else bool(active[row])
+            yield {column: record[column] for column in EMPLOYEE_COLUMNS}
+
+    def _view(self, view: memoryview) -> memoryview:
+        # Every view must be released before the mapping can be closed
+        self._views.append(view)
+        return view
+
+    def _emp_nos(self) -> List[str]:
+        """
+        Decode every empNo at once, in row order.
+        """
+        return [value.decode("utf-8") for value in _unpack_strings(self._sections["empNo.offsets"], self._sections["empNo.data"])]
+
+    def _dictionary(self, column: str) -> List[bytes]:
+        """
+        Return the encoded dictionary of a column; entry ``code - 1`` holds the value of ``code``.
+        """
+        return _unpack_strings(self._sections[f"{column}.dict.offsets"], self._sections[f"{column}.dict.data"])
+
+    def _emp_no_bytes(self, row: int) -> bytes:
+        return self._sections["empNo.data"][self._emp_no_offsets[row]:self._emp_no_offsets[row + 1]].tobytes()
+
+    def _dictionary_size(self, column: str) -> int:
+        return len(self._sections[f"{column}.dict.offsets"]) // 8 - 1
+
+    def _dictionary_value(self, column: str, code: int) -> bytes:
+        offsets = self._sections[f"{column}.dict.offsets"]
+        start, end = struct.unpack_from("=QQ", offsets, (code - 1) * 8)
+        return self._sections[f"{column}.dict.data"][start:end].tobytes()
+
+@metrics.traced("snapshot.diff_snapshots")
+def diff_snapshots(old: Snapshot, new: Snapshot) -> SnapshotDiff:
+    """
+    Compare two snapshots column by column.
+
+    When both snapshots hold the same employees, rows line up, and each column is compared
+    as raw bytes: unchanged columns are skipped after one memory comparison, and a changed
+    column is narrowed down block by block, only comparing rows inside differing blocks.
+    Dictionary codes are compared directly when both dictionaries are identical, and
+    translated into the old snapshot's codes otherwise. When employees were added or
+    removed, rows are matched through the empNo hash index instead.
+
+    Args:
+        old (Snapshot): The earlier snapshot.
+        new (Snapshot): The later snapshot.
+
+    Returns:
+        SnapshotDiff: The employees added, removed and changed, with the changed columns.
+    """
+    aligned = _equal(old._sections["empNo.offsets"], new._sections["empNo.offsets"]) and _equal(
+        old._sections["empNo.data"], new._sections["empNo.data"]
+    )
+    added: List[str] = []
+    removed: List[str] = []
+    if aligned:
+        pairs: Optional[List[Tuple[int, int]]] = None
+    else:
+        old_rows = {emp_no: row for row, emp_no in enumerate(old._emp_nos())}
+        pairs = []
+        for new_row, emp_no in enumerate(new._emp_nos()):
+            old_row = old_rows.pop(emp_no, None)
+            if old_row is None:
+                added.append(emp_no)
+            else:
+                pairs.append((old_row, new_row))
+        removed = sorted(old_rows)
+
+    changed: Dict[str, List[str]] = {}
+    for column in EMPLOYEE_COLUMNS[1:]:
+        if column in DICTIONARY_COLUMNS:
+            old_values, new_values = old._codes[column], new._codes[column]
+            translate = _translation(old, new, column)
+        elif column == "photoRevision":
+            old_values, new_values, translate = old._revisions, new._revisions, None
+        else:
+            old_values, new_values, translate = old._active, new._active, None
+
+        old_lookup: Sequence[int] = old_values
+        new_lookup: Sequence[int] = new_values
+        if pairs is None and translate is None:
+            rows: Iterable[Tuple[int, int]] = _differing_rows(old_values, new_values)
+        else:
+            # Every row is visited; plain lists index much faster than memoryviews
+            rows = pairs if pairs is not None else ((row, row) for row in range(len(new)))
+            old_lookup, new_lookup = old_values.tolist(), new_values.tolist()
+        for old_row, new_row in rows:
+            new_value = new_lookup[new_row] if translate is None else translate[new_lookup[new_row]]
+            if new_value != old_lookup[old_row]:
+                changed.setdefault(new.value("empNo", new_row), []).append(column)
+
+    metrics.annotate(added=len(added), removed=len(removed), changed=len(changed))
+    return SnapshotDiff(added, removed, changed)
+
+def _differing_rows(old_values: memoryview, new_values: memoryview) -> Iterator[Tuple[int, int]]:
+    """
+    Yield the row pairs of the blocks that differ between two equally laid out columns.
+    """
+    if _equal(old_values, new_values):
+        return
+    for start in range(0, len(new_values), _DIFF_BLOCK_ROWS):
+        end = min(start + _DIFF_BLOCK_ROWS, len(new_values))
+        if not _equal(old_values[start:end], new_values[start:end]):
+            for row in range(start, end):
+                yield row, row
+
+def _translation(old: Snapshot, new: Snapshot, column: str) -> Optional[List[int]]:
+    """
+    Map the new snapshot's codes for a column to the old snapshot's codes, or return None
+    if both dictionaries are identical. Values missing from the old dictionary map to -1.
+    """
+    names = (f"{column}.dict.offsets", f"{column}.dict.data")
+    if all(_equal(old._sections[name], new._sections[name]) for name in names):
+        return None
+    old_codes = {value: code for code, value in enumerate(old._dictionary(column), 1)}
+    return [0] + [old_codes.get(value, -1) for value in new._dictionary(column)]
+
+def _equal(a: memoryview, b: memoryview) -> bool:
+    """
+    Compare two buffers byte for byte, eight bytes at a time where possible.
+    """
+    a, b = a.cast("B"), b.cast("B")
+    if len(a) != len(b):
+        return False
+    words = len(a) // 8 * 8
+    return a[:words].cast("Q") == b[:words].cast("Q") and a[words:] == b[words:]
+
+def _string_sections(name: str, values: List[str]) -> Iterator[Tuple[str, bytes]]:
+    """
+    Pack strings as a ``<name>.offsets`` array of len(values) + 1 offsets and a ``<name>.data`` blob.
+    """
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = array("Q", [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    yield f"{name}.offsets", offsets.tobytes()
+    yield f"{name}.data", b"".join(encoded)
+
+def _unpack_strings(offsets: memoryview, data: memoryview) -> List[bytes]:
+    """
+    Split a blob written by _string_sections back into its encoded strings.
+    """
+    blob = data.tobytes()
+    bounds = offsets.cast("Q").tolist()
+    return [blob[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+def _hash_index(emp_nos: List[str]) -> array:
+    """
+    Build an open-addressing hash table with linear probing, holding row + 1 per used slot.
+    """
+    capacity = 1
+    while capacity < 2 * len(emp_nos) or capacity < 2:
+        capacity *= 2
+    table = array("I", bytes(4 * capacity))
+    mask = capacity - 1
+    for row, emp_no in enumerate(emp_nos):
+        slot = zlib.crc32(emp_no.encode("utf-8")) & mask
+        while table[slot]:
+            slot = (slot + 1) & mask
+        table[slot] = row + 1
+    return table
+
+def _code_type(dictionary_size: int) -> Literal["B", "H", "I"]:
+    """
+    Return the smallest array type code holding codes up to ``dictionary_size``.
+    """
+    if dictionary_size < 2 ** 8:
+        return "B"
+    if dictionary_size < 2 ** 16:
+        return "H"
+    return "I"
+
+def _align(offset: int) -> int:
+    return (offset + 7) // 8 * 8
@@ -0,0 +1,340 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from src import metrics
+from src.api_client import APIClient, APIError, create_session
+from src.csv_handler import write_csv_stream
+from src.models import EmployeeStore
+
+if TYPE_CHECKING:
+    from src.database_handler import DatabaseHandler
+
+# mysql.connector pools hold at most this many connections
+MAX_POOL_SIZE = 32
+
+class TenantResult(NamedTuple):
+    """
+    Outcome and timings of one tenant's sync.
+    """
+
+    name: str
+    success: bool
+    employees: int
+    seconds: float
+    stages: Dict[str, float]
+    error: Optional[str]
+
+class FairBudget:
+    """
+    A global budget of in-flight API requests, shared fairly among tenants.
+
+    At most ``total`` requests are in flight across all tenants. While several tenants
+    are waiting for a slot, none may hold more than its fair share (``total`` divided by the
+    number of active tenants), so a tenant with a huge dataset cannot starve small ones.
+    When nobody else is waiting, a tenant may use the idle capacity beyond its share.
+    """
+
+    def __init__(self, total: int):
+        """
+        Initialize the FairBudget.
+
+        Args:
+            total (int): Maximum number of requests in flight across all tenants.
+        """
+        self.total = total
+        self._in_flight = 0
+        self._held: Dict[str, int] = {}
+        self._waiting: Dict[str, int] = {}
+        self._condition = threading.Condition()
+
+    def register(self, tenant: str) -> None:
+        """
+        Add a tenant to the fair-share computation.
+        """
+        with self._condition:
+            self._held.setdefault(tenant, 0)
+            self._waiting.setdefault(tenant, 0)
+
+    def unregister(self, tenant: str) -> None:
+        """
+        Remove a finished tenant, growing the other tenants' shares.
+        """
+        with self._condition:
+            self._held.pop(tenant, None)
+            self._waiting.pop(tenant, None)
+            self._condition.notify_all()
+
+    def acquire(self, tenant: str) -> None:
+        """
+        Block until the tenant may start a request, then take a slot.
+        """
+        with self._condition:
+            self._waiting[tenant] += 1
+            while not self._may_acquire(tenant):
+                self._condition.wait()
+            self._waiting[tenant] -= 1
+            self._held[tenant] += 1
+            self._in_flight += 1
+
+    def release(self, tenant: str) -> None:
+        """
+        Return a tenant's slot.
+        """
+        with self._condition:
+            self._held[tenant] -= 1
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def limiter(self, tenant: str, max_workers: int) -> "TenantLimiter":
+        """
+        Return a limiter that draws the tenant's API requests from this budget.
+        """
+        return TenantLimiter(self, tenant, max_workers)
+
+    def _may_acquire(self, tenant: str) -> bool:
+        if self._in_flight >= self.total:
+            return False
+        share = max(1, self.total // max(1, len(self._held)))
+        if self._held[tenant] < share:
+            return True
+        return not any(count for other, count in self._waiting.items() if other != tenant)
+
+class TenantLimiter:
+    """
+    Adapts a FairBudget to the Limiter interface of APIClient.
+    """
+
+    def __init__(self, budget: FairBudget, tenant: str, max_limit: int):
+        self.budget = budget
+        self.tenant = tenant
+        self.max_limit = max_limit
+
+    def acquire(self) -> None:
+        self.budget.acquire(self.tenant)
+
+    def release(self, latency: float, throttled: bool = False) -> None:
+        self.budget.release(self.tenant)
+
+def load_manifest(filename: str) -> Optional[Dict]:
+    """
+    Load a tenant manifest.
+
+    The manifest is a JSON object with a ``tenants`` list, optional ``defaults`` merged into
+    every tenant, and optional runner settings ``max_concurrency`` and ``max_tenants``. Each
+    tenant has a ``name``, an ``api_url``, an ``api_token`` (or ``api_token_env``, naming an
+    environment variable holding it), and optionally ``db`` (``host``, ``user``, ``password``
+    or ``password_env``, ``database``), ``csv_filename``, ``payload``, ``page_size`` and
+    ``max_workers``.
+
+    Args:
+        filename (str): Path of the manifest.
+
+    Returns:
+        Optional[Dict]: The manifest, or None if it could not be read or has no tenants.
+    """
+    try:
+        with open(filename, "r") as f:
+            manifest = json.load(f)
+    except (IOError, ValueError) as e:
+        logging.error(f"Error loading tenant manifest: {e}")
+        return None
+    if not isinstance(manifest, dict) or not manifest.get("tenants"):
+        logging.error("Tenant manifest has no tenants")
+        return None
+    return manifest
+
+def _secret(config: Dict, key: str) -> Optional[str]:
+    """
+    Read a secret given inline or, preferably, through a ``<key>_env`` environment variable.
+    """
+    if f"{key}_env" in config:
+        return os.getenv(config[f"{key}_env"])
+    return config.get(key)
+
+class TenantRunner:
+    """
+    Syncs many tenants concurrently in one process.
+
+    Up to ``max_tenants`` tenants are synced at a time, each fetching its employees,
+    writing its CSV export and upserting into its own database. Tenants on the same API
+    host share one HTTP connection pool, each through its own session so cookies never
+    cross tenants, and tenants on the same database server and credentials share one
+    connection pool. All API requests draw from one FairBudget of ``max_concurrency``
+    slots.
+    """
+
+    def __init__(self, manifest: Dict, default_payload: Optional[Dict] = None):
+        """
+        Initialize the TenantRunner.
+
+        Args:
+            manifest (Dict): The tenant manifest (see load_manifest).
+            default_payload (Optional[Dict], optional): Request payload for tenants that don't set one.
+        """
+        defaults = manifest.get("defaults", {})
+        self.tenants = [
+            {**defaults, **tenant, "payload": {**(default_payload or {}), **defaults.get("payload", {}), **tenant.get("payload", {})}}
+            for tenant in manifest["tenants"]
+        ]
+        self.max_tenants = int(manifest.get("max_tenants", 8))
+        self.budget = FairBudget(int(manifest.get("max_concurrency", 32)))
+        self._adapters: Dict[str, HTTPAdapter] = {}
+        self._pools: Dict[Tuple, Any] = {}
+        self._pool_slots: Dict[Tuple, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def run(self) -> List[TenantResult]:
+        """
+        Sync every tenant and log their timings.
+
+        Returns:
+            List[TenantResult]: One result per tenant, in manifest order.
+        """
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_tenants, thread_name_prefix="tenant") as executor:
+                results = list(executor.map(self.sync_tenant, self.tenants))
+        finally:
+            for adapter in self._adapters.values():
+                adapter.close()
+        for result in results:
+            stages = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in result.stages.items())
+            if result.success:
+                logging.info(f"Tenant {result.name}: {result.employees} employees in {result.seconds:.2f}s ({stages})")
+            else:
+                logging.error(f"Tenant {result.name} failed after {result.seconds:.2f}s ({stages}): {result.error}")
+        return results
+
+    def sync_tenant(self, tenant: Dict) -> TenantResult:
+        """
+        Fetch, export and upsert one tenant's employees.
+
+        Args:
+            tenant (Dict): The tenant's configuration, with the manifest defaults applied.
+
+        Returns:
+            TenantResult: The outcome and per-stage timings.
+        """
+        name = tenant["name"]
+        stages: Dict[str, float] = {}
+        store = EmployeeStore()
+        start = time.perf_counter()
+        max_workers = min(int(tenant.get("max_workers", 4)), self.budget.total)
+        self.budget.register(name)
+        try:
+            client = APIClient(
+                tenant["api_url"],
+                {"Authorization": f"Bearer {_secret(tenant, 'api_token')}", "Content-Type": "application/json"},
+                limiter=self.budget.limiter(name, max_workers),
+                session=self._session_for(tenant["api_url"]),
+            )
+            with self._stage(stages, "fetch", name):
+                store = EmployeeStore.from_records(
+                    client.iter_employees(tenant["payload"], int(tenant.get("page_size", 100)), max_workers)
+                )
+
+            if tenant.get("csv_filename"):
+                with self._stage(stages, "csv", name):
+                    if write_csv_stream(store, tenant["csv_filename"], tenant.get("csv_compression")) is None:
+                        return self._result(name, store, start, stages, "failed to write CSV")
+
+            if tenant.get("db"):
+                with self._stage(stages, "db", name):
+                    error = self._upsert(tenant["db"], store, int(tenant.get("batch_rows", 1000)))
+                if error:
+                    return self._result(name, store, start, stages, error)
+            return self._result(name, store, start, stages, None)
+        except APIError as e:
+            return self._result(name, store, start, stages, f"failed to retrieve data from API: {e}")
+        except Exception as e:
+            logging.exception(f"Tenant {name} failed")
+            return self._result(name, store, start, stages, str(e))
+        finally:
+            self.budget.unregister(name)
+
+    def _upsert(self, db: Dict, store: EmployeeStore, batch_rows: int) -> Optional[str]:
+        """
+        Upsert a tenant's employees over a shared pool connection.
+
+        Returns:
+            Optional[str]: A description of the failure, or None on success.
+        """
+        db_handler, slots = self._db_handler_for(db)
+        with slots:
+            connection = db_handler.connect()
+            if connection is None:
+                return "failed to connect to database"
+            with connection:
+                if not db_handler.create_table(connection):
+                    return "failed to create table"
+                db_handler.migrate_indexes(connection)
+                stats = db_handler.write_batches(connection, store, batch_rows)
+        failed = sum(len(batch.failed_keys) for batch in stats)
+        return f"{failed} rows failed to insert" if failed else None
+
+    def _session_for(self, url: str) -> requests.Session:
+        """
+        Return a new HTTP session for one tenant, on the connection pool shared by every
+        tenant of the URL's host. The session is not closed, since that would close the pool.
+        """
+        parsed = urlparse(url)
+        key = f"{parsed.scheme}://{parsed.netloc}"
+        with self._lock:
+            if key not in self._adapters:
+                self._adapters[key] = HTTPAdapter(pool_connections=1, pool_maxsize=self.budget.total)
+            return create_session(adapter=self._adapters[key])
+
+    def _db_handler_for(self, db: Dict) -> Tuple["DatabaseHandler", threading.Semaphore]:
+        """
+        Return a handler for the tenant's database on the pool shared by its server and credentials,
+        and the semaphore bounding concurrent borrowers of that pool.
+        """
+        import mysql.connector.pooling
+        from src.database_handler import DatabaseHandler
+
+        # The connector's defaults for a missing user or password are empty strings
+        host, user, password = db.get("host", "localhost"), db.get("user", ""), _secret(db, "password") or ""
+        # The password is part of the key, so a pool is only shared with the same credentials
+        key = (host, int(db.get("port", 3306)), user, password)
+        with self._lock:
+            if key not in self._pools:
+                pool_size = min(MAX_POOL_SIZE, self.max_tenants)
+                self._pools[key] = mysql.connector.pooling.MySQLConnectionPool(
+                    pool_name=f"tenants_{len(self._pools)}", pool_size=pool_size,
+                    host=host, port=key[1], user=user, password=password,
+                )
+                self._pool_slots[key] = threading.Semaphore(pool_size)
+            pool, slots = self._pools[key], self._pool_slots[key]
+        return DatabaseHandler(host, user, password, db["database"], pool=pool), slots
+
+    def _stage(self, stages: Dict[str, float], stage: str, tenant: str) -> "_StageTimer":
+        return _StageTimer(stages, stage, tenant)
+
+    def _result(
+        self, name: str, store: EmployeeStore, start: float, stages: Dict[str, float], error: Optional[str]
+    ) -> TenantResult:
+        return TenantResult(name, error is None, len(store), time.perf_counter() - start, stages, error)
+
+class _StageTimer:
+    """
+    Records the duration of a tenant stage, and a metrics span tagged with the tenant.
+    """
+
+    def __init__(self, stages: Dict[str, float], stage: str, tenant: str):
+        self._stages = stages
+        self._stage = stage
+        self._span = metrics.span(f"tenant.{stage}", tenant=tenant)
+
+    def __enter__(self) -> None:
+        self._span.__enter__()
+        self._start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._stages[self._stage] = time.perf_counter() - self._start
+        self._span.__exit__(exc_type, exc_value, traceback)
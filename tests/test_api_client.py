@@ -1,7 +1,7 @@
 import unittest
-from unittest.mock import patch, Mock
+from unittest.mock import patch, MagicMock, Mock
 import requests
-from src.api_client import APIClient
+from src.api_client import APIClient, APIError, shards_by
 
 class TestAPIClient(unittest.TestCase):
     def setUp(self):
@@ -13,12 +13,12 @@ class TestAPIClient(unittest.TestCase):
         self.headers = {"Authorization": "Bearer token"}
         self.client = APIClient(self.url, self.headers)
 
-    @patch('src.api_client.requests.post')
+    @patch('src.api_client.requests.Session.post')
     def test_successful_api_query(self, mock_post):
         """
         Test the query_api method with a successful API response.
         
-        Mock the requests.post method to return a predefined response.
+        Mock the session's post method to return a predefined response.
         Verify that the method returns the expected data.
         """
         # Arrange
@@ -31,14 +31,14 @@ class TestAPIClient(unittest.TestCase):
 
         # Assert
         self.assertEqual(result, {"employees": []})
-        mock_post.assert_called_once_with(self.url, json={}, headers=self.headers)
+        mock_post.assert_called_once_with(self.url, json={}, headers=self.headers, timeout=self.client.timeout)
 
-    @patch('src.api_client.requests.post')
+    @patch('src.api_client.requests.Session.post')
     def test_api_query_http_error(self, mock_post):
         """
         Test the query_api method when an HTTP error occurs.
         
-        Mock requests.post to raise an HTTPError.
+        Mock the session's post to raise an HTTPError.
         Verify that the method returns None and logs the error.
         """
         # Arrange
@@ -50,13 +50,31 @@ class TestAPIClient(unittest.TestCase):
         # Assert
         self.assertIsNone(result)
 
-    @patch('src.api_client.requests.post')
-    def test_api_query_connection_error(self, mock_post):
+    @patch('src.api_client.requests.Session.get')
+    def test_download_missing_resource(self, mock_get):
+        """
+        Test that download returns None when the resource doesn't exist.
+        """
+        # Arrange
+        mock_response = MagicMock(status_code=404, ok=False)
+        mock_response.raise_for_status.side_effect = requests.HTTPError("404 Not Found", response=mock_response)
+        mock_get.return_value = mock_response
+
+        # Act
+        result = self.client.download(f"{self.url}/1/Photo")
+
+        # Assert
+        self.assertIsNone(result)
+        self.assertNotIn("Content-Type", mock_get.call_args.kwargs["headers"])
+
+    @patch('src.api_client.time.sleep')
+    @patch('src.api_client.requests.Session.post')
+    def test_api_query_connection_error(self, mock_post, mock_sleep):
         """
         Test the query_api method when a connection error occurs.
         
-        Mock requests.post to raise a ConnectionError.
-        Verify that the method returns None and logs the error.
+        Mock the session's post to raise a ConnectionError on every attempt.
+        Verify that the method retries, then returns None and logs the error.
         """
         # Arrange
         mock_post.side_effect = requests.ConnectionError("Connection failed")
@@ -66,13 +84,15 @@ class TestAPIClient(unittest.TestCase):
 
         # Assert
         self.assertIsNone(result)
+        self.assertEqual(mock_post.call_count, self.client.max_retries + 1)
 
-    @patch('src.api_client.requests.post')
-    def test_api_query_timeout(self, mock_post):
+    @patch('src.api_client.time.sleep')
+    @patch('src.api_client.requests.Session.post')
+    def test_api_query_timeout(self, mock_post, mock_sleep):
         """
         Test the query_api method when a timeout occurs.
         
-        Mock requests.post to raise a Timeout error.
+        Mock the session's post to raise a Timeout error.
         Verify that the method returns None and logs the error.
         """
         # Arrange
@@ -84,5 +104,244 @@ class TestAPIClient(unittest.TestCase):
         # Assert
         self.assertIsNone(result)
 
+    @patch('src.api_client.time.sleep')
+    @patch('src.api_client.requests.Session.post')
+    def test_api_query_retries_with_retry_after(self, mock_post, mock_sleep):
+        """
+        Test that a retryable status is retried after the server's Retry-After delay.
+        
+        Mock the session's post to return a 503 with Retry-After, then a success.
+        Verify that the method sleeps for the requested delay and returns the data.
+        """
+        # Arrange
+        throttled = Mock(status_code=503, headers={"Retry-After": "2"})
+        ok = Mock(status_code=200, headers={})
+        ok.json.return_value = {"employees": []}
+        mock_post.side_effect = [throttled, ok]
+
+        # Act
+        result = self.client.query_api({})
+
+        # Assert
+        self.assertEqual(result, {"employees": []})
+        mock_sleep.assert_called_once_with(2.0)
+
+    def test_retry_after_is_capped(self):
+        """
+        Test that a server-provided Retry-After delay is capped at retry_after_max.
+
+        Verify that both a huge number of seconds and a far-future HTTP date are clamped.
+        """
+        # Arrange
+        self.client.retry_after_max = 60.0
+
+        # Act
+        seconds = self.client._retry_delay(0, "86400")
+        date = self.client._retry_delay(0, "Fri, 31 Dec 2999 23:59:59 GMT")
+
+        # Assert
+        self.assertEqual(seconds, 60.0)
+        self.assertEqual(date, 60.0)
+
+    @patch('src.api_client.requests.Session.post')
+    def test_stream_employees(self, mock_post):
+        """
+        Test that stream_employees yields records parsed from the streamed body.
+        
+        Mock the session's post to return a response whose body arrives in small chunks.
+        Verify that each employee is yielded and the total is captured as metadata.
+        """
+        # Arrange
+        body = b'{"total": 2, "employees": [{"empNo": "1"}, {"empNo": "2"}]}'
+        mock_response = MagicMock(status_code=200, headers={})
+        mock_response.iter_content.return_value = [body[i:i + 5] for i in range(0, len(body), 5)]
+        mock_post.return_value = mock_response
+        metadata = {}
+
+        # Act
+        result = list(self.client.stream_employees({}, metadata=metadata))
+
+        # Assert
+        self.assertEqual(result, [{"empNo": "1"}, {"empNo": "2"}])
+        self.assertEqual(metadata, {"total": 2})
+        self.assertTrue(mock_post.call_args.kwargs["stream"])
+
+    @patch('src.api_client.requests.Session.post')
+    def test_query_page_streams_response(self, mock_post):
+        """
+        Test that query_page, the page fetch behind iter_pages, decodes the body as a stream.
+        """
+        # Arrange
+        body = b'{"employees": [{"empNo": "1"}], "total": 1}'
+        mock_response = MagicMock(status_code=200, headers={})
+        mock_response.iter_content.return_value = [body[i:i + 7] for i in range(0, len(body), 7)]
+        mock_post.return_value = mock_response
+
+        # Act
+        result = self.client.query_page({"skip": 0, "take": 1})
+
+        # Assert
+        self.assertEqual(result, {"employees": [{"empNo": "1"}], "total": 1})
+        self.assertTrue(mock_post.call_args.kwargs["stream"])
+        mock_response.json.assert_not_called()
+
+    @patch('src.api_client.time.sleep')
+    @patch('src.api_client.requests.Session.post')
+    def test_query_page_retries_failed_body_read(self, mock_post, mock_sleep):
+        """
+        Test that query_page requests the page again when the connection drops mid-body.
+
+        Mock the first response's body to raise partway through, after some records were parsed.
+        Verify that the page is fetched again and returned once, without duplicate records.
+        """
+        # Arrange
+        body = b'{"employees": [{"empNo": "1"}, {"empNo": "2"}], "total": 2}'
+
+        def broken_body(chunk_size):
+            yield body[:30]
+            raise requests.exceptions.ChunkedEncodingError("Connection reset by peer")
+
+        broken = MagicMock(status_code=200, headers={})
+        broken.iter_content.side_effect = broken_body
+        complete = MagicMock(status_code=200, headers={})
+        complete.iter_content.return_value = [body]
+        mock_post.side_effect = [broken, complete]
+
+        # Act
+        result = self.client.query_page({"skip": 0, "take": 2})
+
+        # Assert
+        self.assertEqual(result, {"employees": [{"empNo": "1"}, {"empNo": "2"}], "total": 2})
+        self.assertEqual(mock_post.call_count, 2)
+        mock_sleep.assert_called_once()
+
+    @patch.object(APIClient, 'query_page')
+    def test_iter_employees_fetches_all_pages(self, mock_query):
+        """
+        Test that iter_employees follows pagination using the reported total.
+        
+        Mock query_page to serve 5 employees in pages of 2.
+        Verify that every record is yielded and each window is requested once.
+        """
+        # Arrange
+        employees = [{"empNo": str(i)} for i in range(5)]
+
+        def serve(payload):
+            page = employees[payload["skip"]:payload["skip"] + payload["take"]]
+            return {"employees": page, "total": len(employees)}
+
+        mock_query.side_effect = serve
+
+        # Act
+        result = list(self.client.iter_employees({"skip": 0, "take": 100}, page_size=2, max_workers=2))
+
+        # Assert
+        self.assertEqual(sorted(e["empNo"] for e in result), ["0", "1", "2", "3", "4"])
+        skips = sorted(call.args[0]["skip"] for call in mock_query.call_args_list)
+        self.assertEqual(skips, [0, 2, 4])
+
+    @patch.object(APIClient, 'query_page')
+    def test_iter_pages_skips_completed_offsets(self, mock_query):
+        """
+        Test that iter_pages leaves out pages recorded as completed.
+        
+        Mock query_page to serve 5 employees in pages of 2, with pages 0 and 2 completed.
+        Verify that only page 4 is yielded and page 2 is never requested.
+        """
+        # Arrange
+        employees = [{"empNo": str(i)} for i in range(5)]
+        mock_query.side_effect = lambda payload: {
+            "employees": employees[payload["skip"]:payload["skip"] + payload["take"]], "total": len(employees)
+        }
+
+        # Act
+        result = list(self.client.iter_pages({"skip": 0}, page_size=2, completed={0, 2}))
+
+        # Assert
+        self.assertEqual(result, [(4, [{"empNo": "4"}])])
+        skips = sorted(call.args[0]["skip"] for call in mock_query.call_args_list)
+        self.assertEqual(skips, [0, 4])
+
+    @patch.object(APIClient, 'query_page')
+    def test_iter_employees_without_total(self, mock_query):
+        """
+        Test that iter_employees walks pages sequentially when no total is returned.
+        
+        Mock query_page to return a full page followed by a short page.
+        Verify that fetching stops after the short page.
+        """
+        # Arrange
+        mock_query.side_effect = [
+            {"employees": [{"empNo": "1"}, {"empNo": "2"}]},
+            {"employees": [{"empNo": "3"}]},
+        ]
+
+        # Act
+        result = list(self.client.iter_employees({}, page_size=2))
+
+        # Assert
+        self.assertEqual([e["empNo"] for e in result], ["1", "2", "3"])
+        self.assertEqual(mock_query.call_count, 2)
+
+    @patch.object(APIClient, 'query_page')
+    def test_iter_employees_failed_page(self, mock_query):
+        """
+        Test that a failed page raises APIError instead of truncating the result.
+        
+        Mock query_page to return None for the second page.
+        Verify that APIError is raised.
+        """
+        # Arrange
+        mock_query.side_effect = lambda payload: (
+            {"employees": [{"empNo": "1"}], "total": 2} if payload["skip"] == 0 else None
+        )
+
+        # Act / Assert
+        with self.assertRaises(APIError):
+            list(self.client.iter_employees({}, page_size=1))
+
+    @patch.object(APIClient, 'query_page')
+    def test_iter_employees_sharded(self, mock_query):
+        """
+        Test that sharded fetching merges shards, dedupes by empNo and checks the total.
+        
+        Serve two location shards that overlap on one employee.
+        Verify that every employee is yielded exactly once.
+        """
+        # Arrange
+        by_location = {
+            1: [{"empNo": "1"}, {"empNo": "2"}, {"empNo": "3"}],
+            2: [{"empNo": "3"}, {"empNo": "4"}],
+        }
+
+        def serve(payload):
+            locations = payload.get("locations") or []
+            employees = by_location[locations[0]] if locations else [{"empNo": str(i)} for i in range(1, 5)]
+            page = employees[payload["skip"]:payload["skip"] + payload["take"]]
+            return {"employees": page, "total": len(employees)}
+
+        mock_query.side_effect = serve
+
+        # Act
+        result = list(self.client.iter_employees_sharded({}, shards_by("locations", [1, 2]), page_size=2))
+
+        # Assert
+        self.assertEqual(sorted(e["empNo"] for e in result), ["1", "2", "3", "4"])
+
+    @patch.object(APIClient, 'query_page')
+    def test_iter_employees_sharded_incomplete(self, mock_query):
+        """
+        Test that shards covering fewer employees than the unfiltered total raise APIError.
+        """
+        # Arrange
+        mock_query.side_effect = lambda payload: (
+            {"employees": [{"empNo": "1"}], "total": 1} if payload.get("locations")
+            else {"employees": [{"empNo": "1"}], "total": 5}
+        )
+
+        # Act / Assert
+        with self.assertRaises(APIError):
+            list(self.client.iter_employees_sharded({}, shards_by("locations", [1])))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
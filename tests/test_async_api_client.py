@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import Mock
+from src.api_client import APIClient, APIError
+from src.async_api_client import AsyncAPIClient
+
+class TestAsyncAPIClient(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        """
+        Set up the test environment before each test method.
+        Wrap a mocked APIClient in an AsyncAPIClient.
+        """
+        self.sync_client = Mock(spec=APIClient)
+        self.client = AsyncAPIClient(self.sync_client, max_concurrency=2)
+
+    async def test_query_api_delegates_to_client(self):
+        """
+        Test that query_api runs the wrapped client's query_api.
+        
+        Verify that the payload is passed through and the response returned.
+        """
+        # Arrange
+        self.sync_client.query_api.return_value = {"employees": []}
+
+        # Act
+        result = await self.client.query_api({"skip": 0})
+
+        # Assert
+        self.assertEqual(result, {"employees": []})
+        self.sync_client.query_api.assert_called_once_with({"skip": 0})
+
+    async def test_iter_pages_fetches_all_pages(self):
+        """
+        Test that iter_pages follows pagination using the reported total.
+        
+        Serve 5 employees in pages of 2 and verify every window is yielded once.
+        """
+        # Arrange
+        employees = [{"empNo": str(i)} for i in range(5)]
+        self.sync_client.query_page.side_effect = lambda payload: {
+            "employees": employees[payload["skip"]:payload["skip"] + payload["take"]],
+            "total": len(employees),
+        }
+
+        # Act
+        pages = [page async for page in self.client.iter_pages({}, page_size=2)]
+
+        # Assert
+        self.assertEqual(sorted(skip for skip, _ in pages), [0, 2, 4])
+        self.assertEqual(sum(len(page) for _, page in pages), 5)
+
+    async def test_iter_pages_failed_page(self):
+        """
+        Test that a failed page raises APIError.
+        
+        Return None for the second page and verify that APIError is raised.
+        """
+        # Arrange
+        self.sync_client.query_page.side_effect = lambda payload: (
+            {"employees": [{"empNo": "1"}], "total": 2} if payload["skip"] == 0 else None
+        )
+
+        # Act / Assert
+        with self.assertRaises(APIError):
+            [page async for page in self.client.iter_pages({}, page_size=1)]
+
+if __name__ == '__main__':
+    unittest.main()
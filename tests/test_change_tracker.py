@@ -0,0 +1,88 @@
+import unittest
+import os
+from src.change_tracker import ChangeTracker, fingerprint
+
+class TestChangeTracker(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up the test environment before each test method.
+        Create a ChangeTracker with a test state file.
+        """
+        self.state_file = "test_employee_state.json"
+        self.tracker = ChangeTracker(self.state_file)
+        self.employee = {"empNo": "1", "givenName": "John", "surname": "Doe", "active": True}
+
+    def tearDown(self):
+        """
+        Clean up after each test method.
+        Remove the test state file if it exists.
+        """
+        if os.path.exists(self.state_file):
+            os.remove(self.state_file)
+
+    def test_fingerprint_ignores_unstored_keys(self):
+        """
+        Test that keys outside the table schema do not change the fingerprint.
+        """
+        # Act
+        with_extra = fingerprint({**self.employee, "lastLogin": "2024-01-01"})
+
+        # Assert
+        self.assertEqual(with_extra, fingerprint(self.employee))
+        self.assertNotEqual(fingerprint({**self.employee, "surname": "Smith"}), fingerprint(self.employee))
+
+    def test_diff_classifies_records(self):
+        """
+        Test that diff splits records into inserts, updates and unchanged.
+        
+        Commit one state, then diff a new fetch containing one unchanged,
+        one modified and one new employee.
+        """
+        # Arrange
+        other = {"empNo": "2", "givenName": "Jane"}
+        self.tracker.commit(self.tracker.diff([self.employee, other]))
+        modified = {**other, "givenName": "Janet"}
+        new = {"empNo": "3", "givenName": "Bob"}
+
+        # Act
+        changes = self.tracker.diff([self.employee, modified, new])
+
+        # Assert
+        self.assertEqual(changes.inserts, [new])
+        self.assertEqual(changes.updates, [modified])
+        self.assertEqual(changes.unchanged, 1)
+        self.assertEqual(changes.changed, [new, modified])
+
+    def test_state_round_trip(self):
+        """
+        Test that saved state is reloaded by a new tracker.
+        
+        Verify that a previously committed record is reported as unchanged.
+        """
+        # Arrange
+        self.tracker.commit(self.tracker.diff([self.employee]))
+        self.assertTrue(self.tracker.save())
+        reloaded = ChangeTracker(self.state_file)
+
+        # Act
+        loaded = reloaded.load()
+        changes = reloaded.diff([self.employee])
+
+        # Assert
+        self.assertTrue(loaded)
+        self.assertEqual(changes.unchanged, 1)
+        self.assertEqual(changes.changed, [])
+
+    def test_load_missing_state(self):
+        """
+        Test that a missing state file is treated as an empty state.
+        """
+        # Act
+        loaded = self.tracker.load()
+
+        # Assert
+        self.assertTrue(loaded)
+        self.assertEqual(self.tracker.diff([self.employee]).inserts, [self.employee])
+
+if __name__ == '__main__':
+    unittest.main()
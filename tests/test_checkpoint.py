@@ -0,0 +1,115 @@
+import unittest
+import os
+from src.checkpoint import CheckpointJournal, run_key
+
+class TestCheckpointJournal(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up the test environment before each test method.
+        Create a CheckpointJournal with a test journal file.
+        """
+        self.path = "test_sync_checkpoint.jsonl"
+        self.key = run_key("https://api.example.com", {"active": 1}, 100)
+        self.journal = CheckpointJournal(self.path)
+
+    def tearDown(self):
+        """
+        Clean up after each test method.
+        Close the journal and remove its file if it exists.
+        """
+        self.journal.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_resume_restores_pages_and_chunks(self):
+        """
+        Test that a resumed journal restores the pages and committed rows of the previous run.
+        """
+        # Arrange
+        self.journal.start(self.key)
+        self.journal.record_page(0, [{"empNo": "1"}, {"empNo": "2"}])
+        self.journal.record_page(100, [{"empNo": "3"}])
+        self.journal.record_chunk(["1", "2"])
+        self.journal.close()
+
+        # Act
+        resumed_journal = CheckpointJournal(self.path)
+        resumed = resumed_journal.start(self.key, resume=True)
+        resumed_journal.close()
+
+        # Assert
+        self.assertTrue(resumed)
+        self.assertEqual(resumed_journal.completed_pages, {0, 100})
+        self.assertEqual(resumed_journal.recovered_pages[100], [{"empNo": "3"}])
+        self.assertEqual(resumed_journal.committed_keys, {"1", "2"})
+
+    def test_start_without_resume_discards_progress(self):
+        """
+        Test that starting without resume truncates the previous journal.
+        """
+        # Arrange
+        self.journal.start(self.key)
+        self.journal.record_page(0, [{"empNo": "1"}])
+        self.journal.close()
+
+        # Act
+        resumed = self.journal.start(self.key)
+
+        # Assert
+        self.assertFalse(resumed)
+        self.assertEqual(self.journal.completed_pages, set())
+
+    def test_resume_ignores_other_configuration(self):
+        """
+        Test that a journal written by a different configuration is not resumed.
+        """
+        # Arrange
+        self.journal.start(self.key)
+        self.journal.record_page(0, [{"empNo": "1"}])
+        self.journal.close()
+
+        # Act
+        resumed = self.journal.start(run_key("https://api.example.com", {"active": 0}, 100), resume=True)
+
+        # Assert
+        self.assertFalse(resumed)
+        self.assertEqual(self.journal.recovered_pages, {})
+
+    def test_resume_drops_torn_last_line(self):
+        """
+        Test that a partially written last event is ignored and later events still load.
+        """
+        # Arrange
+        self.journal.start(self.key)
+        self.journal.record_page(0, [{"empNo": "1"}])
+        self.journal.close()
+        with open(self.path, "a") as f:
+            f.write('{"event":"page","skip":100,"employ')
+
+        # Act
+        self.journal.start(self.key, resume=True)
+        self.journal.record_chunk(["1"])
+        self.journal.close()
+        reloaded = CheckpointJournal(self.path)
+        reloaded.start(self.key, resume=True)
+        reloaded.close()
+
+        # Assert
+        self.assertEqual(reloaded.completed_pages, {0})
+        self.assertEqual(reloaded.committed_keys, {"1"})
+
+    def test_finish_removes_journal(self):
+        """
+        Test that finishing a run deletes the journal file.
+        """
+        # Arrange
+        self.journal.start(self.key)
+
+        # Act
+        self.journal.finish()
+
+        # Assert
+        self.assertFalse(os.path.exists(self.path))
+
+if __name__ == '__main__':
+    unittest.main()
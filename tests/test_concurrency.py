@@ -0,0 +1,103 @@
+import unittest
+import threading
+from unittest.mock import patch, Mock
+from src.api_client import APIClient
+from src.concurrency import AdaptiveLimiter
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up the test environment before each test method.
+        Create a limiter starting at 4 with a ceiling of 8.
+        """
+        self.limiter = AdaptiveLimiter(initial_limit=4, max_limit=8)
+
+    def complete(self, latency, throttled=False, count=1):
+        """
+        Run the given number of requests through the limiter with a fixed outcome.
+        """
+        for _ in range(count):
+            self.limiter.acquire()
+            self.limiter.release(latency, throttled)
+
+    def test_additive_increase(self):
+        """
+        Test that steady fast responses raise the limit up to max_limit.
+        """
+        # Act
+        self.complete(0.05, count=200)
+
+        # Assert
+        self.assertEqual(self.limiter.limit, 8)
+
+    def test_multiplicative_decrease_on_throttle(self):
+        """
+        Test that a 429/503 halves the limit, and a burst of them only counts once.
+        """
+        # Arrange
+        self.complete(10.0, count=1)
+
+        # Act
+        self.complete(10.0, throttled=True, count=3)
+
+        # Assert
+        self.assertEqual(self.limiter.limit, 2)
+        self.assertEqual(self.limiter.stats()["throttled"], 3)
+
+    def test_decrease_on_latency_spike(self):
+        """
+        Test that a response far slower than the baseline counts as congestion.
+        """
+        # Arrange
+        self.complete(0.0, count=1)
+        limit = self.limiter.limit
+
+        # Act
+        self.complete(1.0)
+
+        # Assert
+        self.assertLess(self.limiter.limit, limit)
+
+    def test_acquire_blocks_at_limit(self):
+        """
+        Test that no more than limit requests are admitted at once.
+        """
+        # Arrange
+        limiter = AdaptiveLimiter(initial_limit=1)
+        limiter.acquire()
+        admitted = threading.Event()
+        waiter = threading.Thread(target=lambda: (limiter.acquire(), admitted.set()))
+
+        # Act
+        waiter.start()
+        blocked = not admitted.wait(0.1)
+        limiter.release(0.01)
+        waiter.join(1)
+
+        # Assert
+        self.assertTrue(blocked)
+        self.assertTrue(admitted.is_set())
+
+    @patch('src.api_client.time.sleep')
+    @patch('src.api_client.requests.Session.post')
+    def test_api_client_reports_throttling(self, mock_post, mock_sleep):
+        """
+        Test that APIClient reports a 429 to its limiter and frees the slot.
+        """
+        # Arrange
+        limiter = Mock(spec=AdaptiveLimiter)
+        client = APIClient("https://api.example.com", {}, limiter=limiter)
+        ok = Mock(status_code=200, headers={})
+        ok.json.return_value = {}
+        mock_post.side_effect = [Mock(status_code=429, headers={}), ok]
+
+        # Act
+        client.query_api({})
+
+        # Assert
+        self.assertEqual(limiter.acquire.call_count, 2)
+        throttled_flags = [call.args[1] for call in limiter.release.call_args_list]
+        self.assertEqual(throttled_flags, [True, False])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,12 @@
 import unittest
+import csv
+import gzip
 import os
-from src.csv_handler import save_to_csv
+import stat
+import tempfile
+from unittest.mock import patch
+from src.csv_handler import save_to_csv, write_csv_stream
+from src.models import EmployeeStore
 
 class TestCSVHandler(unittest.TestCase):
     def setUp(self):
@@ -101,5 +107,145 @@ class TestCSVHandler(unittest.TestCase):
         # Assert
         self.assertFalse(result)
 
+    def test_save_to_csv_employee_store(self):
+        """
+        Test that save_to_csv accepts an EmployeeStore directly.
+        
+        Verify that the header holds the table columns and each employee is written.
+        """
+        # Arrange
+        store = EmployeeStore.from_records([{"empNo": "1", "givenName": "John"}, {"empNo": "2"}])
+
+        # Act
+        result = save_to_csv(store, self.test_filename)
+
+        # Assert
+        self.assertTrue(result)
+        with open(self.test_filename, newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row["empNo"] for row in rows], ["1", "2"])
+        self.assertEqual(rows[0]["givenName"], "John")
+
+    def test_write_csv_stream_union_schema(self):
+        """
+        Test that a record with new keys extends the header instead of failing.
+        
+        Stream records from a generator where the second record adds a column.
+        Verify that the header is the union of keys and the first row is padded.
+        """
+        # Arrange
+        records = (r for r in [{"empNo": "1"}, {"empNo": "2", "email": "jane@example.com"}])
+
+        # Act
+        result = write_csv_stream(records, self.test_filename)
+
+        # Assert
+        self.assertEqual(result, 2)
+        with open(self.test_filename, newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows, [["empNo", "email"], ["1", ""], ["2", "jane@example.com"]])
+
+    def test_write_csv_stream_employee_store_keeps_api_fields(self):
+        """
+        Test that exporting an EmployeeStore keeps API fields that are not table columns.
+        """
+        # Arrange
+        store = EmployeeStore.from_records([{"empNo": "1", "locationName": "Calgary", "hireDate": "2020-01-01"}])
+
+        # Act
+        write_csv_stream(store, self.test_filename)
+
+        # Assert
+        with open(self.test_filename, newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows, [["empNo", "locationName", "hireDate"], ["1", "Calgary", "2020-01-01"]])
+
+    def test_write_csv_stream_writes_rows_once(self):
+        """
+        Test that rows are staged only when a later record widens the header.
+
+        Verify that a store and a generator with a fixed schema are written straight to the
+        output, and that a growing schema stages the rows and rewrites the file once.
+        """
+        # Arrange
+        store = EmployeeStore.from_records([{"empNo": "1"}, {"empNo": "2", "hireDate": "2020-01-01"}])
+        fixed = ({"empNo": str(index), "surname": "Doe"} for index in range(3))
+        growing = ({"empNo": "1"}, {"empNo": "2", "email": "jane@example.com"})
+
+        # Act
+        with patch("src.csv_handler.tempfile.mkstemp", wraps=tempfile.mkstemp) as mkstemp:
+            write_csv_stream(store, self.test_filename)
+            write_csv_stream(fixed, self.test_filename)
+            direct = mkstemp.call_count
+            write_csv_stream(growing, self.test_filename)
+
+        # Assert
+        self.assertEqual(direct, 2)
+        self.assertEqual(mkstemp.call_count - direct, 3)
+
+    def test_write_csv_stream_gzip_append(self):
+        """
+        Test appending to a gzip-compressed export.
+        
+        Write one record, then append two more, one of which adds a column.
+        Verify that the decompressed file holds all rows under the widened header.
+        """
+        # Arrange
+        filename = self.test_filename + ".gz"
+        self.addCleanup(os.remove, filename)
+        write_csv_stream([{"empNo": "1", "surname": "Doe"}], filename, compression="gzip")
+
+        # Act
+        first = write_csv_stream([{"empNo": "2", "surname": "Smith"}], filename, compression="gzip", append=True)
+        second = write_csv_stream([{"empNo": "3", "active": True}], filename, compression="gzip", append=True)
+
+        # Assert
+        self.assertEqual((first, second), (1, 1))
+        with gzip.open(filename, "rt", newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows, [
+            ["empNo", "surname", "active"],
+            ["1", "Doe", ""],
+            ["2", "Smith", ""],
+            ["3", "", "True"],
+        ])
+
+    def test_write_csv_stream_file_mode(self):
+        """
+        Test that a new export gets the permissions open() would give it, and a rewrite keeps them.
+        """
+        # Arrange
+        umask = os.umask(0o022)
+        self.addCleanup(os.umask, umask)
+
+        # Act
+        write_csv_stream([{"empNo": "1"}], self.test_filename)
+        created = stat.S_IMODE(os.stat(self.test_filename).st_mode)
+        os.chmod(self.test_filename, 0o640)
+        write_csv_stream([{"empNo": "2"}], self.test_filename)
+
+        # Assert
+        self.assertEqual(created, 0o644)
+        self.assertEqual(stat.S_IMODE(os.stat(self.test_filename).st_mode), 0o640)
+
+    def test_write_csv_stream_unknown_compression(self):
+        """
+        Test that an unknown compression format is rejected.
+        """
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            write_csv_stream([], self.test_filename, compression="lz4")
+
+    def test_write_csv_stream_missing_directory(self):
+        """
+        Test that a write failure returns None and leaves no file behind.
+        """
+        # Act
+        result = write_csv_stream([{"empNo": "1"}], "missing_dir/employees.csv")
+
+        # Assert
+        self.assertIsNone(result)
+        self.assertFalse(os.path.exists("missing_dir/employees.csv"))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,118 @@
+import unittest
+import json
+import threading
+import time
+import urllib.request
+from src import metrics
+from src.daemon import StatusServer, SyncService
+
+class TestSyncService(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up the test environment before each test method.
+        Create a SyncService whose syncs block until released.
+        """
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.modes = []
+
+        def run_sync(mode):
+            self.modes.append(mode)
+            self.started.set()
+            with metrics.span("sync.fetch"):
+                self.release.wait(5)
+            return True
+
+        self.service = SyncService(run_sync)
+        self.service.start()
+
+    def tearDown(self):
+        """
+        Clean up after each test method.
+        Release any blocked sync and stop the service.
+        """
+        self.release.set()
+        self.service.stop(timeout=5)
+
+    def wait_for_runs(self, count):
+        deadline = time.time() + 5
+        while len(self.service.history) < count and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_triggers_during_a_run_coalesce(self):
+        """
+        Test that triggers received while a sync runs coalesce into one follow-up run.
+
+        Trigger a run, then trigger twice more while it is blocked.
+        Verify that exactly one follow-up run happens, in the most thorough mode requested.
+        """
+        # Arrange
+        self.service.trigger("incremental")
+        self.started.wait(5)
+
+        # Act
+        first = self.service.trigger("full_refresh")
+        second = self.service.trigger("incremental")
+        self.release.set()
+        self.wait_for_runs(2)
+        time.sleep(0.05)
+
+        # Assert
+        self.assertTrue(first)
+        self.assertFalse(second)
+        self.assertEqual(self.modes, ["incremental", "full_refresh"])
+        self.assertEqual(self.service.status()["coalesced"], 1)
+
+    def test_status_reports_stage_timings(self):
+        """
+        Test that finished runs are reported with their outcome and stage timings.
+        """
+        # Arrange
+        self.release.set()
+
+        # Act
+        self.service.trigger()
+        self.wait_for_runs(1)
+        status = self.service.status()
+
+        # Assert
+        self.assertEqual(status["state"], "idle")
+        run = status["runs"][0]
+        self.assertTrue(run["success"])
+        self.assertIn("sync.fetch", run["stages"])
+        self.assertIsNone(metrics.active())
+
+    def test_trigger_rejects_unknown_mode(self):
+        """
+        Test that an unknown sync mode raises ValueError.
+        """
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            self.service.trigger("everything")
+
+    def test_status_server_triggers_and_reports(self):
+        """
+        Test that the status server triggers runs and reports the service status.
+        """
+        # Arrange
+        self.release.set()
+        server = StatusServer(self.service, port=0)
+        server.start()
+        host, port = server.address
+        try:
+            # Act
+            request = urllib.request.Request(f"http://{host}:{port}/trigger?mode=full", method="POST")
+            with urllib.request.urlopen(request) as response:
+                trigger_status = response.status
+            self.wait_for_runs(1)
+            with urllib.request.urlopen(f"http://{host}:{port}/status") as response:
+                status = json.loads(response.read())
+        finally:
+            server.stop()
+
+        # Assert
+        self.assertEqual(trigger_status, 202)
+        self.assertEqual(status["runs"][0]["mode"], "full")
+
+if __name__ == '__main__':
+    unittest.main()
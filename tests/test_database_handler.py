@@ -1,7 +1,9 @@
 import unittest
-from unittest.mock import patch, Mock
+import os
+from unittest.mock import patch, MagicMock, Mock
 from mysql.connector import Error
-from src.database_handler import DatabaseHandler
+from src.database_handler import DatabaseHandler, partition_for
+from src.models import EmployeeStore
 
 class TestDatabaseHandler(unittest.TestCase):
     def setUp(self):
@@ -140,5 +142,509 @@ class TestDatabaseHandler(unittest.TestCase):
         self.assertFalse(result)
         mock_connection.rollback.assert_called_once()
 
+    def test_insert_data_employee_store(self):
+        """
+        Test that insert_data accepts an EmployeeStore directly.
+        
+        Verify that executemany receives one parameter dict per stored employee.
+        """
+        # Arrange
+        mock_connection = MagicMock()
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        store = EmployeeStore.from_records([{"empNo": "1"}, {"empNo": "2"}])
+
+        # Act
+        result = self.db_handler.insert_data(mock_connection, store)
+
+        # Assert
+        self.assertTrue(result)
+        rows = mock_cursor.executemany.call_args.args[1]
+        self.assertEqual([row["empNo"] for row in rows], ["1", "2"])
+        mock_connection.commit.assert_called_once()
+
+    def test_bulk_load_csv_success(self):
+        """
+        Test bulk loading a CSV export through a staging table.
+        
+        Write a CSV with a known and an unknown column.
+        Verify that the file is loaded with LOAD DATA, merged into the table, and committed.
+        """
+        # Arrange
+        filename = "test_bulk_employees.csv"
+        with open(filename, 'w', newline='') as f:
+            f.write("empNo,givenName,unknownField,active\r\n1,John,x,True\r\n")
+        self.addCleanup(os.remove, filename)
+        mock_connection = MagicMock()
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+
+        # Act
+        result = self.db_handler.bulk_load_csv(mock_connection, filename)
+
+        # Assert
+        self.assertTrue(result)
+        queries = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        load_query = next(q for q in queries if "LOAD DATA LOCAL INFILE" in q)
+        self.assertIn("(@empNo, @givenName, @_ignored, @active)", load_query)
+        merge_query = next(q for q in queries if "INSERT INTO AVANTI_EMPLOYEES (empNo, givenName, active)" in q)
+        self.assertIn("givenName = VALUES(givenName)", merge_query)
+        self.assertNotIn("surname", merge_query)
+        mock_connection.commit.assert_called_once()
+
+    def test_bulk_load_csv_failure(self):
+        """
+        Test bulk load failure.
+        
+        Mock the cursor to raise an Error when executing SQL.
+        Verify that the method returns False and a rollback occurs.
+        """
+        # Arrange
+        filename = "test_bulk_employees.csv"
+        with open(filename, 'w', newline='') as f:
+            f.write("empNo,givenName\r\n1,John\r\n")
+        self.addCleanup(os.remove, filename)
+        mock_connection = MagicMock()
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        mock_cursor.execute.side_effect = Error("Load failed")
+
+        # Act
+        result = self.db_handler.bulk_load_csv(mock_connection, filename)
+
+        # Assert
+        self.assertFalse(result)
+        mock_connection.rollback.assert_called_once()
+
+    def test_write_batches_chunks_and_commits(self):
+        """
+        Test that write_batches splits records into chunks and commits each one.
+        
+        Write 5 records with a batch size of 2.
+        Verify that 3 chunks are executed and committed and stats are returned per chunk.
+        """
+        # Arrange
+        mock_connection = MagicMock()
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        records = ({"empNo": str(i), "givenName": "John"} for i in range(5))
+
+        # Act
+        stats = self.db_handler.write_batches(mock_connection, records, batch_rows=2)
+
+        # Assert
+        self.assertEqual([batch.rows for batch in stats], [2, 2, 1])
+        self.assertEqual(sum(batch.written for batch in stats), 5)
+        self.assertEqual(mock_cursor.executemany.call_count, 3)
+        self.assertEqual(mock_connection.commit.call_count, 3)
+
+    def test_write_batches_prepared_statements(self):
+        """
+        Test that prepared mode reuses one prepared statement per chunk size.
+
+        Write 5 records with a batch size of 2.
+        Verify that the two full chunks share a statement, the last chunk gets its own,
+        rows are sent as flat parameters in column order, and the statements are closed.
+        """
+        # Arrange
+        handler = DatabaseHandler("localhost", "user", "password", "test_db", prepared_statements=True)
+        mock_connection = MagicMock()
+        cursors = [MagicMock(), MagicMock()]
+        mock_connection.cursor.side_effect = cursors
+        records = [{"empNo": str(i), "givenName": "John"} for i in range(5)]
+
+        # Act
+        stats = handler.write_batches(mock_connection, records, batch_rows=2)
+
+        # Assert
+        self.assertEqual(sum(batch.written for batch in stats), 5)
+        mock_connection.cursor.assert_called_with(prepared=True)
+        self.assertEqual(cursors[0].execute.call_count, 2)
+        first, second = cursors[0].execute.call_args_list
+        self.assertIs(first.args[0], second.args[0])
+        self.assertEqual(first.args[1][:2], ("0", "John"))
+        self.assertEqual(len(first.args[1]), 20)
+        self.assertEqual(len(cursors[1].execute.call_args.args[1]), 10)
+        cursors[0].close.assert_called_once()
+        cursors[1].close.assert_called_once()
+
+    def test_write_batches_load_session(self):
+        """
+        Test that load mode relaxes the session settings for the load and restores them afterwards.
+        """
+        # Arrange
+        handler = DatabaseHandler("localhost", "user", "password", "test_db", load_session=True)
+        mock_connection = MagicMock()
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+
+        # Act
+        handler.write_batches(mock_connection, [{"empNo": "1"}])
+
+        # Assert
+        statements = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        self.assertIn("SESSION unique_checks = 0", statements[0])
+        self.assertIn("SESSION autocommit = 0", statements[0])
+        self.assertIn("SESSION unique_checks = @sync_unique_checks", statements[-1])
+        mock_cursor.executemany.assert_called_once()
+
+    @patch('src.database_handler.mysql.connector.HAVE_CEXT', False, create=True)
+    def test_protocol_options(self):
+        """
+        Test that the driver and compression options end up in the connection config.
+
+        Verify that the C extension falls back to pure Python when it isn't installed, and that
+        automatic compression is only enabled for remote hosts.
+        """
+        # Act
+        remote = DatabaseHandler("db.example.com", "user", "password", "test_db", use_pure=False, compress=None)
+        local = DatabaseHandler("localhost", "user", "password", "test_db", compress=None)
+
+        # Assert
+        self.assertIs(remote.config["use_pure"], True)
+        self.assertIs(remote.config["compress"], True)
+        self.assertNotIn("compress", local.config)
+        self.assertNotIn("use_pure", local.config)
+
+    def test_write_batches_byte_limit(self):
+        """
+        Test that chunks are also bounded by their estimated statement size.
+        """
+        # Arrange
+        mock_connection = MagicMock()
+        records = [{"empNo": str(i), "givenName": "x" * 100} for i in range(4)]
+
+        # Act
+        stats = self.db_handler.write_batches(mock_connection, records, batch_rows=100, batch_bytes=400)
+
+        # Assert
+        self.assertEqual([batch.rows for batch in stats], [2, 2])
+        self.assertTrue(all(batch.bytes <= 400 for batch in stats))
+
+    def test_write_batches_isolates_bad_rows(self):
+        """
+        Test that a failing chunk is bisected until the bad row is isolated.
+        
+        Mock executemany to fail whenever the batch contains empNo 3.
+        Verify that only that row is reported as failed and the rest are written.
+        """
+        # Arrange
+        mock_connection = MagicMock()
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+
+        def execute(query, rows):
+            if any(row["empNo"] == "3" for row in rows):
+                raise Error("Data too long")
+
+        mock_cursor.executemany.side_effect = execute
+        records = [{"empNo": str(i)} for i in range(8)]
+
+        # Act
+        stats = self.db_handler.write_batches(mock_connection, records, batch_rows=8)
+
+        # Assert
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0].written, 7)
+        self.assertEqual(stats[0].failed_keys, ["3"])
+
+    def test_write_batches_survives_failed_rollback(self):
+        """
+        Test that a chunk whose rollback fails too is reported as failed instead of raising.
+
+        Mock executemany and rollback to fail, as when the connection was lost mid-chunk.
+        Verify that the chunk is not bisected and every row is reported as failed.
+        """
+        # Arrange
+        mock_connection = MagicMock()
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        mock_cursor.executemany.side_effect = Error("Lost connection to MySQL server during query")
+        mock_connection.rollback.side_effect = Error("MySQL Connection not available")
+        records = [{"empNo": str(i)} for i in range(4)]
+
+        # Act
+        stats = self.db_handler.write_batches(mock_connection, records, batch_rows=4)
+
+        # Assert
+        self.assertEqual(stats[0].written, 0)
+        self.assertEqual(stats[0].failed_keys, ["0", "1", "2", "3"])
+        self.assertEqual(mock_cursor.executemany.call_count, 1)
+
+    def test_write_batches_reports_committed_keys(self):
+        """
+        Test that on_commit receives the rows of each chunk that were committed.
+        
+        Mock executemany to fail whenever the batch contains empNo 1.
+        Verify that the failed row is left out of the committed keys.
+        """
+        # Arrange
+        mock_connection = MagicMock()
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+
+        def execute(query, rows):
+            if any(row["empNo"] == "1" for row in rows):
+                raise Error("Data too long")
+
+        mock_cursor.executemany.side_effect = execute
+        records = [{"empNo": str(i)} for i in range(4)]
+        committed = []
+
+        # Act
+        self.db_handler.write_batches(mock_connection, records, batch_rows=2, on_commit=committed.append)
+
+        # Assert
+        self.assertEqual(committed, [["0"], ["2", "3"]])
+
+    @patch('src.database_handler.mysql.connector.pooling.MySQLConnectionPool')
+    def test_connect_pooled(self, mock_pool_class):
+        """
+        Test that pooled mode borrows connections from a single lazily created pool.
+        """
+        # Arrange
+        handler = DatabaseHandler("localhost", "user", "password", "test_db", pool_size=3)
+
+        # Act
+        first = handler.connect()
+        second = handler.connect()
+
+        # Assert
+        mock_pool_class.assert_called_once()
+        self.assertEqual(mock_pool_class.call_args.kwargs["pool_size"], 3)
+        self.assertIs(first, mock_pool_class.return_value.get_connection.return_value)
+        self.assertIs(second, first)
+
+    def test_connect_shared_pool_selects_database(self):
+        """
+        Test that a connection borrowed from a shared pool is switched to the handler's database.
+        """
+        # Arrange
+        pool = MagicMock()
+        pool.pool_size = 4
+        handler = DatabaseHandler("localhost", "user", "password", "tenant_db", pool=pool)
+
+        # Act
+        connection = handler.connect()
+
+        # Assert
+        self.assertIs(connection, pool.get_connection.return_value)
+        connection.cmd_init_db.assert_called_once_with("tenant_db")
+        self.assertEqual(handler.pool_size, 4)
+
+    def test_parallel_upsert_partitions_by_emp_no(self):
+        """
+        Test that parallel_upsert routes every key to a single worker connection.
+        
+        Give each worker its own mock connection and write 20 records over 3 workers.
+        Verify that all records are written and each key only reaches its partition's connection.
+        """
+        # Arrange
+        connections = [MagicMock() for _ in range(3)]
+        written = {id(c): [] for c in connections}
+        for connection in connections:
+            cursor = connection.cursor.return_value.__enter__.return_value
+            cursor.executemany.side_effect = (
+                lambda query, rows, c=connection: written[id(c)].extend(row["empNo"] for row in rows)
+            )
+        self.db_handler.connect = Mock(side_effect=connections)
+        records = ({"empNo": str(i)} for i in range(20))
+
+        # Act
+        stats = self.db_handler.parallel_upsert(records, workers=3, batch_rows=4)
+
+        # Assert
+        self.assertEqual(sum(batch.written for batch in stats), 20)
+        for keys in written.values():
+            self.assertEqual(len({partition_for(key, 3) for key in keys}), min(len(keys), 1))
+        for connection in connections:
+            connection.close.assert_called_once()
+
+    def test_full_refresh_swaps_shadow_table(self):
+        """
+        Test that a full refresh loads a shadow table and swaps it in atomically.
+        
+        Verify that records are written to the shadow table and a single RENAME TABLE
+        statement swaps both tables.
+        """
+        # Arrange
+        mock_connection = MagicMock()
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchall.return_value = [(2,)]
+        records = [{"empNo": "1"}, {"empNo": "2"}]
+
+        # Act
+        result = self.db_handler.full_refresh(mock_connection, records, expected_rows=2)
+
+        # Assert
+        self.assertTrue(result)
+        self.assertIn("INSERT INTO AVANTI_EMPLOYEES_SHADOW", mock_cursor.executemany.call_args.args[0])
+        queries = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        self.assertIn(
+            "RENAME TABLE AVANTI_EMPLOYEES TO AVANTI_EMPLOYEES_OLD, AVANTI_EMPLOYEES_SHADOW TO AVANTI_EMPLOYEES",
+            queries,
+        )
+
+    def test_full_refresh_aborts_on_failed_rows(self):
+        """
+        Test that a full refresh leaves the live table alone if any row fails to load.
+        
+        Mock executemany to fail for every row.
+        Verify that no RENAME TABLE is issued and the shadow table is dropped.
+        """
+        # Arrange
+        mock_connection = MagicMock()
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        mock_cursor.executemany.side_effect = Error("Insert failed")
+
+        # Act
+        result = self.db_handler.full_refresh(mock_connection, [{"empNo": "1"}])
+
+        # Assert
+        self.assertFalse(result)
+        queries = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        self.assertFalse(any(q.startswith("RENAME TABLE") for q in queries))
+        self.assertEqual(queries[-1], "DROP TABLE IF EXISTS AVANTI_EMPLOYEES_SHADOW")
+
+    def test_full_refresh_succeeds_when_cleanup_fails(self):
+        """
+        Test that a failure to drop the old table after the swap does not fail the refresh.
+        """
+        # Arrange
+        mock_connection = MagicMock()
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchall.return_value = [(1,)]
+
+        def execute(query, *args):
+            if query == "DROP TABLE AVANTI_EMPLOYEES_OLD":
+                raise Error("Drop failed")
+
+        mock_cursor.execute.side_effect = execute
+
+        # Act
+        result = self.db_handler.full_refresh(mock_connection, [{"empNo": "1"}])
+
+        # Assert
+        self.assertTrue(result)
+
+    def test_full_refresh_refuses_truncated_snapshot(self):
+        """
+        Test that a full refresh keeps the live table when the snapshot looks truncated.
+
+        Refresh with an empty snapshot, one smaller than the API's total, and one much
+        smaller than the live table.
+        Verify that none of them is swapped in and the shadow table is dropped each time.
+        """
+        cases = [
+            ([{"empNo": "1"}], [[(0,)], [(100,)]], None),
+            ([{"empNo": "1"}], [[(1,)], [(1,)]], 2),
+            ([{"empNo": "1"}], [[(1,)], [(100,)]], None),
+        ]
+        for records, counts, expected_rows in cases:
+            with self.subTest(counts=counts, expected_rows=expected_rows):
+                # Arrange
+                mock_connection = MagicMock()
+                mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+                mock_cursor.fetchall.side_effect = counts
+
+                # Act
+                result = self.db_handler.full_refresh(mock_connection, records, expected_rows=expected_rows)
+
+                # Assert
+                self.assertFalse(result)
+                queries = [call.args[0] for call in mock_cursor.execute.call_args_list]
+                self.assertFalse(any(q.startswith("RENAME TABLE") for q in queries))
+                self.assertEqual(queries[-1], "DROP TABLE IF EXISTS AVANTI_EMPLOYEES_SHADOW")
+
+    def test_full_refresh_indexes_shadow_after_load(self):
+        """
+        Test that the shadow table is created without secondary indexes and indexed before the swap.
+        """
+        # Arrange
+        mock_connection = MagicMock()
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchall.return_value = [(1,)]
+
+        # Act
+        self.db_handler.full_refresh(mock_connection, [{"empNo": "1"}])
+
+        # Assert
+        queries = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        shadow_create = next(q for q in queries if "CREATE TABLE IF NOT EXISTS AVANTI_EMPLOYEES_SHADOW" in q)
+        self.assertNotIn("INDEX", shadow_create)
+        add_index = next(i for i, q in enumerate(queries) if q.startswith("ALTER TABLE AVANTI_EMPLOYEES_SHADOW ADD INDEX"))
+        rename = next(i for i, q in enumerate(queries) if q.startswith("RENAME TABLE"))
+        self.assertLess(add_index, rename)
+
+    def test_migrate_indexes_adds_missing_online(self):
+        """
+        Test that only missing secondary indexes are added, with an online ALTER TABLE.
+        """
+        # Arrange
+        mock_connection = MagicMock()
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchall.return_value = [("PRIMARY",), ("idx_surname",)]
+
+        # Act
+        result = self.db_handler.migrate_indexes(mock_connection)
+
+        # Assert
+        self.assertTrue(result)
+        alter = mock_cursor.execute.call_args_list[-1].args[0]
+        self.assertNotIn("idx_surname", alter)
+        self.assertIn("ADD INDEX idx_position_active (positionName, active)", alter)
+        self.assertTrue(alter.endswith("ALGORITHM=INPLACE, LOCK=NONE"))
+
+    def test_get_employees_batches_keys(self):
+        """
+        Test that get_employees looks keys up in batches and converts the active flag.
+        """
+        # Arrange
+        mock_connection = MagicMock()
+        mock_connection.unread_result = False
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.__iter__.side_effect = [iter([{"empNo": "1", "active": 1}, {"empNo": "2", "active": 0}]), iter([])]
+
+        # Act
+        result = self.db_handler.get_employees(mock_connection, ["1", "2", "3"], batch_size=2)
+
+        # Assert
+        self.assertEqual(result, [{"empNo": "1", "active": True}, {"empNo": "2", "active": False}])
+        self.assertEqual(mock_cursor.execute.call_count, 2)
+        self.assertEqual(mock_cursor.execute.call_args_list[1].args[1], ("3",))
+        mock_connection.cursor.assert_called_with(dictionary=True, buffered=False)
+
+    def test_page_employees_seeks_past_cursor(self):
+        """
+        Test that page_employees filters with a keyset condition instead of OFFSET.
+        """
+        # Arrange
+        mock_connection = MagicMock()
+        mock_connection.unread_result = False
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.__iter__.return_value = iter([{"empNo": "11"}, {"empNo": "12"}])
+
+        # Act
+        employees, next_after = self.db_handler.page_employees(
+            mock_connection, after="10", limit=2, position_name="Nurse", active=True
+        )
+
+        # Assert
+        query, params = mock_cursor.execute.call_args.args
+        self.assertIn("WHERE positionName = %s AND active = %s AND empNo > %s ORDER BY empNo LIMIT %s", query)
+        self.assertNotIn("OFFSET", query)
+        self.assertEqual(params, ("Nurse", True, "10", 2))
+        self.assertEqual(next_after, "12")
+
+    def test_query_employees_streams_all_pages(self):
+        """
+        Test that query_employees follows keyset pages until a short page.
+        """
+        # Arrange
+        mock_connection = MagicMock()
+        mock_connection.unread_result = False
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.__iter__.side_effect = [iter([{"empNo": "1"}, {"empNo": "2"}]), iter([{"empNo": "3"}])]
+
+        # Act
+        result = list(self.db_handler.query_employees(mock_connection, surname_prefix="O_B", page_size=2))
+
+        # Assert
+        self.assertEqual([e["empNo"] for e in result], ["1", "2", "3"])
+        second_params = mock_cursor.execute.call_args_list[1].args[1]
+        self.assertEqual(second_params, ("O\\_B%", "2", 2))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
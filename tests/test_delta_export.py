@@ -0,0 +1,192 @@
+import unittest
+import csv
+import json
+import os
+from unittest.mock import patch
+from src import delta_export
+from src.delta_export import write_delta
+
+class TestDeltaExport(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up the test environment before each test method.
+        Create sample employee records and the names of the test output and state files.
+        """
+        self.records = [
+            {"empNo": "1", "givenName": "Ada", "surname": "Lovelace", "photoRevision": 1, "active": True},
+            {"empNo": "2", "givenName": "Grace", "surname": "Hopper", "photoRevision": 4, "active": True},
+            {"empNo": "3", "givenName": "Alan", "surname": "Turing", "photoRevision": 2, "active": True},
+        ]
+        self.filename = "test_delta.ndjson"
+        self.state_file = "test_delta_state.snap"
+
+    def tearDown(self):
+        """
+        Clean up after each test method.
+        Remove the test output and state files if they exist.
+        """
+        for filename in (self.filename, "test_delta.csv", self.state_file, f"{self.state_file}.seq"):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def read_events(self):
+        with open(self.filename) as f:
+            return [json.loads(line) for line in f]
+
+    def test_first_export_inserts_everyone(self):
+        """
+        Test that the first export, without previous state, emits every employee as an insert.
+        """
+        # Act
+        result = write_delta(self.records, self.filename, self.state_file)
+
+        # Assert
+        events = self.read_events()
+        self.assertEqual(result.inserts, 3)
+        self.assertEqual((result.first_sequence, result.last_sequence), (1, 3))
+        self.assertEqual([event["seq"] for event in events], [1, 2, 3])
+        self.assertEqual(events[0]["fields"]["surname"], "Lovelace")
+
+    def test_second_export_emits_only_changes(self):
+        """
+        Test that a later export emits updates with the changed fields, deactivations and removals.
+
+        Change one surname, deactivate one employee, drop one and add one.
+        Verify that one event per change is appended, numbered after the first export's events.
+        """
+        # Arrange
+        write_delta(self.records, self.filename, self.state_file)
+        changed = [dict(record) for record in self.records[:2]]
+        changed[0]["surname"] = "King"
+        changed[1]["active"] = False
+        changed.append({"empNo": "4", "givenName": "Edsger", "surname": "Dijkstra"})
+
+        # Act
+        result = write_delta(changed, self.filename, self.state_file)
+
+        # Assert
+        events = self.read_events()[3:]
+        self.assertEqual(result, (1, 1, 1, 1, 4, 7))
+        self.assertEqual([(event["seq"], event["op"], event["empNo"]) for event in events], [
+            (4, "update", "1"), (5, "deactivate", "2"), (6, "remove", "3"), (7, "insert", "4"),
+        ])
+        self.assertEqual(events[0]["fields"], {"surname": "King"})
+        self.assertEqual(events[1]["fields"], {"active": False})
+        self.assertEqual(events[2]["fields"], {})
+
+    def test_unchanged_export_appends_nothing(self):
+        """
+        Test that an export without changes appends nothing and keeps the sequence.
+        """
+        # Arrange
+        write_delta(self.records, self.filename, self.state_file)
+
+        # Act
+        result = write_delta(list(reversed(self.records)), self.filename, self.state_file)
+        added = write_delta(self.records + [{"empNo": "5"}], self.filename, self.state_file)
+
+        # Assert
+        self.assertEqual(result, (0, 0, 0, 0, None, None))
+        self.assertEqual(added.first_sequence, 4)
+        self.assertEqual(len(self.read_events()), 4)
+
+    def test_failed_export_never_reuses_sequence_numbers(self):
+        """
+        Test that events appended by an export that failed afterwards keep unique numbers.
+
+        Make the first export fail after its events were written, before the state is saved.
+        Verify that the retry emits the changes again with new sequence numbers.
+        """
+        # Arrange
+        write_events = delta_export._write_ndjson_events
+
+        def write_then_fail(*args):
+            write_events(*args)
+            raise IOError("Disk full")
+
+        with patch("src.delta_export._write_ndjson_events", side_effect=write_then_fail):
+            failed = write_delta(self.records, self.filename, self.state_file)
+
+        # Act
+        result = write_delta(self.records, self.filename, self.state_file)
+
+        # Assert
+        self.assertIsNone(failed)
+        self.assertEqual((result.first_sequence, result.last_sequence), (4, 6))
+        self.assertEqual([event["seq"] for event in self.read_events()], [1, 2, 3, 4, 5, 6])
+
+    def test_truncated_fetch_is_refused(self):
+        """
+        Test that an empty or partial fetch appends no removals and keeps the previous state.
+
+        Verify that an empty fetch, one below the API's total, and one much smaller than the
+        previous export are refused, and that the next complete fetch emits nothing.
+        """
+        # Arrange
+        write_delta(self.records, self.filename, self.state_file)
+
+        # Act
+        empty = write_delta([], self.filename, self.state_file)
+        short = write_delta(self.records[:2], self.filename, self.state_file, expected_total=3)
+        partial = write_delta(self.records[:1], self.filename, self.state_file)
+        complete = write_delta(self.records, self.filename, self.state_file)
+
+        # Assert
+        self.assertEqual((empty, short, partial), (None, None, None))
+        self.assertEqual(complete, (0, 0, 0, 0, None, None))
+        self.assertEqual(len(self.read_events()), 3)
+
+    def test_active_only_fetch_emits_deactivations(self):
+        """
+        Test that an employee dropping out of an active-only fetch is emitted as a deactivation.
+
+        Use records shaped like the API's response to the sync's payload, which filters on
+        ``active``: a deactivated employee is simply missing from the next fetch.
+        Verify that it is emitted as ``deactivate`` with ``active`` false, not ``remove``.
+        """
+        # Arrange
+        records = [
+            {"empNo": str(index), "givenName": "Given", "surname": "Smith", "preferredName": None,
+             "initial": "G", "positionName": "Developer", "positionNameFr": "Développeur",
+             "photoRevision": index, "active": True, "email": f"{index}@example.com"}
+            for index in range(1, 5)
+        ]
+        write_delta(records, self.filename, self.state_file, active_only=True)
+
+        # Act
+        result = write_delta(records[:3], self.filename, self.state_file, active_only=True)
+
+        # Assert
+        self.assertEqual((result.deactivations, result.removals), (1, 0))
+        self.assertEqual(self.read_events()[-1], {"seq": 5, "op": "deactivate", "empNo": "4", "fields": {"active": False}})
+
+    def test_csv_format(self):
+        """
+        Test that CSV events list the columns they set, so empty values are unambiguous.
+        """
+        # Arrange
+        write_delta(self.records, "test_delta.csv", self.state_file, delta_format="csv")
+        changed = [dict(record) for record in self.records]
+        changed[2]["surname"] = None
+
+        # Act
+        write_delta(changed, "test_delta.csv", self.state_file, delta_format="csv")
+
+        # Assert
+        with open("test_delta.csv", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[-1]["seq"], "4")
+        self.assertEqual(rows[-1]["changed"], "surname")
+        self.assertEqual(rows[-1]["surname"], "")
+
+    def test_unknown_format_raises(self):
+        """
+        Test that an unknown output format raises ValueError.
+        """
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            write_delta(self.records, self.filename, self.state_file, delta_format="xml")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import os
+import shutil
+import tempfile
+from unittest.mock import patch, Mock
+from src.api_client import APIClient
+from src.http_cache import ResponseCache
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up the test environment before each test method.
+        Create a ResponseCache in a temporary directory.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.cache = ResponseCache(self.directory, ttl=60, max_bytes=100)
+
+    def tearDown(self):
+        """
+        Clean up after each test method.
+        Remove the temporary cache directory.
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_key_is_canonical(self):
+        """
+        Test that payloads differing only in key order share a cache key.
+        """
+        # Act / Assert
+        self.assertEqual(
+            ResponseCache.key("https://api", {"skip": 0, "take": 10}),
+            ResponseCache.key("https://api", {"take": 10, "skip": 0}),
+        )
+        self.assertNotEqual(
+            ResponseCache.key("https://api", {"skip": 0}),
+            ResponseCache.key("https://api", {"skip": 10}),
+        )
+
+    def test_key_includes_credentials(self):
+        """
+        Test that the same request made with different tokens gets different cache keys.
+        """
+        # Act / Assert
+        self.assertNotEqual(
+            ResponseCache.key("https://api", {"skip": 0}, "Bearer tenant-a"),
+            ResponseCache.key("https://api", {"skip": 0}, "Bearer tenant-b"),
+        )
+
+    def test_entry_without_timestamp_is_a_miss(self):
+        """
+        Test that an entry whose metadata lost its timestamp is treated as not cached.
+        """
+        # Arrange
+        self.cache.put("abc", b"body")
+        with open(os.path.join(self.directory, "abc.json"), "w") as f:
+            f.write('{"etag": null}')
+
+        # Act
+        entry = self.cache.get("abc")
+
+        # Assert
+        self.assertIsNone(entry)
+
+    def test_put_and_get(self):
+        """
+        Test that a stored entry is read back with its validators and is fresh.
+        """
+        # Arrange
+        self.cache.put("k", b'{"a": 1}', etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+
+        # Act
+        entry = ResponseCache(self.directory, ttl=60).get("k")
+
+        # Assert
+        self.assertEqual(entry.body, b'{"a": 1}')
+        self.assertEqual(entry.etag, '"v1"')
+        self.assertTrue(self.cache.is_fresh(entry))
+        self.assertIsNone(self.cache.get("missing"))
+
+    def test_lru_eviction(self):
+        """
+        Test that the least recently used entry is evicted when the size limit is exceeded.
+        
+        Store three 40-byte entries in a 100-byte cache after touching the first one.
+        Verify that the untouched second entry is the one evicted.
+        """
+        # Arrange
+        self.cache.put("first", b"x" * 40)
+        self.cache.put("second", b"x" * 40)
+        self.cache.get("first")
+
+        # Act
+        self.cache.put("third", b"x" * 40)
+
+        # Assert
+        self.assertIsNotNone(self.cache.get("first"))
+        self.assertIsNone(self.cache.get("second"))
+        self.assertIsNotNone(self.cache.get("third"))
+        self.assertLessEqual(self.cache.stats()["size"], 100)
+
+    @patch('src.api_client.requests.Session.post')
+    def test_api_client_serves_fresh_entries(self, mock_post):
+        """
+        Test that APIClient answers a repeated query from the cache without a request.
+        """
+        # Arrange
+        client = APIClient("https://api.example.com", {}, cache=self.cache)
+        response = Mock(status_code=200, headers={"ETag": '"v1"'}, content=b'{"employees": []}')
+        response.json.return_value = {"employees": []}
+        mock_post.return_value = response
+
+        # Act
+        first = client.query_api({"skip": 0})
+        second = client.query_api({"skip": 0})
+
+        # Assert
+        self.assertEqual(first, second)
+        mock_post.assert_called_once()
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    @patch('src.api_client.requests.Session.post')
+    def test_api_client_revalidates_stale_entries(self, mock_post):
+        """
+        Test that a stale entry is revalidated with If-None-Match and reused on a 304.
+        """
+        # Arrange
+        self.cache.ttl = 0
+        client = APIClient("https://api.example.com", {}, cache=self.cache)
+        key = ResponseCache.key(client.url, {"skip": 0})
+        self.cache.put(key, b'{"employees": [{"empNo": "1"}]}', etag='"v1"')
+        mock_post.return_value = Mock(status_code=304, headers={})
+
+        # Act
+        result = client.query_api({"skip": 0})
+
+        # Assert
+        self.assertEqual(result, {"employees": [{"empNo": "1"}]})
+        self.assertEqual(mock_post.call_args.kwargs["headers"]["If-None-Match"], '"v1"')
+        self.assertEqual(self.cache.stats()["revalidations"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+import os
+from unittest.mock import MagicMock
+from src.csv_handler import write_csv_stream
+from src.database_handler import BatchStats
+from src.ingest import ingest_csv, parse_range, split_csv
+
+class TestIngest(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up the test environment before each test method.
+        Write a CSV export with a multi-line quoted value, and create a mock database handler.
+        """
+        self.filename = "test_ingest.csv"
+        self.records = [
+            {"empNo": str(index), "givenName": f"Given {index}", "surname": "Smith", "photoRevision": index,
+             "active": index % 2 == 0, "email": None}
+            for index in range(50)
+        ]
+        self.records[10]["surname"] = 'Smith,\n"the second"'
+        write_csv_stream(self.records, self.filename)
+
+        self.written = []
+        self.columns = []
+
+        def write_batches(connection, records, batch_rows, batch_bytes, columns):
+            rows = list(records)
+            self.written.extend(rows)
+            self.columns.append(columns)
+            return [BatchStats(0, len(rows), 0, len(rows), [], 0.0)]
+
+        self.db_handler = MagicMock()
+        self.db_handler.write_batches.side_effect = write_batches
+
+    def tearDown(self):
+        """
+        Clean up after each test method.
+        Remove the test CSV files if they exist.
+        """
+        for filename in (self.filename, "test_ingest_new.csv", "test_ingest.csv.gz"):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_split_at_record_boundaries(self):
+        """
+        Test that ranges split the file at record boundaries, never inside a quoted field.
+
+        Use ranges of a few bytes, so that nearly every line break is a candidate boundary.
+        Verify that the ranges cover the file and that parsing them yields every record.
+        """
+        # Act
+        fields, ranges = split_csv(self.filename, chunk_bytes=16)
+        rows = [row for start, end in ranges for row in parse_range(self.filename, fields, start, end)]
+
+        # Assert
+        self.assertEqual(fields[0], "empNo")
+        self.assertEqual(ranges[-1][1], os.path.getsize(self.filename))
+        self.assertEqual(len(rows), 50)
+        self.assertEqual(rows[10][2], 'Smith,\n"the second"')
+
+    def test_parse_converts_types(self):
+        """
+        Test that parsed values are converted back to table values.
+        """
+        # Arrange
+        fields, ranges = split_csv(self.filename)
+
+        # Act
+        rows = parse_range(self.filename, fields, *ranges[0])
+
+        # Assert
+        self.assertEqual(len(ranges), 1)
+        self.assertEqual(rows[3], ("3", "Given 3", "Smith", None, None, None, None, 3, False, None))
+
+    def test_ingest_streams_files_in_order(self):
+        """
+        Test that files are written in the given order through a process pool.
+
+        Verify that the rows of the later file follow the earlier file's, so they win on upsert.
+        """
+        # Arrange
+        write_csv_stream([{"empNo": "3", "surname": "Jones"}], "test_ingest_new.csv")
+
+        # Act
+        result = ingest_csv(
+            [self.filename, "test_ingest_new.csv"], self.db_handler, connection=MagicMock(),
+            parse_workers=2, chunk_bytes=256,
+        )
+
+        # Assert
+        self.assertEqual(result.rows, 51)
+        self.assertEqual(result.failed_keys, [])
+        self.assertEqual([record["empNo"] for record in self.written[:50]], [str(index) for index in range(50)])
+        self.assertEqual(self.written[-1]["surname"], "Jones")
+        self.assertTrue(self.written[0]["active"])
+
+    def test_ingest_writes_only_header_columns(self):
+        """
+        Test that an export without some columns does not overwrite them.
+
+        Ingest an export with only empNo and surname after a full one.
+        Verify that each export is written with the columns of its own header.
+        """
+        # Arrange
+        write_csv_stream([{"empNo": "3", "surname": "Jones"}], "test_ingest_new.csv")
+
+        # Act
+        ingest_csv([self.filename, "test_ingest_new.csv"], self.db_handler, connection=MagicMock(), parse_workers=1)
+
+        # Assert
+        self.assertEqual(self.columns[0][:3], ("empNo", "givenName", "surname"))
+        self.assertEqual(self.columns[1], ("empNo", "surname"))
+
+    def test_ingest_compressed_export(self):
+        """
+        Test that a gzip export is ingested as a single range.
+        """
+        # Arrange
+        write_csv_stream(self.records, "test_ingest.csv.gz", compression="gzip")
+
+        # Act
+        result = ingest_csv(["test_ingest.csv.gz"], self.db_handler, connection=MagicMock(), parse_workers=1)
+
+        # Assert
+        self.assertEqual(result.rows, 50)
+        self.assertEqual(self.written[10]["surname"], 'Smith,\n"the second"')
+
+    def test_parallel_writers_use_parallel_upsert(self):
+        """
+        Test that more than one writer streams the rows into parallel_upsert.
+        """
+        # Arrange
+        self.db_handler.parallel_upsert.return_value = [BatchStats(0, 49, 0, 49, ["7"], 0.0)]
+
+        # Act
+        result = ingest_csv([self.filename], self.db_handler, writers=4, parse_workers=1)
+
+        # Assert
+        self.assertEqual(self.db_handler.parallel_upsert.call_args.args[1], 4)
+        self.assertEqual(result.failed_keys, ["7"])
+
+    def test_single_writer_requires_connection(self):
+        """
+        Test that a single writer without a connection raises ValueError.
+        """
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            ingest_csv([self.filename], self.db_handler)
+
+if __name__ == '__main__':
+    unittest.main()
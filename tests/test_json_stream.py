@@ -0,0 +1,69 @@
+import unittest
+import json
+from src.json_stream import iter_array_items
+
+def chunked(text, size):
+    """
+    Split the UTF-8 encoding of text into chunks of the given size.
+    """
+    data = text.encode("utf-8")
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+class TestJSONStream(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up the test environment before each test method.
+        Build a sample response document with metadata on both sides of the array.
+        """
+        self.employees = [
+            {"empNo": "1", "givenName": "Zoë", "photoRevision": 12345},
+            {"empNo": "2", "givenName": "Jean", "active": True, "tags": [1, 2]},
+        ]
+        self.document = json.dumps({"total": 2, "employees": self.employees, "page": {"skip": 0}})
+
+    def test_iter_array_items_across_chunk_boundaries(self):
+        """
+        Test that items are decoded correctly regardless of where chunks split the text.
+        
+        Feed the document one byte at a time, splitting multi-byte characters and numbers.
+        Verify that every item and all metadata are recovered.
+        """
+        # Arrange
+        metadata = {}
+
+        # Act
+        items = list(iter_array_items(chunked(self.document, 1), "employees", metadata))
+
+        # Assert
+        self.assertEqual(items, self.employees)
+        self.assertEqual(metadata, {"total": 2, "page": {"skip": 0}})
+
+    def test_iter_array_items_empty_array(self):
+        """
+        Test that an empty array yields nothing.
+        """
+        # Act
+        items = list(iter_array_items(chunked('{"employees": [], "total": 0}', 4), "employees"))
+
+        # Assert
+        self.assertEqual(items, [])
+
+    def test_iter_array_items_malformed(self):
+        """
+        Test that a truncated document raises ValueError.
+        
+        Cut the document off in the middle of the array.
+        Verify that the items before the cut are yielded and then ValueError is raised.
+        """
+        # Arrange
+        truncated = self.document[:self.document.index('"Jean"')]
+        items = []
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            for item in iter_array_items(chunked(truncated, 8), "employees"):
+                items.append(item)
+        self.assertEqual(items, self.employees[:1])
+
+if __name__ == '__main__':
+    unittest.main()
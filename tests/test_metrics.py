@@ -0,0 +1,110 @@
+import unittest
+import json
+import os
+from unittest.mock import MagicMock
+from src import metrics
+from src.database_handler import DatabaseHandler
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up the test environment before each test method.
+        Enable instrumentation with a fixed run ID.
+        """
+        self.registry = metrics.enable("run-1")
+        self.trace_file = "test_trace.jsonl"
+
+    def tearDown(self):
+        """
+        Clean up after each test method.
+        Disable instrumentation and remove the trace file if it exists.
+        """
+        metrics.disable()
+        if os.path.exists(self.trace_file):
+            os.remove(self.trace_file)
+
+    def test_spans_nest_and_carry_run_id(self):
+        """
+        Test that spans record their parent, attributes and the run ID.
+        """
+        # Act
+        with metrics.span("sync.db"):
+            with metrics.span("db.write_batches", rows=10):
+                pass
+        self.registry.write_spans(self.trace_file)
+
+        # Assert
+        with open(self.trace_file) as f:
+            inner, outer = [json.loads(line) for line in f]
+        self.assertEqual(inner["name"], "db.write_batches")
+        self.assertEqual(inner["parent_id"], outer["span_id"])
+        self.assertEqual(inner["attributes"], {"rows": 10})
+        self.assertEqual({inner["run_id"], outer["run_id"]}, {"run-1"})
+
+    def test_traced_counts_failures(self):
+        """
+        Test that a traced call returning False is counted as an error.
+        """
+        # Arrange
+        failing = metrics.traced("db.create_table")(lambda: False)
+
+        # Act
+        failing()
+
+        # Assert
+        self.assertEqual(self.registry.counter("sync_operation_errors_total", operation="db.create_table"), 1)
+        self.assertEqual(self.registry.spans[0]["status"], "error")
+
+    def test_prometheus_export(self):
+        """
+        Test that counters and histograms are rendered in the Prometheus text format.
+        """
+        # Arrange
+        metrics.increment("api_retries_total", reason=503)
+        metrics.observe("db_batch_rows", 250)
+
+        # Act
+        text = self.registry.to_prometheus()
+
+        # Assert
+        self.assertIn("# TYPE api_retries_total counter", text)
+        self.assertIn('api_retries_total{reason="503"} 1', text)
+        self.assertIn('db_batch_rows_bucket{le="100"} 0', text)
+        self.assertIn('db_batch_rows_bucket{le="500"} 1', text)
+        self.assertIn('db_batch_rows_bucket{le="+Inf"} 1', text)
+        self.assertIn("db_batch_rows_sum 250", text)
+
+    def test_write_batches_records_batches(self):
+        """
+        Test that write_batches reports its batch sizes and written records.
+        """
+        # Arrange
+        db_handler = DatabaseHandler("localhost", "test_user", "test_password", "test_db")
+        records = [{"empNo": str(i)} for i in range(5)]
+
+        # Act
+        db_handler.write_batches(MagicMock(), records, batch_rows=2)
+
+        # Assert
+        self.assertEqual(self.registry.counter("sync_records_total", operation="db.write_batches"), 5)
+        self.assertIn("db_batch_rows_count 3", self.registry.to_prometheus())
+        self.assertEqual(self.registry.spans[-1]["name"], "db.write_batches")
+
+    def test_disabled_is_noop(self):
+        """
+        Test that instrumentation calls do nothing while disabled.
+        """
+        # Arrange
+        metrics.disable()
+
+        # Act
+        with metrics.span("sync.fetch") as span:
+            span.set(records=1)
+        metrics.increment("sync_records_total", 1)
+
+        # Assert
+        self.assertIsNone(metrics.active())
+        self.assertEqual(self.registry.spans, [])
+
+if __name__ == '__main__':
+    unittest.main()
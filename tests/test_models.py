@@ -0,0 +1,135 @@
+import unittest
+import tracemalloc
+from src.models import Employee, EmployeeStore
+
+class TestModels(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up the test environment before each test method.
+        Build an EmployeeStore from sample API records.
+        """
+        self.records = [
+            {"empNo": "1", "givenName": "John", "positionName": "Developer", "photoRevision": 3,
+             "active": True, "lastLogin": "ignored"},
+            {"empNo": "2", "givenName": "Jane", "positionName": "Manager", "active": False},
+            {"empNo": "3", "givenName": "Bob", "positionName": "Developer", "active": True},
+        ]
+        self.store = EmployeeStore.from_records(self.records)
+
+    def test_employee_uses_slots(self):
+        """
+        Test that Employee has no per-instance dict and rejects unknown fields.
+        """
+        # Arrange
+        employee = Employee.from_dict(self.records[0])
+
+        # Assert
+        self.assertFalse(hasattr(employee, "__dict__"))
+        self.assertEqual(employee.positionName, "Developer")
+        with self.assertRaises(TypeError):
+            Employee(empNo="1", lastLogin="x")
+
+    def test_store_lookup_by_emp_no(self):
+        """
+        Test O(1) lookup by empNo, including typed column values.
+        """
+        # Act
+        employee = self.store.get("1")
+
+        # Assert
+        self.assertEqual(len(self.store), 3)
+        self.assertIn("2", self.store)
+        self.assertEqual(employee.givenName, "John")
+        self.assertEqual(employee.photoRevision, 3)
+        self.assertIs(employee.active, True)
+        self.assertIsNone(self.store.get("2").photoRevision)
+        self.assertIsNone(self.store.get("99"))
+
+    def test_store_secondary_indexes(self):
+        """
+        Test lookups by position and active flag.
+        """
+        # Act
+        developers = self.store.by_position("Developer")
+        inactive = self.store.by_active(False)
+
+        # Assert
+        self.assertEqual(sorted(e.empNo for e in developers), ["1", "3"])
+        self.assertEqual([e.empNo for e in inactive], ["2"])
+
+    def test_store_replaces_existing_emp_no(self):
+        """
+        Test that re-adding an empNo replaces the record and updates the indexes.
+        """
+        # Act
+        self.store.add({"empNo": "1", "givenName": "John", "positionName": "Manager", "active": False})
+
+        # Assert
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(sorted(e.empNo for e in self.store.by_position("Manager")), ["1", "2"])
+        self.assertEqual([e.empNo for e in self.store.by_position("Developer")], ["3"])
+        self.assertEqual(sorted(e.empNo for e in self.store.by_active(False)), ["1", "2"])
+
+    def test_store_iter_dicts(self):
+        """
+        Test that records come back as dicts limited to the table columns.
+        """
+        # Act
+        rows = list(self.store.iter_dicts())
+
+        # Assert
+        self.assertEqual(len(rows), 3)
+        self.assertNotIn("lastLogin", rows[0])
+        self.assertEqual(rows[0]["givenName"], "John")
+
+    def test_store_iter_records_keeps_api_fields(self):
+        """
+        Test that records come back with every field they were added with, in their original order.
+        """
+        # Act
+        rows = list(self.store.iter_records())
+
+        # Assert
+        self.assertEqual(list(rows[0]), ["empNo", "givenName", "positionName", "photoRevision", "active", "lastLogin"])
+        self.assertEqual(rows[0]["lastLogin"], "ignored")
+        self.assertNotIn("lastLogin", rows[1])
+
+    def test_store_keeps_api_fields_column_wise(self):
+        """
+        Test that fields that are not table columns cost a column slot per row, not a dict per row.
+
+        Build stores of the same employees with and without three extra API fields.
+        Verify that the extra fields add well under the size of a per-row dict, and that the
+        store still uses less memory than copies of the records.
+        """
+        # Arrange
+        rows = 5000
+        plain = [
+            {"empNo": str(index), "givenName": f"Given {index}", "positionName": "Developer", "active": True}
+            for index in range(rows)
+        ]
+        extended = [
+            {**record, "lastLogin": f"2024-01-{index % 28 + 1:02d}", "department": "Sales", "location": "Ottawa"}
+            for index, record in enumerate(plain)
+        ]
+
+        def allocated(build):
+            tracemalloc.start()
+            try:
+                result = build()
+                return tracemalloc.get_traced_memory()[0], result
+            finally:
+                tracemalloc.stop()
+
+        # Act
+        plain_bytes, _ = allocated(lambda: EmployeeStore.from_records(plain))
+        extended_bytes, store = allocated(lambda: EmployeeStore.from_records(extended))
+        dict_bytes, _ = allocated(lambda: [dict(record) for record in extended])
+
+        # Assert
+        self.assertLess(extended_bytes - plain_bytes, rows * 3 * 16)
+        self.assertLess(extended_bytes, dict_bytes)
+        self.assertEqual(list(store.iter_records())[7]["lastLogin"], "2024-01-08")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+import os
+import shutil
+from unittest.mock import MagicMock
+import requests
+from src.photo_sync import PhotoStore, sync_photos
+
+class TestPhotoSync(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up the test environment before each test method.
+        Create a PhotoStore in a test directory and a mock API client.
+        """
+        self.directory = "test_photos"
+        self.store = PhotoStore(self.directory)
+        self.store.load()
+        self.api_client = MagicMock()
+        self.api_client.download.side_effect = lambda url: url.encode("utf-8")
+        self.template = "https://api.example.com/Employees/{empNo}/Photo"
+
+    def tearDown(self):
+        """
+        Clean up after each test method.
+        Remove the test photo directory if it exists.
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_downloads_only_changed_revisions(self):
+        """
+        Test that a second sync only downloads photos whose revision changed.
+        """
+        # Arrange
+        records = [{"empNo": "1", "photoRevision": 1}, {"empNo": "2", "photoRevision": 5}]
+        sync_photos(self.api_client, records, self.store, self.template, max_workers=2)
+        self.api_client.download.reset_mock()
+
+        # Act
+        result = sync_photos(
+            self.api_client, [{"empNo": "1", "photoRevision": 1}, {"empNo": "2", "photoRevision": 6}],
+            self.store, self.template,
+        )
+
+        # Assert
+        self.api_client.download.assert_called_once_with("https://api.example.com/Employees/2/Photo")
+        self.assertEqual((result.downloaded, result.unchanged), (1, 1))
+        self.assertEqual(self.store.index["2"]["revision"], 6)
+
+    def test_identical_photos_share_one_object(self):
+        """
+        Test that employees with the same photo content share one stored object.
+        """
+        # Arrange
+        self.api_client.download.side_effect = lambda url: b"default avatar"
+        records = [{"empNo": "1", "photoRevision": 1}, {"empNo": "2", "photoRevision": 1}]
+
+        # Act
+        sync_photos(self.api_client, records, self.store, self.template)
+
+        # Assert
+        digest = self.store.index["1"]["digest"]
+        self.assertEqual(self.store.index["2"]["digest"], digest)
+        with open(self.store.path(digest), "rb") as f:
+            self.assertEqual(f.read(), b"default avatar")
+
+    def test_failed_downloads_are_retried_next_sync(self):
+        """
+        Test that a failed download is reported and not recorded in the index.
+
+        The index is still saved, so the photos that did download are skipped next time.
+        """
+        # Arrange
+        def download(url):
+            if url.endswith("/2/Photo"):
+                raise requests.ConnectionError("Connection refused")
+            return b"photo"
+
+        self.api_client.download.side_effect = download
+        records = [{"empNo": "1", "photoRevision": 1}, {"empNo": "2", "photoRevision": 1}]
+
+        # Act
+        result = sync_photos(self.api_client, records, self.store, self.template)
+        reloaded = PhotoStore(self.directory)
+        reloaded.load()
+
+        # Assert
+        self.assertEqual(result.failed_keys, ["2"])
+        self.assertIn("1", reloaded.index)
+        self.assertNotIn("2", reloaded.index)
+
+    def test_failed_writes_are_retried_next_sync(self):
+        """
+        Test that a photo that cannot be stored fails on its own without aborting the sync.
+
+        Make storing the second photo raise OSError, as on a full disk.
+        Verify that it is reported as failed and the other photos are still recorded.
+        """
+        # Arrange
+        put = self.store.put
+
+        def put_or_fail(data):
+            if data.endswith(b"/2/Photo"):
+                raise OSError(28, "No space left on device")
+            return put(data)
+
+        self.store.put = put_or_fail
+        records = [{"empNo": str(index), "photoRevision": 1} for index in range(1, 4)]
+
+        # Act
+        result = sync_photos(self.api_client, records, self.store, self.template)
+        reloaded = PhotoStore(self.directory)
+        reloaded.load()
+
+        # Assert
+        self.assertEqual(result.failed_keys, ["2"])
+        self.assertEqual(result.downloaded, 2)
+        self.assertEqual(sorted(reloaded.index), ["1", "3"])
+
+    def test_missing_photo_is_recorded(self):
+        """
+        Test that a 404 is recorded so the photo isn't requested again at the same revision.
+        """
+        # Arrange
+        self.api_client.download.side_effect = lambda url: None
+        records = [{"empNo": "1", "photoRevision": 3}]
+
+        # Act
+        first = sync_photos(self.api_client, records, self.store, self.template)
+        second = sync_photos(self.api_client, records, self.store, self.template)
+
+        # Assert
+        self.assertEqual(first.missing, 1)
+        self.assertEqual(second.unchanged, 1)
+        self.assertEqual(self.api_client.download.call_count, 1)
+
+    def test_prune_removes_unreferenced_objects(self):
+        """
+        Test that prune deletes objects no longer referenced by the index.
+        """
+        # Arrange
+        old_digest = self.store.put(b"old photo")
+        self.store.record("1", 2, self.store.put(b"new photo"))
+
+        # Act
+        removed = self.store.prune()
+
+        # Assert
+        self.assertEqual(removed, 1)
+        self.assertFalse(os.path.exists(self.store.path(old_digest)))
+
+if __name__ == '__main__':
+    unittest.main()
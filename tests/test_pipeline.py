@@ -0,0 +1,72 @@
+import unittest
+import csv
+import os
+from unittest.mock import MagicMock, Mock
+from src.api_client import APIClient
+from src.async_api_client import AsyncAPIClient
+from src.database_handler import DatabaseHandler
+from src.pipeline import run_pipeline
+
+class TestPipeline(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        """
+        Set up the test environment before each test method.
+        Mock the API client and database handler and define a test CSV filename.
+        """
+        self.test_filename = "test_pipeline_employees.csv"
+        self.employees = [{"empNo": str(i), "givenName": f"Name {i}"} for i in range(5)]
+        sync_client = Mock(spec=APIClient)
+        sync_client.query_page.side_effect = lambda payload: {
+            "employees": self.employees[payload["skip"]:payload["skip"] + payload["take"]],
+            "total": len(self.employees),
+        }
+        self.api_client = AsyncAPIClient(sync_client, max_concurrency=2)
+        self.db_handler = Mock(spec=DatabaseHandler)
+        self.db_handler.connect.return_value = MagicMock()
+        self.db_handler.create_table.return_value = True
+        self.db_handler.insert_data.return_value = True
+
+    def tearDown(self):
+        """
+        Clean up after each test method.
+        Remove the test CSV file if it exists.
+        """
+        if os.path.exists(self.test_filename):
+            os.remove(self.test_filename)
+
+    async def test_run_pipeline_success(self):
+        """
+        Test that every page reaches both the CSV file and the database.
+        
+        Verify that the pipeline succeeds, the CSV holds all rows and each page is upserted.
+        """
+        # Act
+        result = await run_pipeline(self.api_client, self.db_handler, {}, self.test_filename, page_size=2)
+
+        # Assert
+        self.assertTrue(result)
+        with open(self.test_filename, newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(sorted(row["empNo"] for row in rows), ["0", "1", "2", "3", "4"])
+        self.assertEqual(self.db_handler.insert_data.call_count, 3)
+        self.db_handler.connect.return_value.close.assert_called_once()
+
+    async def test_run_pipeline_db_failure(self):
+        """
+        Test that a database connection failure does not block the other stages.
+        
+        Verify that the pipeline reports failure while the CSV is still written.
+        """
+        # Arrange
+        self.db_handler.connect.return_value = None
+
+        # Act
+        result = await run_pipeline(self.api_client, self.db_handler, {}, self.test_filename, page_size=2)
+
+        # Assert
+        self.assertFalse(result)
+        self.assertTrue(os.path.exists(self.test_filename))
+        self.db_handler.insert_data.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+import os
+from src.models import EmployeeStore
+from src.snapshot import Snapshot, diff_snapshots, write_snapshot
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up the test environment before each test method.
+        Create sample employee records and the names of the test snapshot files.
+        """
+        self.records = [
+            {"empNo": "3", "givenName": "Grace", "surname": "Hopper", "positionName": "Admiral",
+             "photoRevision": 2, "active": True, "email": "grace@example.com"},
+            {"empNo": "1", "givenName": "Ada", "surname": "Lovelace", "positionName": "Analyst",
+             "photoRevision": None, "active": False},
+            {"empNo": "2", "givenName": "Émile", "surname": "Borel", "positionName": "Analyst",
+             "photoRevision": 7, "active": None},
+        ]
+        self.old_file = "test_old.snap"
+        self.new_file = "test_new.snap"
+
+    def tearDown(self):
+        """
+        Clean up after each test method.
+        Remove the test snapshot files if they exist.
+        """
+        for filename in (self.old_file, self.new_file):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_round_trip(self):
+        """
+        Test that a snapshot returns every column as written, in empNo order.
+        """
+        # Arrange
+        write_snapshot(self.records, self.old_file)
+
+        # Act
+        with Snapshot(self.old_file) as snapshot:
+            rows = list(snapshot.iter_dicts())
+
+        # Assert
+        self.assertEqual([row["empNo"] for row in rows], ["1", "2", "3"])
+        self.assertEqual(rows[2], EmployeeStore.from_records([self.records[0]]).get("3").to_dict())
+        self.assertIsNone(rows[0]["photoRevision"])
+        self.assertIsNone(rows[1]["active"])
+        self.assertEqual(rows[1]["givenName"], "Émile")
+
+    def test_lookup_by_emp_no(self):
+        """
+        Test random access by empNo, including employees that are not in the snapshot.
+        """
+        # Arrange
+        write_snapshot(EmployeeStore.from_records(self.records), self.old_file)
+
+        # Act
+        with Snapshot(self.old_file) as snapshot:
+            found = snapshot.get("2")
+            missing = snapshot.get("42")
+            contains = "3" in snapshot
+
+        # Assert
+        self.assertEqual(found["surname"], "Borel")
+        self.assertEqual(found["photoRevision"], 7)
+        self.assertIsNone(missing)
+        self.assertTrue(contains)
+
+    def test_diff_reports_changed_columns(self):
+        """
+        Test that a diff of snapshots with the same employees reports the changed columns.
+        """
+        # Arrange
+        write_snapshot(self.records, self.old_file)
+        changed = [dict(record) for record in self.records]
+        changed[0]["positionName"] = "Rear Admiral"
+        changed[2]["active"] = True
+        write_snapshot(changed, self.new_file)
+
+        # Act
+        with Snapshot(self.old_file) as old, Snapshot(self.new_file) as new:
+            diff = diff_snapshots(old, new)
+
+        # Assert
+        self.assertEqual(diff.added, [])
+        self.assertEqual(diff.removed, [])
+        self.assertEqual(diff.changed, {"2": ["active"], "3": ["positionName"]})
+
+    def test_diff_reports_added_and_removed(self):
+        """
+        Test that a diff matches rows by empNo when employees were added or removed.
+        """
+        # Arrange
+        write_snapshot(self.records, self.old_file)
+        changed = [dict(record) for record in self.records[1:]]
+        changed[0]["surname"] = "King"
+        changed.append({"empNo": "4", "givenName": "Alan", "surname": "Turing"})
+        write_snapshot(changed, self.new_file)
+
+        # Act
+        with Snapshot(self.old_file) as old, Snapshot(self.new_file) as new:
+            diff = diff_snapshots(old, new)
+
+        # Assert
+        self.assertEqual(diff.added, ["4"])
+        self.assertEqual(diff.removed, ["3"])
+        self.assertEqual(diff.changed, {"1": ["surname"]})
+
+    def test_diff_of_identical_snapshots_is_empty(self):
+        """
+        Test that identical snapshots have no differences.
+        """
+        # Arrange
+        write_snapshot(self.records, self.old_file)
+        write_snapshot(list(reversed(self.records)), self.new_file)
+
+        # Act
+        with Snapshot(self.old_file) as old, Snapshot(self.new_file) as new:
+            diff = diff_snapshots(old, new)
+
+        # Assert
+        self.assertEqual(diff, ([], [], {}))
+
+    def test_open_rejects_other_files(self):
+        """
+        Test that opening a file that is not a snapshot raises ValueError.
+        """
+        # Arrange
+        with open(self.old_file, "w") as f:
+            f.write("empNo,givenName\n1,Ada\n")
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            Snapshot(self.old_file)
+
+    def test_write_failure_returns_none(self):
+        """
+        Test that a snapshot that cannot be written returns None.
+        """
+        # Act / Assert
+        self.assertIsNone(write_snapshot(self.records, os.path.join("missing_directory", "employees.snap")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,234 @@
+import unittest
+import json
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+from src.tenants import FairBudget, TenantRunner, load_manifest
+
+class TestFairBudget(unittest.TestCase):
+    def test_tenant_may_use_idle_capacity(self):
+        """
+        Test that a tenant may exceed its fair share while no other tenant is waiting.
+        """
+        # Arrange
+        budget = FairBudget(4)
+        budget.register("large")
+        budget.register("small")
+
+        # Act
+        for _ in range(4):
+            budget.acquire("large")
+
+        # Assert
+        self.assertEqual(budget._in_flight, 4)
+
+    def test_waiting_tenant_gets_its_share_first(self):
+        """
+        Test that once a tenant is waiting, a tenant over its share can't take freed slots.
+
+        The large tenant holds the whole budget while the small tenant waits.
+        Verify that the slot the large tenant frees goes to the small tenant.
+        """
+        # Arrange
+        budget = FairBudget(2)
+        budget.register("large")
+        budget.register("small")
+        budget.acquire("large")
+        budget.acquire("large")
+        order = []
+
+        def acquire(tenant):
+            budget.acquire(tenant)
+            order.append(tenant)
+
+        small = threading.Thread(target=acquire, args=("small",))
+        small.start()
+        time.sleep(0.05)
+        large = threading.Thread(target=acquire, args=("large",))
+        large.start()
+        time.sleep(0.05)
+
+        # Act
+        budget.release("large")
+        small.join(1)
+        time.sleep(0.05)
+
+        # Assert
+        self.assertEqual(order, ["small"])
+        budget.release("small")
+        large.join(1)
+        self.assertEqual(order, ["small", "large"])
+
+    def test_unregister_wakes_waiting_tenants(self):
+        """
+        Test that a finished tenant's share is handed to the remaining tenants.
+        """
+        # Arrange
+        budget = FairBudget(1)
+        budget.register("first")
+        budget.register("second")
+        budget.acquire("first")
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (budget.acquire("second"), acquired.set()))
+        thread.start()
+
+        # Act
+        budget.release("first")
+        budget.unregister("first")
+        thread.join(1)
+
+        # Assert
+        self.assertTrue(acquired.is_set())
+
+class TestTenantRunner(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up the test environment before each test method.
+        Create a manifest with two tenants on the same API host.
+        """
+        self.manifest = {
+            "max_concurrency": 8,
+            "defaults": {"page_size": 50, "payload": {"filters": []}},
+            "tenants": [
+                {"name": "acme", "api_url": "https://api.example.com/acme/Employees", "api_token_env": "ACME_TOKEN",
+                 "csv_filename": "test_acme.csv"},
+                {"name": "globex", "api_url": "https://api.example.com/globex/Employees", "api_token": "globex-token"},
+            ],
+        }
+
+    def tearDown(self):
+        """
+        Clean up after each test method.
+        Remove the test CSV file if it exists.
+        """
+        if os.path.exists("test_acme.csv"):
+            os.remove("test_acme.csv")
+
+    @patch.dict(os.environ, {"ACME_TOKEN": "acme-token"})
+    @patch("src.tenants.APIClient")
+    def test_tenants_share_one_connection_pool_per_host(self, mock_client_class):
+        """
+        Test that tenants on the same API host share a connection pool and that secrets resolve.
+
+        Verify that each tenant's client gets its token, the merged payload and its own session
+        on the shared adapter, and that each tenant's results and stage timings are reported.
+        """
+        # Arrange
+        mock_client_class.return_value.iter_employees.side_effect = lambda payload, page_size, max_workers: iter(
+            [{"empNo": "1", "givenName": "Ada", "surname": "Lovelace"}]
+        )
+        runner = TenantRunner(self.manifest, {"fields": ["empNo"]})
+
+        # Act
+        results = runner.run()
+
+        # Assert
+        self.assertEqual([result.name for result in results], ["acme", "globex"])
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual(results[0].employees, 1)
+        self.assertIn("csv", results[0].stages)
+        self.assertNotIn("csv", results[1].stages)
+        calls = mock_client_class.call_args_list
+        self.assertEqual(calls[0].args[1]["Authorization"], "Bearer acme-token")
+        self.assertEqual(calls[1].args[1]["Authorization"], "Bearer globex-token")
+        sessions = [call.kwargs["session"] for call in calls]
+        self.assertIsNot(sessions[0], sessions[1])
+        self.assertIsNot(sessions[0].cookies, sessions[1].cookies)
+        self.assertIs(sessions[0].get_adapter("https://"), sessions[1].get_adapter("https://"))
+        self.assertEqual(len(runner._adapters), 1)
+        payload = mock_client_class.return_value.iter_employees.call_args.args[0]
+        self.assertEqual(payload, {"fields": ["empNo"], "filters": []})
+
+    @patch("src.tenants.APIClient")
+    def test_failed_tenant_does_not_affect_others(self, mock_client_class):
+        """
+        Test that one tenant's failure is reported without failing the other tenants.
+        """
+        # Arrange
+        def iter_employees(payload, page_size, max_workers):
+            raise RuntimeError("boom")
+
+        first, second = MagicMock(), MagicMock()
+        first.iter_employees.side_effect = iter_employees
+        second.iter_employees.return_value = iter([])
+        mock_client_class.side_effect = [first, second]
+        manifest = {**self.manifest, "max_tenants": 1}
+
+        # Act
+        results = TenantRunner(manifest).run()
+
+        # Assert
+        self.assertFalse(results[0].success)
+        self.assertEqual(results[0].error, "boom")
+        self.assertTrue(results[1].success)
+
+    @patch("src.tenants.TenantRunner._db_handler_for")
+    @patch("src.tenants.APIClient")
+    def test_tenant_upserts_into_its_database(self, mock_client_class, mock_db_handler_for):
+        """
+        Test that a tenant with a database writes its employees over a pooled connection.
+        """
+        # Arrange
+        mock_client_class.return_value.iter_employees.return_value = iter([{"empNo": "1"}])
+        db_handler = MagicMock()
+        db_handler.write_batches.return_value = []
+        mock_db_handler_for.return_value = (db_handler, threading.Semaphore(1))
+        manifest = {"tenants": [{**self.manifest["tenants"][1], "db": {"host": "db", "user": "sync", "database": "globex"}}]}
+
+        # Act
+        results = TenantRunner(manifest).run()
+
+        # Assert
+        self.assertTrue(results[0].success)
+        self.assertIn("db", results[0].stages)
+        db_handler.create_table.assert_called_once()
+        db_handler.write_batches.assert_called_once()
+
+    @patch("mysql.connector.pooling.MySQLConnectionPool")
+    def test_pools_are_shared_only_with_the_same_credentials(self, mock_pool_class):
+        """
+        Test that tenants on the same server and account but with different passwords get separate pools.
+        """
+        # Arrange
+        runner = TenantRunner(self.manifest)
+        db = {"host": "db", "user": "sync", "password": "first", "database": "acme"}
+
+        # Act
+        runner._db_handler_for(db)
+        runner._db_handler_for({**db, "database": "globex"})
+        runner._db_handler_for({**db, "password": "second"})
+
+        # Assert
+        self.assertEqual(mock_pool_class.call_count, 2)
+        self.assertEqual([call.kwargs["password"] for call in mock_pool_class.call_args_list], ["first", "second"])
+
+class TestLoadManifest(unittest.TestCase):
+    def tearDown(self):
+        """
+        Clean up after each test method.
+        Remove the test manifest if it exists.
+        """
+        if os.path.exists("test_tenants.json"):
+            os.remove("test_tenants.json")
+
+    def test_manifest_without_tenants_is_rejected(self):
+        """
+        Test that a manifest without tenants returns None.
+        """
+        # Arrange
+        with open("test_tenants.json", "w") as f:
+            json.dump({"tenants": []}, f)
+
+        # Act / Assert
+        self.assertIsNone(load_manifest("test_tenants.json"))
+
+    def test_missing_manifest_returns_none(self):
+        """
+        Test that a missing manifest returns None.
+        """
+        # Act / Assert
+        self.assertIsNone(load_manifest("missing_tenants.json"))
+
+if __name__ == '__main__':
+    unittest.main()